@@ -37,10 +37,26 @@ file.
 # Imports #
 ###########
 
+import argparse
+import base64
+import collections
 import datetime
+import fcntl
+import gzip
+import hashlib
+import io
+import json
 import os
-import subprocess
+import shutil
+import socket
+import stat
+import struct
 import sys
+import tarfile
+import time
+
+from pycommon import (COLOUR_RESET, HOME, LIGHT_GREEN, LIGHT_RED, LIGHT_YELLOW, HashingWriter,
+                      ParallelGzipWriter)
 
 #############
 # Variables #
@@ -48,17 +64,110 @@ import sys
 
 # Script Metadata
 SCRIPT_VERSION = '0.0.1'
-SCRIPT_URL = 'https://github.com/ultraviolet-1968/shell_scripts'
 
-# String Colours
-GREEN = '\033[0;92m'
-RED = '\033[0;91m'
-YELLOW = '\033[0;93m'
+# Command-line arguments.
+PARSER = argparse.ArgumentParser(prog='minebackup')
+PARSER.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                    help="Compress using N threads (default: all CPUs).")
+PARSER.add_argument('-i', '--incremental', action='store_true',
+                    help="Store only the files and region chunks changed since the last backup.")
+PARSER.add_argument('--base', action='store_true',
+                    help="Start a new incremental chain with a full base snapshot.")
+PARSER.add_argument('--restore', nargs=2, metavar=('POINT', 'DESTINATION'),
+                    help="Restore an incremental backup ('latest' or a delta name).")
+PARSER.add_argument('-s', '--source', action='append', metavar='FOLDER',
+                    help="Back up FOLDER instead of the default save data (repeatable).")
+PARSER.add_argument('-l', '--live', action='store_true',
+                    help="Pause saving on a running server using RCON while capturing.")
+PARSER.add_argument('--rcon-host', default='localhost',
+                    help="RCON host of the running server (default: localhost).")
+PARSER.add_argument('--rcon-port', type=int, default=25575,
+                    help="RCON port of the running server (default: 25575).")
+PARSER.add_argument('--rcon-password', default=os.environ.get('MINECRAFT_RCON_PASSWORD'),
+                    help="RCON password (default: $MINECRAFT_RCON_PASSWORD).")
+
+# RCON Protocol
+RCON_LOGIN = 3
+RCON_COMMAND = 2
+RCON_TIMEOUT = 30
+RCON_RETRIES = 3
+
+# Live Capture Settings
+FICLONE = 0x40049409
+LINK_SAFE_EXTENSIONS = ('.dat', '.dat_old', '.png')
+STAGING_FOLDER = '.minebackup_staging'
+
+# Incremental Backup Paths
+INCREMENTAL_FOLDER = "{0}/Minecraft_Incremental".format(HOME)
+INCREMENTAL_STATE = "{0}/state.json".format(INCREMENTAL_FOLDER)
+
+# Region File Format
+REGION_EXTENSIONS = ('.mca', '.mcr')
+REGION_SECTOR = 4096
+REGION_CHUNKS = 1024
+REGION_ABSENT = 0xFFFFFFFF
+REGION_DELTA_MAGIC = b'MBRD'
+
+# Buffer Sizes
+BUFFER_SIZE = 1024 * 1024
 
-RESET = '\033[0;m'
+###########
+# Classes #
+###########
 
-# Paths
-HOME = os.environ['HOME']
+class RconClient:
+    """Minimal client for the Source RCON protocol used by Minecraft."""
+
+    def __init__(self, host, port, password, timeout=RCON_TIMEOUT):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.request_id = 0
+
+        # Authenticate, skipping any empty response sent before the result.
+        request_id, packet_type = self.send(RCON_LOGIN, password), None
+
+        while packet_type != RCON_COMMAND:
+            response_id, packet_type, _ = self.receive()
+
+        if response_id != request_id:
+            self.close()
+            raise ConnectionError("RCON authentication failed")
+
+    def send(self, packet_type, payload):
+        """Send a packet and return its request ID."""
+        self.request_id += 1
+        body = struct.pack("<ii", self.request_id, packet_type) + payload.encode() + b"\0\0"
+        self.sock.sendall(struct.pack("<i", len(body)) + body)
+        return self.request_id
+
+    def receive(self):
+        """Receive a packet and return its request ID, type and payload."""
+        length = struct.unpack("<i", self.receive_exactly(4))[0]
+        body = self.receive_exactly(length)
+        request_id, packet_type = struct.unpack("<ii", body[:8])
+        return request_id, packet_type, body[8:-2].decode(errors="replace")
+
+    def receive_exactly(self, size):
+        """Receive exactly 'size' bytes from the server."""
+        data = b""
+        while len(data) < size:
+            block = self.sock.recv(size - len(data))
+            if not block:
+                raise ConnectionError("RCON connection closed")
+            data += block
+        return data
+
+    def command(self, command):
+        """Run a server command and return its response."""
+        request_id = self.send(RCON_COMMAND, command)
+
+        while True:
+            response_id, _, payload = self.receive()
+            if response_id == request_id:
+                return payload
+
+    def close(self):
+        """Close the connection to the server."""
+        self.sock.close()
 
 #############
 # Functions #
@@ -67,15 +176,59 @@ HOME = os.environ['HOME']
 def minebackup_main():
     """Main function wrapper for 'minebackup.py' script."""
 
+    # Parse command-line arguments.
+    args = PARSER.parse_args()
+
+    if args.jobs < 1:
+        sys.exit("\n{0}ERROR: Jobs must be a positive number.{1}\n"
+                 .format(LIGHT_RED, COLOUR_RESET))
+
+    # Restore an incremental backup and exit.
+    if args.restore:
+        minebackup_restore(*args.restore)
+        return 0
+
     # Inform the user to wait while process completes.
     print("\nNow creating {0}Minecraft: Java Edition{1} backup. Please Wait.\n"
-          .format(GREEN, RESET))
+          .format(LIGHT_GREEN, COLOUR_RESET))
+
+    # Select the folders to back up.
+    if args.source:
+        folders = [os.path.abspath(folder) for folder in args.source]
+    else:
+        folders = ["{0}/.minecraft/saves".format(HOME),
+                   "{0}/.minecraft/screenshots".format(HOME)]
+
+    folders = [folder for folder in folders if os.path.isdir(folder)]
+
+    # Error: Minecraft data folder not found.
+    if not folders:
+        sys.exit("\n{0}ERROR: Minecraft data folder not found.{1}\n"
+                 .format(LIGHT_RED, COLOUR_RESET))
+
+    # - Take a point-in-time copy of a running server's world, then back
+    #   up from the copy once the server is saving again.
+    if args.live:
+        sources, staging_folders = minebackup_live_capture(folders, args)
+    else:
+        sources, staging_folders = [(folder, folder) for folder in folders], []
+
+    try:
+        # - Store only the changes since the last backup within the
+        #   incremental chain.
+        if args.incremental or args.base:
+            minebackup_create_delta(sources, args.jobs, args.base)
+
+        else:
+            # Generate date-stamped filename and assign to variable.
+            archive_name, digest = minebackup_create_archive(sources, args.jobs)
 
-    # Generate date-stamped filename and assign to variable.
-    archive_name = minebackup_create_archive()
+            # Create a matching SHA512SUM file for the above archive.
+            minebackup_create_checksum(archive_name, digest)
 
-    # Create a matching SHA512SUM file for the above archive.
-    minebackup_create_checksum(archive_name)
+    finally:
+        for staging_folder in staging_folders:
+            shutil.rmtree(staging_folder, ignore_errors=True)
 
     # Insert final newline.
     print()
@@ -83,13 +236,13 @@ def minebackup_main():
     return 0
 
 
-def minebackup_create_archive():
-    """Create a tarball containing Minecraft: Java Edition save data."""
-
-    # Minecraft paths
-    minecraft_folder = "{0}/.minecraft".format(HOME)
-    saves = "{0}/saves".format(minecraft_folder)
-    screenshots = "{0}/screenshots".format(minecraft_folder)
+def minebackup_create_archive(sources, jobs=1):
+    """
+    Create a tarball containing Minecraft: Java Edition save data and
+    return its filename along with the SHA512 digest computed while it was
+    written. Each source is a pair of the folder to read and the path to
+    record it as.
+    """
 
     # Create current datestamp for tarball filename.
     now = datetime.datetime.now()
@@ -103,58 +256,601 @@ def minebackup_create_archive():
     # Create formatted archive name including datestamp.
     archive_name = "Minecraft_{0}.tar.gz".format(current_time)
 
-    # Define 'tar' compression command.
-    tar_command = ('cd; tar -czf "{0}" "{1}" "{2}" --absolute-names; cd ~-'
-                   .format(archive_name, saves, screenshots))
+    # - Create the archive, compressing blocks of the tar stream in
+    #   parallel and hashing the compressed data as it is written.
+    archive_path = "{0}/{1}".format(HOME, archive_name)
 
-    # - Create Minecraft save data tarball if '~/.minecraft' folder
-    #   exists and is not empty.
-    if os.path.isdir(minecraft_folder) and os.listdir(minecraft_folder):
-        # Create the archive.
-        subprocess.run(tar_command, shell=True, check=True)
+    with open(archive_path, "wb", buffering=BUFFER_SIZE) as output:
+        writer = HashingWriter(output)
+        compressor = ParallelGzipWriter(writer, jobs)
 
-        # Inform the user of archive creation.
-        print("Created TAR archive {0}~/{1}{2}.".format(YELLOW,
-                                                        archive_name,
-                                                        RESET))
-    else:
-        sys.exit("\n{0}ERROR: Minecraft data folder not found.{1}\n"
-                 .format(RED, RESET))
+        with tarfile.open(fileobj=compressor, mode="w|",
+                          bufsize=BUFFER_SIZE) as tarball:
+            tarball.copybufsize = BUFFER_SIZE
+
+            for folder, original_folder in sources:
+                tarball.add(folder, arcname=original_folder)
+
+        compressor.close()
 
-    return archive_name
+    # Inform the user of archive creation.
+    print("Created TAR archive {0}~/{1}{2}.".format(LIGHT_YELLOW,
+                                                    archive_name,
+                                                    COLOUR_RESET))
 
+    return archive_name, writer.hexdigest()
 
-def minebackup_create_checksum(archive_name):
-    """Create a SHA512SUM hash of the Minecraft save data tarball."""
+
+def minebackup_create_checksum(archive_name, digest):
+    """
+    Create a SHA512SUM file of the Minecraft save data tarball from the
+    digest computed while it was written.
+    """
 
     # Define SHA512SUM file.
     sha512sum_file = "{0}".format(archive_name).replace(".tar.gz",
                                                         ".sha512sum")
 
-    # Define SHA512SUM command.
-    sha512sum_command = ("cd; sha512sum {0} > {1}; cd ~-"
-                         .format(archive_name, sha512sum_file))
-
     # Check archive exists before continuing.
     if os.path.isfile("{0}/{1}".format(HOME, archive_name)):
-        subprocess.run(sha512sum_command, shell=True, check=True)
+        with open("{0}/{1}".format(HOME, sha512sum_file), "w") as checksum:
+            checksum.write("{0}  {1}\n".format(digest, archive_name))
 
         # Inform the user that the file has been created.
-        print("Created SHA512SUM file {0}~/{1}{2}.".format(YELLOW,
+        print("Created SHA512SUM file {0}~/{1}{2}.".format(LIGHT_YELLOW,
                                                          sha512sum_file,
-                                                         RESET))
+                                                         COLOUR_RESET))
     else:
         # Archive tarball was not found.
         sys.exit("{0}ERROR: Minecraft save data tarball not found.{1}"
-                 .format(RED, RESET))
+                 .format(LIGHT_RED, COLOUR_RESET))
+
+    return 0
+
+
+def minebackup_timestamp():
+    """Return the current time as a compact datestamp."""
+
+    now = datetime.datetime.now()
+
+    return "{:04d}{:02d}{:02d}T{:02d}{:02d}{:02d}Z".format(now.year,
+                                                           now.month,
+                                                           now.day,
+                                                           now.hour,
+                                                           now.minute,
+                                                           now.second)
+
+
+def minebackup_relative_name(path):
+    """
+    Return the name a file is stored under within an incremental backup:
+    relative to the home folder, or its absolute path without the root.
+    """
+
+    if path.startswith(HOME + os.sep):
+        return os.path.relpath(path, HOME)
+
+    return path.lstrip(os.sep)
+
+
+def minebackup_stage_file(source, target):
+    """
+    Copy a file into the staging area as cheaply as possible: a reflink
+    where the filesystem supports it, a hard link for files which the game
+    replaces rather than rewrites, or otherwise a full copy.
+    """
+
+    with open(source, "rb") as source_file, open(target, "wb") as target_file:
+        try:
+            fcntl.ioctl(target_file.fileno(), FICLONE, source_file.fileno())
+            reflinked = True
+        except OSError:
+            reflinked = False
+
+    if reflinked:
+        shutil.copystat(source, target)
+        return "reflink"
+
+    if source.endswith(LINK_SAFE_EXTENSIONS):
+        try:
+            os.remove(target)
+            os.link(source, target)
+            return "link"
+        except OSError:
+            pass
+
+    shutil.copy2(source, target)
+
+    return "copy"
+
+
+def minebackup_stage_folder(folder):
+    """
+    Create a point-in-time copy of a folder within a staging folder on
+    the same filesystem and return the staging and copied folder paths.
+    """
+
+    staging_folder = os.path.join(os.path.dirname(folder), STAGING_FOLDER)
+    staged_folder = os.path.join(staging_folder, os.path.basename(folder))
+    counts = collections.Counter()
+
+    # Remove anything left behind by an interrupted capture.
+    shutil.rmtree(staged_folder, ignore_errors=True)
+
+    for root, folders, names in os.walk(folder):
+        staged_root = os.path.join(staged_folder, os.path.relpath(root, folder))
+        os.makedirs(staged_root, exist_ok=True)
+
+        for name in names:
+            path = os.path.join(root, name)
+            if os.path.isfile(path) and not os.path.islink(path):
+                counts[minebackup_stage_file(path, os.path.join(staged_root, name))] += 1
+
+    return staging_folder, staged_folder, counts
+
+
+def minebackup_live_capture(folders, args):
+    """
+    Pause world saving on a running server using RCON, flush the world
+    to disk, stage a copy of each folder and immediately resume saving.
+    Returns the staged sources and the staging folders to remove later.
+    """
+
+    # Error: RCON password not provided.
+    if args.rcon_password is None:
+        sys.exit("\n{0}ERROR: An RCON password is required for live capture.{1}\n"
+                 .format(LIGHT_RED, COLOUR_RESET))
+
+    sources = []
+    staging_folders = []
+    counts = collections.Counter()
+
+    try:
+        rcon = RconClient(args.rcon_host, args.rcon_port, args.rcon_password)
+    except OSError as error:
+        sys.exit("\n{0}ERROR: Could not connect to RCON: {1}{2}\n"
+                 .format(LIGHT_RED, error, COLOUR_RESET))
+
+    paused = time.monotonic()
+    failure = None
+
+    # - Saving is always turned back on, even if the capture failed after
+    #   'save-off' was sent.
+    try:
+        rcon.command("save-off")
+        paused = time.monotonic()
+        rcon.command("save-all flush")
+
+        for folder in folders:
+            staging_folder, staged_folder, folder_counts = minebackup_stage_folder(folder)
+            sources.append((staged_folder, folder))
+            counts.update(folder_counts)
+
+            if staging_folder not in staging_folders:
+                staging_folders.append(staging_folder)
+    except OSError as error:
+        failure = error
+    finally:
+        resumed = minebackup_resume_saving(rcon, args)
+        pause = time.monotonic() - paused
+
+        # Warning: The server is left with saving disabled.
+        if not resumed:
+            print("\n{0}WARNING: Could not turn saving back on. The server at {1}:{2} is "
+                  "still in 'save-off'; run 'save-on' in its console.{3}\n"
+                  .format(LIGHT_RED, args.rcon_host, args.rcon_port, COLOUR_RESET),
+                  file=sys.stderr)
+
+    if failure is not None:
+        for staging_folder in staging_folders:
+            shutil.rmtree(staging_folder, ignore_errors=True)
+        sys.exit("\n{0}ERROR: Live capture failed: {1}{2}\n"
+                 .format(LIGHT_RED, failure, COLOUR_RESET))
+
+    # Inform the user of the capture.
+    print("Captured world with saving paused for {0}{1:.3f}s{2} "
+          "({3} reflinked, {4} linked, {5} copied)."
+          .format(LIGHT_YELLOW, pause, COLOUR_RESET,
+                  counts["reflink"], counts["link"], counts["copy"]))
+
+    return sources, staging_folders
+
+
+def minebackup_resume_saving(rcon, args):
+    """
+    Turn world saving back on, reconnecting and retrying up to
+    RCON_RETRIES times if the connection fails. The connection is closed
+    afterwards. Returns whether saving was resumed.
+    """
+
+    for attempt in range(RCON_RETRIES):
+        try:
+            if rcon is None:
+                rcon = RconClient(args.rcon_host, args.rcon_port, args.rcon_password)
+            rcon.command("save-on")
+            return True
+        except (OSError, struct.error):
+            if attempt + 1 < RCON_RETRIES:
+                time.sleep(attempt + 1)
+        finally:
+            if rcon is not None:
+                rcon.close()
+                rcon = None
+
+    return False
+
+
+def minebackup_load_state():
+    """Load the incremental chain state, or return an empty state."""
+
+    if os.path.isfile(INCREMENTAL_STATE):
+        with open(INCREMENTAL_STATE) as state_file:
+            return json.load(state_file)
+
+    return {"chain": [], "files": {}, "regions": {}}
+
+
+def minebackup_save_state(state):
+    """Atomically save the incremental chain state."""
+
+    with open("{0}.tmp".format(INCREMENTAL_STATE), "w") as state_file:
+        json.dump(state, state_file)
+
+    os.replace("{0}.tmp".format(INCREMENTAL_STATE), INCREMENTAL_STATE)
 
     return 0
 
 
+def minebackup_read_region(path, indexes=None):
+    """
+    Read the header of a region file and return the timestamp of every
+    chunk (REGION_ABSENT where no chunk is stored) along with the payload
+    of each chunk in 'indexes', or of every chunk if 'indexes' is None.
+    Returns None if the region file is malformed.
+    """
+
+    with open(path, "rb") as region:
+        header = region.read(2 * REGION_SECTOR)
+
+        # Empty or truncated region files are stored as ordinary files.
+        if len(header) < 2 * REGION_SECTOR:
+            return None
+
+        locations = struct.unpack(">1024I", header[:REGION_SECTOR])
+        timestamps = list(struct.unpack(">1024I", header[REGION_SECTOR:]))
+        payloads = {}
+
+        for index, location in enumerate(locations):
+            offset, count = location >> 8, location & 0xFF
+
+            if not offset:
+                timestamps[index] = REGION_ABSENT
+                continue
+
+            if indexes is not None and index not in indexes:
+                continue
+
+            region.seek(offset * REGION_SECTOR)
+            data = region.read(count * REGION_SECTOR)
+            length = int.from_bytes(data[:4], "big")
+
+            if offset < 2 or not 0 < length <= len(data) - 4:
+                return None
+
+            payloads[index] = data[:4 + length]
+
+    return timestamps, payloads
+
+
+def minebackup_write_region(path, timestamps, payloads):
+    """Write a region file from chunk timestamps and payloads."""
+
+    locations = [0] * REGION_CHUNKS
+    header_timestamps = [0] * REGION_CHUNKS
+    body = []
+    sector = 2
+
+    for index in sorted(payloads):
+        payload = payloads[index]
+        count = -(-len(payload) // REGION_SECTOR)
+        locations[index] = (sector << 8) | count
+        header_timestamps[index] = timestamps[index]
+        body.append(payload.ljust(count * REGION_SECTOR, b"\0"))
+        sector += count
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "wb") as region:
+        region.write(struct.pack(">1024I", *locations))
+        region.write(struct.pack(">1024I", *header_timestamps))
+        region.writelines(body)
+
+    return 0
+
+
+def minebackup_region_delta(timestamps, payloads, reset):
+    """
+    Encode a region delta: a magic number and reset flag, the timestamp
+    table, the length of each included chunk payload, then the payloads.
+    """
+
+    lengths = [len(payloads.get(index, b"")) for index in range(REGION_CHUNKS)]
+
+    return b"".join([REGION_DELTA_MAGIC, struct.pack(">I", int(reset)),
+                     struct.pack(">1024I", *timestamps),
+                     struct.pack(">1024I", *lengths)]
+                    + [payloads[index] for index in sorted(payloads)])
+
+
+def minebackup_diff_region(path, previous):
+    """
+    Compare a region file with its previous state and return its chunk
+    timestamps, the payloads of chunks saved since then and an encoded
+    region delta, which is empty if nothing has changed. Returns None if
+    the region file is malformed.
+    """
+
+    header = minebackup_read_region(path, ())
+
+    if header is None:
+        return None
+
+    timestamps = header[0]
+    old_timestamps = None
+
+    if previous:
+        old_timestamps = struct.unpack(">1024I",
+                                       base64.b64decode(previous["timestamps"]))
+
+    changed = {index for index in range(REGION_CHUNKS)
+               if timestamps[index] != REGION_ABSENT
+               and (old_timestamps is None
+                    or timestamps[index] != old_timestamps[index])}
+    region = minebackup_read_region(path, changed)
+
+    if region is None:
+        return None
+
+    timestamps, payloads = region
+
+    if old_timestamps is not None and tuple(timestamps) == old_timestamps:
+        return timestamps, payloads, b""
+
+    return (timestamps, payloads,
+            minebackup_region_delta(timestamps, payloads, old_timestamps is None))
+
+
+def minebackup_add_bytes(tarball, name, data, mtime):
+    """Add an in-memory file to a tarball."""
+
+    tarinfo = tarfile.TarInfo(name)
+    tarinfo.size = len(data)
+    tarinfo.mtime = mtime
+    tarball.addfile(tarinfo, io.BytesIO(data))
+
+    return 0
+
+
+def minebackup_create_delta(sources, jobs=1, base=False):
+    """
+    Create the next backup within the incremental chain. Region files are
+    compared chunk by chunk using the timestamp table in their header,
+    so only chunks saved since the last backup are stored. Other files
+    are stored whole when their size or modification time has changed.
+    """
+
+    os.makedirs(INCREMENTAL_FOLDER, exist_ok=True)
+    state = minebackup_load_state()
+
+    # Start a new chain when no base snapshot exists.
+    base = base or not state["chain"]
+    previous_files = {} if base else state["files"]
+    previous_regions = {} if base else state["regions"]
+    files = {}
+    regions = {}
+    counts = {"files": 0, "chunks": 0}
+
+    current_time = minebackup_timestamp()
+    delta_name = "Minecraft_{0}{1}.tar.gz".format(current_time,
+                                                 "_base" if base else "")
+    delta_path = "{0}/{1}".format(INCREMENTAL_FOLDER, delta_name)
+
+    # Error: A backup was already created within the last second.
+    if os.path.exists(delta_path):
+        sys.exit("\n{0}ERROR: Backup '{1}' already exists.{2}\n"
+                 .format(LIGHT_RED, delta_name, COLOUR_RESET))
+
+    with open(delta_path, "wb", buffering=BUFFER_SIZE) as output:
+        writer = HashingWriter(output)
+        compressor = ParallelGzipWriter(writer, jobs)
+
+        with tarfile.open(fileobj=compressor, mode="w|",
+                          bufsize=BUFFER_SIZE) as tarball:
+            tarball.copybufsize = BUFFER_SIZE
+
+            for source, original_source in sources:
+                for root, folders, names in os.walk(source):
+                    folders.sort()
+
+                    for name in sorted(names):
+                        path = os.path.join(root, name)
+                        relative_path = minebackup_relative_name(
+                            os.path.join(original_source, os.path.relpath(path, source)))
+                        # - Symbolic links and other special files are skipped, so
+                        #   a dangling link cannot stop the backup and a link is
+                        #   never stored as a copy of its target.
+                        try:
+                            status = os.lstat(path)
+                        except FileNotFoundError:
+                            continue
+
+                        if not stat.S_ISREG(status.st_mode):
+                            print("Skipped {0}{1}{2}, which is not a regular file."
+                                  .format(LIGHT_YELLOW, relative_path, COLOUR_RESET))
+                            continue
+
+                        signature = [status.st_size, status.st_mtime_ns]
+
+                        if name.endswith(REGION_EXTENSIONS):
+                            previous = previous_regions.get(relative_path)
+
+                            # Unchanged region files are not even opened.
+                            if previous and previous["signature"] == signature:
+                                regions[relative_path] = previous
+                                continue
+
+                            region = minebackup_diff_region(path, previous)
+
+                            if region is not None:
+                                timestamps, payloads, delta = region
+                                regions[relative_path] = {
+                                    "signature": signature,
+                                    "timestamps": base64.b64encode(
+                                        struct.pack(">1024I", *timestamps)).decode()}
+
+                                if delta:
+                                    minebackup_add_bytes(
+                                        tarball, "regions/{0}".format(relative_path),
+                                        delta, status.st_mtime)
+                                    counts["chunks"] += len(payloads)
+                                continue
+
+                        # Malformed region files are stored whole.
+                        files[relative_path] = signature
+
+                        if previous_files.get(relative_path) != signature:
+                            tarball.add(path, arcname="files/{0}".format(relative_path))
+                            counts["files"] += 1
+
+            # - Record the files which have been removed since the last
+            #   backup, once the tree has been walked.
+            removed = sorted((set(previous_files) | set(previous_regions))
+                             - (set(files) | set(regions)))
+            delta = {"created": current_time, "base": base, "removed": removed}
+            minebackup_add_bytes(tarball, "delta.json",
+                                 json.dumps(delta).encode(), int(datetime.datetime.now().timestamp()))
+
+        compressor.close()
+        output.flush()
+        os.fsync(output.fileno())
+
+    # Discard the backup if nothing has changed since the last one.
+    if not (base or counts["files"] or counts["chunks"] or removed):
+        os.remove(delta_path)
+        print("No changes since the last backup.")
+        return None
+
+    # Record the new backup within the chain.
+    state["chain"].append({"name": delta_name, "base": base,
+                           "sha512": writer.hexdigest()})
+    state["files"] = files
+    state["regions"] = regions
+    minebackup_save_state(state)
+
+    # Inform the user of archive creation.
+    print("Created {0} backup {1}{2}{3} ({4} files, {5} chunks, {6} removed)."
+          .format("base" if base else "incremental", LIGHT_YELLOW, delta_path, COLOUR_RESET,
+                  counts["files"], counts["chunks"], len(removed)))
+
+    return delta_name
+
+
+def minebackup_apply_region(path, data):
+    """Apply a region delta to a restored region file."""
+
+    reset = struct.unpack(">I", data[4:8])[0]
+    timestamps = struct.unpack(">1024I", data[8:8 + REGION_SECTOR])
+    lengths = struct.unpack(">1024I", data[8 + REGION_SECTOR:8 + 2 * REGION_SECTOR])
+    payloads = {}
+
+    if not reset and os.path.isfile(path):
+        region = minebackup_read_region(path)
+        if region is not None:
+            payloads = region[1]
+
+    position = 8 + 2 * REGION_SECTOR
+
+    for index in range(REGION_CHUNKS):
+        if timestamps[index] == REGION_ABSENT:
+            payloads.pop(index, None)
+        elif lengths[index]:
+            payloads[index] = data[position:position + lengths[index]]
+            position += lengths[index]
+
+    minebackup_write_region(path, timestamps, payloads)
+
+    return 0
+
+
+def minebackup_restore(point, destination):
+    """
+    Restore an incremental backup to a destination folder by applying
+    the chain from its base snapshot up to the requested point.
+    """
+
+    chain = minebackup_load_state()["chain"]
+    names = [entry["name"] for entry in chain]
+
+    # Error: Restore point does not exist.
+    if not chain or (point != "latest" and point not in names):
+        sys.exit("\n{0}ERROR: Restore point '{1}' not found.{2}\n"
+                 .format(LIGHT_RED, point, COLOUR_RESET))
+
+    end = len(chain) - 1 if point == "latest" else names.index(point)
+    start = max(index for index in range(end + 1) if chain[index]["base"])
+
+    # Verify every backup in the chain before anything is written.
+    for entry in chain[start:end + 1]:
+        digest = hashlib.sha512()
+        try:
+            with open("{0}/{1}".format(INCREMENTAL_FOLDER, entry["name"]), "rb") as archive:
+                for block in iter(lambda: archive.read(BUFFER_SIZE), b""):
+                    digest.update(block)
+        except OSError as error:
+            sys.exit("\n{0}ERROR: Backup '{1}' could not be read: {2}{3}\n"
+                     .format(LIGHT_RED, entry["name"], error, COLOUR_RESET))
+
+        # Error: Backup is corrupt.
+        if digest.hexdigest() != entry["sha512"]:
+            sys.exit("\n{0}ERROR: Backup '{1}' failed verification.{2}\n"
+                     .format(LIGHT_RED, entry["name"], COLOUR_RESET))
+
+    for entry in chain[start:end + 1]:
+        print("Applying {0}{1}{2}...".format(LIGHT_YELLOW, entry["name"], COLOUR_RESET))
+        delta = {"removed": []}
+
+        # The backups are multi-member gzip files, which GzipFile reads.
+        with gzip.open("{0}/{1}".format(INCREMENTAL_FOLDER, entry["name"])) as stream, \
+                tarfile.open(fileobj=stream, mode="r|") as tarball:
+            for tarinfo in tarball:
+                if tarinfo.name == "delta.json":
+                    delta = json.load(tarball.extractfile(tarinfo))
+
+                elif tarinfo.name.startswith("regions/"):
+                    minebackup_apply_region(
+                        os.path.join(destination, tarinfo.name[len("regions/"):]),
+                        tarball.extractfile(tarinfo).read())
+
+                elif tarinfo.name.startswith("files/"):
+                    tarinfo.name = tarinfo.name[len("files/"):]
+                    tarball.extract(tarinfo, destination, set_attrs=False, filter="data")
+                    os.utime(os.path.join(destination, tarinfo.name),
+                             (tarinfo.mtime, tarinfo.mtime))
+
+        for relative_path in delta["removed"]:
+            if os.path.isfile(os.path.join(destination, relative_path)):
+                os.remove(os.path.join(destination, relative_path))
+
+    print("Restored {0}{1}{2} to {3}{4}{5}.".format(LIGHT_YELLOW, names[end], COLOUR_RESET,
+                                                    LIGHT_YELLOW, destination, COLOUR_RESET))
+
+    return 0
+
 #############
 # Kickstart #
 #############
 
-minebackup_main()
+if __name__ == '__main__':
+    minebackup_main()
 
 # End of File.
@@ -27,11 +27,23 @@
 # Imports #
 ###########
 
+import argparse
+import concurrent.futures
 import datetime
+import getpass
 import glob
+import hashlib
+import json
 import os
+import socket
+import stat
 import subprocess
 import sys
+import threading
+import zlib
+
+from pycommon import (BOLD, COLOUR_RESET, HOME, LIGHT_GREEN, LIGHT_RED, LIGHT_YELLOW, SCRIPT_URL,
+                      YELLOW, clear)
 
 #############
 # Variables #
@@ -39,298 +51,710 @@ import sys
 
 # Script Metadata
 SCRIPT_VERSION = '0.2.4'
-SCRIPT_URL = 'https://github.com/ultraviolet-1968/shell_scripts'
-
-# String Colors
-BLUE = '\033[0;34m'
-CYAN = '\033[0;36m'
-GREEN = '\033[0;32m'
-MAGENTA = '\033[0;35m'
-RED = '\033[0;31m'
-YELLOW = '\033[0;33m'
-
-LIGHT_BLUE = '\033[0;94m'
-LIGHT_CYAN = '\033[0;96m'
-LIGHT_GREEN = '\033[0;92m'
-LIGHT_MAGENTA = '\033[0;95m'
-LIGHT_RED = '\033[0;91m'
-LIGHT_YELLOW = '\033[0;93m'
-
-BLACK = '\033[0;30m'
-GREY = '\033[0;90m'
-WHITE = '\033[0;97m'
-
-# String Formatting
-BOLD = '\033[1m'
-UNDERLINE = '\033[4m'
 
-COLOUR_RESET = '\033[0;m'
+# Command-line arguments.
+PARSER = argparse.ArgumentParser()
+PARSER.add_argument('-s', '--store', choices=('zip', 'chunk'), default='zip',
+                    help="Store folders as 'zip' archives or in a deduplicating 'chunk' store.")
+PARSER.add_argument('-r', '--restore', nargs=2, metavar=('SNAPSHOT', 'DESTINATION'),
+                    help="Restore a chunk store snapshot to a destination folder.")
+PARSER.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                    help="Number of folders to back up at once (default: all CPUs).")
+PARSER.add_argument('--device-jobs', type=int, default=2,
+                    help="Number of folders to back up at once per source device.")
+PARSER.add_argument('-f', '--full', action='store_true',
+                    help="Back up every folder, even if it has not changed.")
+
+# Scheduled Backup Jobs
+BACKUP_JOBS = []
+
+# Tree-State Index
+TREE_INDEX = {}
+TREE_INDEX_FILE = '.pybackup_index.json'
+TREE_INDEX_LOCK = threading.Lock()
+
+# Archive Digest Cache
+DIGEST_CACHE = {}
+DIGEST_CACHE_FILE = '.pybackup_digests.json'
+DIGEST_CACHE_LOCK = threading.Lock()
+
+# Chunk Store Settings
+CHUNK_MIN_SIZE = 1024 * 1024
+CHUNK_MAX_SIZE = 4 * 1024 * 1024
+# Boundaries are found in two steps which run at C speed. Every byte is
+# translated to one pseudo-random bit, and the bit string is searched for
+# CHUNK_ANCHOR, which matches about once in 256 bytes. A candidate becomes a
+# boundary when the CRC32 of the CHUNK_WINDOW bytes before it also matches
+# CHUNK_MASK, so chunks average about 1 in 2^18 bytes past the minimum size.
+CHUNK_MASK = (1 << 10) - 1
+CHUNK_WINDOW = 48
+CHUNK_BITS = bytes(hashlib.sha256(bytes([i])).digest()[0] & 1 for i in range(256))
+CHUNK_ANCHOR = bytes((1, 0, 1, 1, 0, 0, 1, 0))
+READ_SIZE = 8 * 1024 * 1024
 
 # Linux Environmental Variables
-# NOTE Ubuntu does not 'see' these variables. Export them first.
-DESKTOP = os.environ['XDG_CURRENT_DESKTOP']
-HOME = os.environ['HOME']
-HOSTNAME = os.environ['HOSTNAME'].upper()
-USER = os.environ['USER']
+# NOTE Ubuntu does not export HOSTNAME, so the system's name is used instead.
+DESKTOP = os.environ.get('XDG_CURRENT_DESKTOP', '')
+HOSTNAME = (os.environ.get('HOSTNAME') or socket.gethostname()).upper()
+USER = os.environ.get('USER') or getpass.getuser()
 
 #############
 # Functions #
 #############
 
 
-def clear():
-    """Clear the current Terminal window."""
-    os.system('clear')
-
-
-def backup_dconf_settings():
-    """Create a file containing common GTK desktop settings."""
+def backup_dconf_settings(backup):
+    """Create a file containing common GTK desktop settings in a backup folder."""
     dconf_dump_file = 'dconf_dump.txt'
-    dconf_dump_command = f'dconf dump / > {BACKUP}/{dconf_dump_file}'
+    dconf_dump_command = f'dconf dump / > {backup}/{dconf_dump_file}'
 
     if DESKTOP != 'KDE':
         subprocess.run(dconf_dump_command, shell=True, check=True)
-        print(f'Created Settings File {YELLOW}{BACKUP}/{dconf_dump_file}{COLOUR_RESET}.')
+        print(f'Created Settings File {YELLOW}{backup}/{dconf_dump_file}{COLOUR_RESET}.')
 
 
-def backup_folder(archive_name, folder_to_compress):
-    """Create a compressed archive of a target folder."""
+def backup_folder(archive_name, folder_to_compress, state=None, store='zip', full=False):
+    """
+    Create a compressed archive of a target folder, or a snapshot in the
+    chunk store if store is 'chunk'. Unless full is set, the previous
+    archive is reused if the folder's tree state matches the index.
+    """
     now = datetime.datetime.now()
     date = f"{now.year:04d}{now.month:02d}{now.day:02d}"
     timestamp = f"{now.hour:02d}{now.minute:02d}{now.second:02d}"
     current_time = f"{date}T{timestamp}Z"
+    reference = None
+
+    if state and not full:
+        previous = TREE_INDEX.get(folder_to_compress)
+        if (previous and previous['signature'] == state['signature']
+                and previous['store'] == store and os.path.exists(previous['reference'])):
+            print(f'Unchanged {YELLOW}{folder_to_compress}{COLOUR_RESET}, '
+                  f'reusing {YELLOW}{previous["reference"]}{COLOUR_RESET}.')
+            return previous['reference']
 
     if os.path.exists(folder_to_compress) and os.path.isdir(folder_to_compress):
-        if os.listdir(folder_to_compress):
-            subprocess.run(f'zip -q -r "{archive_name}_{current_time}.zip" "{folder_to_compress}"',
-                           shell=True, check=True)
-            print(f'Created Archive {YELLOW}{archive_name}_{current_time}.zip{COLOUR_RESET}.')
+        if os.listdir(folder_to_compress) and store == 'chunk':
+            reference = chunk_store_snapshot(archive_name, folder_to_compress, current_time)
+            print(f'Created Snapshot {YELLOW}{reference}{COLOUR_RESET}.')
+        elif os.listdir(folder_to_compress):
+            reference = f'{archive_name}_{current_time}.zip'
+            create_zip_archive(reference, folder_to_compress)
+            print(f'Created Archive {YELLOW}{reference}{COLOUR_RESET}.')
+
+    if state and reference:
+        with TREE_INDEX_LOCK:
+            TREE_INDEX[folder_to_compress] = dict(state, store=store, reference=reference)
+
+    return reference
+
+
+def create_zip_archive(archive_path, folder_to_compress):
+    """
+    Create a zip archive of a folder, hashing the archive as it is written
+    and recording its digest in the digest cache.
+    """
+    digest = hashlib.sha512()
+    zip_command = ['zip', '-q', '-r', '-', folder_to_compress]
+
+    try:
+        with open(archive_path, 'wb') as archive, \
+                subprocess.Popen(zip_command, stdout=subprocess.PIPE) as process:
+            for block in iter(lambda: process.stdout.read(READ_SIZE), b''):
+                digest.update(block)
+                archive.write(block)
+
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, zip_command)
+    except BaseException:
+        if os.path.exists(archive_path):
+            os.remove(archive_path)
+        raise
+
+    status = os.stat(archive_path)
+    with DIGEST_CACHE_LOCK:
+        DIGEST_CACHE[os.path.basename(archive_path)] = {
+            'size': status.st_size, 'mtime_ns': status.st_mtime_ns, 'sha512': digest.hexdigest()}
+
+
+def scan_folder(folder):
+    """
+    Walk a folder with 'os.scandir' and return its file count, total size,
+    latest modification time and a signature of every entry's path,
+    modification time, inode and size.
+    """
+    status = os.stat(folder)
+    signatures = [f'{folder}\0{status.st_mtime_ns}\0{status.st_ino}\0{status.st_size}']
+    files = 0
+    total = 0
+    latest = status.st_mtime_ns
+    folders = [folder]
+
+    while folders:
+        try:
+            entries = os.scandir(folders.pop())
+        except OSError:
+            continue
+
+        with entries:
+            for entry in entries:
+                status = entry.stat(follow_symlinks=False)
+                signatures.append(f'{entry.path}\0{status.st_mtime_ns}\0{status.st_ino}\0{status.st_size}')
+                latest = max(latest, status.st_mtime_ns)
+
+                if entry.is_dir(follow_symlinks=False):
+                    folders.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    files += 1
+                    total += status.st_size
+
+    signatures.sort()
+    signature = hashlib.sha256('\n'.join(signatures).encode('utf-8', 'surrogateescape'))
+
+    return {'files': files, 'size': total, 'latest_mtime_ns': latest,
+            'signature': signature.hexdigest()}
+
+
+def load_tree_index(backup):
+    """Load the tree-state index from the backup folder."""
+    try:
+        with open(f'{backup}/{TREE_INDEX_FILE}') as index_file:
+            TREE_INDEX.update(json.load(index_file))
+    except (OSError, ValueError):
+        pass
+
+
+def load_digest_cache(backup):
+    """Load the archive digest cache from the backup folder."""
+    try:
+        with open(f'{backup}/{DIGEST_CACHE_FILE}') as cache_file:
+            DIGEST_CACHE.update(json.load(cache_file))
+    except (OSError, ValueError):
+        pass
+
+
+def save_digest_cache(backup):
+    """Save the archive digest cache to the backup folder."""
+    with open(f'{backup}/{DIGEST_CACHE_FILE}.tmp', 'w') as cache_file:
+        json.dump(DIGEST_CACHE, cache_file, indent=2, sort_keys=True)
+    os.replace(f'{backup}/{DIGEST_CACHE_FILE}.tmp', f'{backup}/{DIGEST_CACHE_FILE}')
+
+
+def save_tree_index(backup):
+    """Save the tree-state index to the backup folder."""
+    with open(f'{backup}/{TREE_INDEX_FILE}.tmp', 'w') as index_file:
+        json.dump(TREE_INDEX, index_file, indent=2, sort_keys=True)
+    os.replace(f'{backup}/{TREE_INDEX_FILE}.tmp', f'{backup}/{TREE_INDEX_FILE}')
+
+
+def schedule_backup(archive_name, folder_to_compress):
+    """Add a folder to the list of folders to be backed up."""
+    BACKUP_JOBS.append((archive_name, folder_to_compress))
+
 
+def run_backup_jobs(jobs, workers, device_workers, store='zip', full=False):
+    """
+    Back up folders concurrently on a bounded worker pool, largest first,
+    with a limit on the number of folders read at once from each device.
+    Failures are collected and returned rather than stopping the run.
+    """
+    pending = []
+    for archive_name, folder_to_compress in jobs:
+        if os.path.isdir(folder_to_compress):
+            state = scan_folder(folder_to_compress)
+            pending.append((state['size'], os.stat(folder_to_compress).st_dev,
+                            archive_name, folder_to_compress, state))
 
-def create_checksum():
-    """Create a SHA512 checksum of the BACKUP archive(s)."""
-    if glob.glob(f'{BACKUP}/*.zip'):
+    pending.sort(key=lambda job: job[0], reverse=True)
+
+    running = {}
+    device_running = {}
+    failures = []
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        while pending or running:
+            # Start the largest jobs whose source device has capacity.
+            for job in list(pending):
+                if len(running) >= workers:
+                    break
+                if device_running.get(job[1], 0) >= device_workers:
+                    continue
+
+                pending.remove(job)
+                device_running[job[1]] = device_running.get(job[1], 0) + 1
+                running[executor.submit(backup_folder, job[2], job[3], job[4], store, full)] = job
+
+            done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+
+            for future in done:
+                job = running.pop(future)
+                device_running[job[1]] -= 1
+
+                if future.exception():
+                    failures.append((job[3], future.exception()))
+
+    return failures
+
+
+def create_checksum(backup):
+    """
+    Create a SHA512 checksum of the archive(s) in a backup folder. Digests are taken
+    from the digest cache, so only archives which are new or have changed
+    since they were cached are read.
+    """
+    archives = sorted(os.path.basename(path) for path in glob.glob(f'{glob.escape(backup)}/*.zip'))
+
+    if archives:
         sha512sum_file = 'BACKUP.sha512sum'
-        sha512sum_command = f'sha512sum *.zip > "{BACKUP}/{sha512sum_file}"'
 
-        previous_directory = os.getcwd()
-        os.chdir(f"{BACKUP}")
-        subprocess.run(sha512sum_command, shell=True, check=True)
-        os.chdir(f'{previous_directory}')
+        for name in list(DIGEST_CACHE):
+            if name not in archives:
+                del DIGEST_CACHE[name]
 
-        print(f'Created Checksum {YELLOW}{BACKUP}/{sha512sum_file}{COLOUR_RESET}.')
+        with open(f'{backup}/{sha512sum_file}', 'w') as checksum_file:
+            for name in archives:
+                status = os.stat(f'{backup}/{name}')
+                cached = DIGEST_CACHE.get(name)
+
+                if not cached or (cached['size'], cached['mtime_ns']) != (status.st_size,
+                                                                         status.st_mtime_ns):
+                    digest = hashlib.sha512()
+                    with open(f'{backup}/{name}', 'rb') as archive:
+                        for block in iter(lambda: archive.read(READ_SIZE), b''):
+                            digest.update(block)
+                    cached = DIGEST_CACHE[name] = {'size': status.st_size,
+                                                   'mtime_ns': status.st_mtime_ns,
+                                                   'sha512': digest.hexdigest()}
+
+                checksum_file.write(f"{cached['sha512']}  {name}\n")
+
+        save_digest_cache(backup)
+
+        print(f'Created Checksum {YELLOW}{backup}/{sha512sum_file}{COLOUR_RESET}.')
     else:
         pass
 
+
+def chunk_boundaries(data):
+    """
+    Split a buffer into content-defined chunks and return the length of
+    each chunk. A boundary depends only on the bytes just before it, so
+    inserting data only moves the boundaries near the change. The final
+    chunk is returned even if no boundary was found, so callers may carry
+    it over.
+    """
+    bits = data.translate(CHUNK_BITS)
+    lengths = []
+    start = 0
+    end = len(data)
+
+    while end - start > CHUNK_MIN_SIZE:
+        limit = min(start + CHUNK_MAX_SIZE, end)
+        position = limit
+        candidate = bits.find(CHUNK_ANCHOR, start + CHUNK_MIN_SIZE - len(CHUNK_ANCHOR), limit)
+
+        while candidate != -1:
+            cut = candidate + len(CHUNK_ANCHOR)
+            if not zlib.crc32(data[cut - CHUNK_WINDOW:cut]) & CHUNK_MASK:
+                position = cut
+                break
+            candidate = bits.find(CHUNK_ANCHOR, candidate + 1, limit)
+
+        lengths.append(position - start)
+        start = position
+
+    if start < end:
+        lengths.append(end - start)
+
+    return lengths
+
+
+def chunk_store_write(chunks_folder, chunk):
+    """Store a compressed chunk once, addressed by its SHA256 digest."""
+    digest = hashlib.sha256(chunk).hexdigest()
+    chunk_path = f'{chunks_folder}/{digest[:2]}/{digest}'
+
+    if not os.path.exists(chunk_path):
+        os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+        temporary_path = f'{chunk_path}.{threading.get_ident()}.tmp'
+        with open(temporary_path, 'wb') as chunk_file:
+            chunk_file.write(zlib.compress(chunk))
+        os.replace(temporary_path, chunk_path)
+
+    return digest
+
+
+def chunk_store_file(chunks_folder, file_path):
+    """Split a file into content-defined chunks and store each chunk."""
+    digests = []
+    pending = b''
+
+    with open(file_path, 'rb') as source:
+        while True:
+            data = source.read(READ_SIZE)
+            buffer = pending + data
+            lengths = chunk_boundaries(buffer)
+
+            # Carry the trailing partial chunk over to the next read.
+            if data and lengths:
+                lengths.pop()
+
+            offset = 0
+            for length in lengths:
+                digests.append(chunk_store_write(chunks_folder, buffer[offset:offset + length]))
+                offset += length
+
+            pending = buffer[offset:]
+
+            if not data:
+                break
+
+    return digests
+
+
+def chunk_store_previous(snapshots_folder, name):
+    """Return the file entries of the latest snapshot for a folder, by path."""
+    snapshots = sorted(glob.glob(f'{glob.escape(snapshots_folder)}/{glob.escape(name)}_*.json'))
+
+    if not snapshots:
+        return {}
+
+    with open(snapshots[-1]) as snapshot_file:
+        snapshot = json.load(snapshot_file)
+
+    return {entry['path']: entry for entry in snapshot['files']}
+
+
+def chunk_store_snapshot(archive_name, folder_to_compress, current_time):
+    """
+    Store a folder in the deduplicating chunk store and record a snapshot
+    manifest. Files whose size, modification time and inode match the
+    previous snapshot reuse its chunk list without being read.
+    """
+    store_folder = os.path.dirname(archive_name)
+    name = os.path.basename(archive_name)
+    chunks_folder = f'{store_folder}/chunks'
+    snapshots_folder = f'{store_folder}/snapshots'
+    previous = chunk_store_previous(snapshots_folder, name)
+    snapshot = {'source': folder_to_compress, 'created': current_time,
+                'directories': [], 'symlinks': [], 'files': []}
+
+    for root, directories, files in os.walk(folder_to_compress):
+        directories.sort()
+        relative_root = os.path.relpath(root, folder_to_compress)
+
+        for entry_name in sorted(directories + files):
+            path = os.path.join(root, entry_name)
+            relative_path = os.path.normpath(os.path.join(relative_root, entry_name))
+            status = os.lstat(path)
+            entry = {'path': relative_path, 'mode': stat.S_IMODE(status.st_mode),
+                     'mtime_ns': status.st_mtime_ns}
+
+            if stat.S_ISLNK(status.st_mode):
+                entry['target'] = os.readlink(path)
+                snapshot['symlinks'].append(entry)
+            elif stat.S_ISDIR(status.st_mode):
+                snapshot['directories'].append(entry)
+            elif stat.S_ISREG(status.st_mode):
+                entry['size'] = status.st_size
+                entry['inode'] = status.st_ino
+                old_entry = previous.get(relative_path)
+
+                if old_entry and all(old_entry.get(key) == entry[key]
+                                     for key in ('size', 'mtime_ns', 'inode')):
+                    entry['chunks'] = old_entry['chunks']
+                else:
+                    entry['chunks'] = chunk_store_file(chunks_folder, path)
+
+                snapshot['files'].append(entry)
+
+    os.makedirs(snapshots_folder, exist_ok=True)
+    snapshot_path = f'{snapshots_folder}/{name}_{current_time}.json'
+
+    with open(f'{snapshot_path}.tmp', 'w') as snapshot_file:
+        json.dump(snapshot, snapshot_file)
+    os.replace(f'{snapshot_path}.tmp', snapshot_path)
+
+    return snapshot_path
+
+
+def restore_snapshot(snapshot_path, destination):
+    """Rebuild the folder recorded by a chunk store snapshot."""
+    chunks_folder = f'{os.path.dirname(os.path.dirname(os.path.abspath(snapshot_path)))}/chunks'
+
+    with open(snapshot_path) as snapshot_file:
+        snapshot = json.load(snapshot_file)
+
+    os.makedirs(destination, exist_ok=True)
+
+    for entry in snapshot['directories']:
+        os.makedirs(os.path.join(destination, entry['path']), exist_ok=True)
+
+    for entry in snapshot['files']:
+        file_path = os.path.join(destination, entry['path'])
+
+        with open(file_path, 'wb') as target:
+            for digest in entry['chunks']:
+                with open(f'{chunks_folder}/{digest[:2]}/{digest}', 'rb') as chunk_file:
+                    chunk = zlib.decompress(chunk_file.read())
+
+                if hashlib.sha256(chunk).hexdigest() != digest:
+                    sys.exit(f"{LIGHT_RED}ERROR: Chunk {digest} is corrupt{COLOUR_RESET}\n")
+
+                target.write(chunk)
+
+        os.chmod(file_path, entry['mode'])
+        os.utime(file_path, ns=(entry['mtime_ns'], entry['mtime_ns']))
+
+    for entry in snapshot['symlinks']:
+        link_path = os.path.join(destination, entry['path'])
+        if os.path.lexists(link_path):
+            os.remove(link_path)
+        os.symlink(entry['target'], link_path)
+
+    # Apply directory metadata last, deepest first, so writes do not alter it.
+    for entry in reversed(snapshot['directories']):
+        directory_path = os.path.join(destination, entry['path'])
+        os.chmod(directory_path, entry['mode'])
+        os.utime(directory_path, ns=(entry['mtime_ns'], entry['mtime_ns']))
+
+    print(f'Restored Snapshot {YELLOW}{snapshot_path}{COLOUR_RESET} to {YELLOW}{destination}{COLOUR_RESET}.')
+
 #############
 # Kickstart #
 #############
 
-clear()
+if __name__ == '__main__':
+    # Parse command-line arguments.
+    ARGS = PARSER.parse_args()
 
-# Display script header.
-print(f'{BOLD}Linux Home Folder Backup Utility {SCRIPT_VERSION}{COLOUR_RESET}')
-print('Copyright (C) 2020 William Whinn')
-print(f"{SCRIPT_URL}\n")
+    # Validate the number of concurrent jobs.
+    if ARGS.jobs < 1 or ARGS.device_jobs < 1:
+        sys.exit(f"{LIGHT_RED}ERROR: Jobs must be a positive number{COLOUR_RESET}\n")
 
-# Select Backup Location.
-print(f'  {LIGHT_GREEN}1.{COLOUR_RESET} Local Disk (Home Folder)')
-print(f'  {LIGHT_GREEN}2.{COLOUR_RESET} External Media (Hostname as Disk Label)\n')
-print(f'  {LIGHT_RED}X.{COLOUR_RESET} Exit Program\n')
+    # Restore a chunk store snapshot and exit.
+    if ARGS.restore:
+        restore_snapshot(*ARGS.restore)
+        sys.exit()
+
+    clear()
+
+    # Display script header.
+    print(f'{BOLD}Linux Home Folder Backup Utility {SCRIPT_VERSION}{COLOUR_RESET}')
+    print('Copyright (C) 2020 William Whinn')
+    print(f"{SCRIPT_URL}\n")
+
+    # Select Backup Location.
+    print(f'  {LIGHT_GREEN}1.{COLOUR_RESET} Local Disk (Home Folder)')
+    print(f'  {LIGHT_GREEN}2.{COLOUR_RESET} External Media (Hostname as Disk Label)\n')
+    print(f'  {LIGHT_RED}X.{COLOUR_RESET} Exit Program\n')
+
+    ANSWER = input("Please enter your selection: ")
+
+    if ANSWER == '1':
+        print()
+        BACKUP = f'{HOME}/Backup_{HOSTNAME}'
+    elif ANSWER == '2':
+        print()
+        BACKUP = f'/run/media/{USER}/{HOSTNAME}/Backup_{1}'
+    elif ANSWER in ('X', 'x'):
+        clear()
+        sys.exit()
+    else:
+        print()
+        sys.exit(f"{LIGHT_RED}ERROR: Incorrect response{COLOUR_RESET}\n")
 
-ANSWER = input("Please enter your selection: ")
+    # Create Backup Location.
+    if not os.path.exists(BACKUP):
+        os.makedirs(BACKUP)
 
-if ANSWER == '1':
-    print()
-    BACKUP = f'{HOME}/Backup_{HOSTNAME}'
-elif ANSWER == '2':
-    print()
-    BACKUP = f'/run/media/{USER}/{HOSTNAME}/Backup_{1}'
-elif ANSWER in ('X', 'x'):
     clear()
-    sys.exit()
-else:
-    print()
-    sys.exit(f"{LIGHT_RED}ERROR: Incorrect response{COLOUR_RESET}\n")
-
-# Create Backup Location.
-if not os.path.exists(BACKUP):
-    os.makedirs(BACKUP)
-
-clear()
-print(f"{LIGHT_YELLOW}Now performing backup of Home Folder data. Please Wait...{COLOUR_RESET}\n")
-
-# Record GTK-based desktop settings.
-backup_dconf_settings()
-
-# Home 'bin' folder.
-BIN_DATA_FOLDER = f'{HOME}/bin'
-BIN_DATA_ARCHIVE = f'{BACKUP}/bin'
-backup_folder(BIN_DATA_ARCHIVE, BIN_DATA_FOLDER)
-
-# Backup Dwarf Fortress (Snap).
-DF_DATA_FOLDER = f'{HOME}/snap/dwarffortress'
-DF_DATA_ARCHIVE = f'{BACKUP}/DwarfFortressSnap'
-backup_folder(DF_DATA_ARCHIVE, DF_DATA_FOLDER)
-
-# Backup GIMP (Flatpak).
-GIMP_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.gimp.GIMP'
-GIMP_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/GIMPFlatpakBackup'
-backup_folder(GIMP_FLATPAK_DATA_ARCHIVE, GIMP_FLATPAK_DATA_FOLDER)
-
-# Backup GNOME Calculator (Flatpak).
-GNOMECALC_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.gnome.Calculator'
-GNOMECALC_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/GNOMECalculatorFlatpakBackup'
-backup_folder(GNOMECALC_FLATPAK_DATA_ARCHIVE, GNOMECALC_FLATPAK_DATA_FOLDER)
-
-# Backup GNOME Calendar (Flatpak).
-GNOMECALENDAR_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.gnome.Calendar'
-GNOMECALENDAR_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/GNOMECalendarFlatpakBackup'
-backup_folder(GNOMECALENDAR_FLATPAK_DATA_ARCHIVE, GNOMECALENDAR_FLATPAK_DATA_FOLDER)
-
-# Backup GNOME Clocks (Flatpak).
-GNOMECLOCKS_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.gnome.clocks'
-GNOMECLOCKS_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/GNOMEClocksFlatpakBackup'
-backup_folder(GNOMECLOCKS_FLATPAK_DATA_ARCHIVE, GNOMECLOCKS_FLATPAK_DATA_FOLDER)
-
-# Backup GNOME Contacts (Flatpak).
-GNOMECONTACTS_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.gnome.Contacts'
-GNOMECONTACTS_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/GNOMEContactsFlatpakBackup'
-backup_folder(GNOMECONTACTS_FLATPAK_DATA_ARCHIVE, GNOMECONTACTS_FLATPAK_DATA_FOLDER)
-
-# Backup Microsoft Edge.
-EDGE_DATA_FOLDER = f'{HOME}/.config/microsoft-edge'
-EDGE_DATA_ARCHIVE = f'{BACKUP}/MicrosoftEdge'
-backup_folder(EDGE_DATA_ARCHIVE, EDGE_DATA_FOLDER)
-
-# Backup Evince (Flatpak).
-EVINCE_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.gnome.Evince'
-EVINCE_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/EvinceFlatpakBackup'
-backup_folder(EVINCE_FLATPAK_DATA_ARCHIVE, EVINCE_FLATPAK_DATA_FOLDER)
-
-# Backup Evolution (Flatpak).
-EVOLUTION_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.gnome.Evolution'
-EVOLUTION_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/EvolutionFlatpakBackup'
-backup_folder(EVOLUTION_FLATPAK_DATA_ARCHIVE, EVOLUTION_FLATPAK_DATA_FOLDER)
-
-# Backup Firefox (Native).
-FIREFOX_DATA_FOLDER = f'{HOME}/.mozilla'
-FIREFOX_DATA_ARCHIVE = f'{BACKUP}/Firefox'
-backup_folder(FIREFOX_DATA_ARCHIVE, FIREFOX_DATA_FOLDER)
-
-# Backup Firefox (Flatpak).
-FIREFOX_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.mozilla.firefox'
-FIREFOX_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/FirefoxFlatpakBackup'
-backup_folder(FIREFOX_FLATPAK_DATA_ARCHIVE, FIREFOX_FLATPAK_DATA_FOLDER)
-
-# Backup GEdit (Flatpak).
-GEDIT_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.gnome.gedit'
-GEDIT_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/GEditFlatpakBackup'
-backup_folder(GEDIT_FLATPAK_DATA_ARCHIVE, GEDIT_FLATPAK_DATA_FOLDER)
-
-# Backup Google Chrome.
-CHROME_DATA_FOLDER = f'{HOME}/.config/google-chrome'
-CHROME_DATA_ARCHIVE = f'{BACKUP}/GoogleChrome'
-backup_folder(CHROME_DATA_ARCHIVE, CHROME_DATA_FOLDER)
-
-# Backup Inkscape (Flatpak).
-INKSCAPE_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.inkscape.Inkscape'
-INKSCAPE_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/InkscapeFlatpakBackup'
-backup_folder(INKSCAPE_FLATPAK_DATA_ARCHIVE, INKSCAPE_FLATPAK_DATA_FOLDER)
-
-# Backup LibreOffice (Flatpak).
-LIBREOFFICE_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.libreoffice.LibreOffice'
-LIBREOFFICE_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/LibreofficeFlatpakBackup'
-backup_folder(LIBREOFFICE_FLATPAK_DATA_ARCHIVE, LIBREOFFICE_FLATPAK_DATA_FOLDER)
-
-# Backup Minecraft.
-MINECRAFT_DATA_FOLDER = f'{HOME}/.minecraft'
-MINECRAFT_DATA_ARCHIVE = f'{BACKUP}/Minecraft'
-backup_folder(MINECRAFT_DATA_ARCHIVE, MINECRAFT_DATA_FOLDER)
-
-# Backup Minecraft (Flatpak).
-MINECRAFT_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/com.mojang.Minecraft'
-MINECRAFT_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/MinecraftFlatpakBackup'
-backup_folder(MINECRAFT_FLATPAK_DATA_ARCHIVE, MINECRAFT_FLATPAK_DATA_FOLDER)
-
-# Backup MultiMC (DEB Package).
-MULTIMC_DATA_FOLDER = f'{HOME}/.local/share/multimc'
-MULTIMC_DATA_ARCHIVE = f'{BACKUP}/MultiMCBackup'
-backup_folder(MULTIMC_DATA_ARCHIVE, MULTIMC_DATA_FOLDER)
-
-# Backup Notes.
-DOCUMENTS_DATA_FOLDER = f'{HOME}/Documents/Notes'
-DOCUMENTS_DATA_ARCHIVE = f'{BACKUP}/NotesBackup'
-backup_folder(DOCUMENTS_DATA_ARCHIVE, DOCUMENTS_DATA_FOLDER)
-
-# Backup NotesUp.
-NOTESUP_DATA_FOLDER = f'{HOME}/.local/share/notes-up'
-NOTESUP_DATA_ARCHIVE = f'{BACKUP}/NotesUpData'
-backup_folder(NOTESUP_DATA_ARCHIVE, NOTESUP_DATA_FOLDER)
-
-# Backup Pictures.
-PICTURES_DATA_FOLDER = f'{HOME}/Pictures'
-PICTURES_DATA_ARCHIVE = f'{BACKUP}/Pictures'
-backup_folder(PICTURES_DATA_ARCHIVE, PICTURES_DATA_FOLDER)
-
-# Backup R Libraries.
-R_DATA_FOLDER = f'{HOME}/R'
-R_DATA_ARCHIVE = f'{BACKUP}/RLibraries'
-backup_folder(R_DATA_ARCHIVE, R_DATA_FOLDER)
-
-# Backup Ren'Py.
-RENPY_SAVE_DATA_FOLDER = f'{HOME}/.renpy'
-RENPY_SAVE_DATA_ARCHIVE = f'{BACKUP}/RenPySaveData'
-backup_folder(RENPY_SAVE_DATA_ARCHIVE, RENPY_SAVE_DATA_FOLDER)
-
-# Backup RetroArch (Flatpak).
-RETROARCH_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.libretro.RetroArch'
-RETROARCH_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/RetroArchFlatpakBackup'
-backup_folder(RETROARCH_FLATPAK_DATA_ARCHIVE, RETROARCH_FLATPAK_DATA_FOLDER)
-
-# Backup RetroArch (Snap).
-RETROARCH_DATA_FOLDER = f'{HOME}/snap/retroarch'
-RETROARCH_DATA_ARCHIVE = f'{BACKUP}/RetroArchSnap'
-backup_folder(RETROARCH_DATA_ARCHIVE, RETROARCH_DATA_FOLDER)
-
-# Backup ScummVM.
-SCUMMVM_DATA_FOLDER = f'{HOME}/.local/share/scummvm'
-SCUMMVM_DATA_ARCHIVE = f'{BACKUP}/ScummVMBackup'
-backup_folder(SCUMMVM_DATA_ARCHIVE, SCUMMVM_DATA_FOLDER)
-
-# Backup ScummVM (Flatpak).
-SCUMMVM_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.scummvm.ScummVM'
-SCUMMVM_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/ScummVMFlatpakBackup'
-backup_folder(SCUMMVM_FLATPAK_DATA_ARCHIVE, SCUMMVM_FLATPAK_DATA_FOLDER)
-
-# Backup SSH Keys.
-SSHKEYS_DATA_FOLDER = f'{HOME}/.ssh'
-SSHKEYS_DATA_ARCHIVE = f'{BACKUP}/SSHKeys'
-backup_folder(SSHKEYS_DATA_ARCHIVE, SSHKEYS_DATA_FOLDER)
-
-# Backup Templates.
-TEMPLATES_DATA_FOLDER = f'{HOME}/Templates'
-TEMPLATES_DATA_ARCHIVE = f'{BACKUP}/Templates'
-backup_folder(TEMPLATES_DATA_ARCHIVE, TEMPLATES_DATA_FOLDER)
-
-# Backup Mozilla Thunderbird.
-THUNDERBIRD_DATA_FOLDER = f'{HOME}/.thunderbird'
-THUNDERBIRD_DATA_ARCHIVE = f'{BACKUP}/Thunderbird'
-backup_folder(THUNDERBIRD_DATA_ARCHIVE, THUNDERBIRD_DATA_FOLDER)
-
-# Backup VLC (Flatpak).
-VLC_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.videolan.VLC'
-VLC_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/VLCFlatpakBackup'
-backup_folder(VLC_FLATPAK_DATA_ARCHIVE, VLC_FLATPAK_DATA_FOLDER)
-
-# Backup Workspace.
-DOCUMENTS_DATA_FOLDER = f'{HOME}/Documents/Workspace'
-DOCUMENTS_DATA_ARCHIVE = f'{BACKUP}/WorkspaceBackup'
-backup_folder(DOCUMENTS_DATA_ARCHIVE, DOCUMENTS_DATA_FOLDER)
-
-create_checksum()
-
-# Final newline.
-sys.exit(f"\n{LIGHT_GREEN}Files have been backed up to {BACKUP}.{COLOUR_RESET}\n")
+    print(f"{LIGHT_YELLOW}Now performing backup of Home Folder data. Please Wait...{COLOUR_RESET}\n")
+
+    # Record GTK-based desktop settings.
+    backup_dconf_settings(BACKUP)
+
+    # Home 'bin' folder.
+    BIN_DATA_FOLDER = f'{HOME}/bin'
+    BIN_DATA_ARCHIVE = f'{BACKUP}/bin'
+    schedule_backup(BIN_DATA_ARCHIVE, BIN_DATA_FOLDER)
+
+    # Backup Dwarf Fortress (Snap).
+    DF_DATA_FOLDER = f'{HOME}/snap/dwarffortress'
+    DF_DATA_ARCHIVE = f'{BACKUP}/DwarfFortressSnap'
+    schedule_backup(DF_DATA_ARCHIVE, DF_DATA_FOLDER)
+
+    # Backup GIMP (Flatpak).
+    GIMP_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.gimp.GIMP'
+    GIMP_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/GIMPFlatpakBackup'
+    schedule_backup(GIMP_FLATPAK_DATA_ARCHIVE, GIMP_FLATPAK_DATA_FOLDER)
+
+    # Backup GNOME Calculator (Flatpak).
+    GNOMECALC_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.gnome.Calculator'
+    GNOMECALC_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/GNOMECalculatorFlatpakBackup'
+    schedule_backup(GNOMECALC_FLATPAK_DATA_ARCHIVE, GNOMECALC_FLATPAK_DATA_FOLDER)
+
+    # Backup GNOME Calendar (Flatpak).
+    GNOMECALENDAR_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.gnome.Calendar'
+    GNOMECALENDAR_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/GNOMECalendarFlatpakBackup'
+    schedule_backup(GNOMECALENDAR_FLATPAK_DATA_ARCHIVE, GNOMECALENDAR_FLATPAK_DATA_FOLDER)
+
+    # Backup GNOME Clocks (Flatpak).
+    GNOMECLOCKS_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.gnome.clocks'
+    GNOMECLOCKS_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/GNOMEClocksFlatpakBackup'
+    schedule_backup(GNOMECLOCKS_FLATPAK_DATA_ARCHIVE, GNOMECLOCKS_FLATPAK_DATA_FOLDER)
+
+    # Backup GNOME Contacts (Flatpak).
+    GNOMECONTACTS_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.gnome.Contacts'
+    GNOMECONTACTS_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/GNOMEContactsFlatpakBackup'
+    schedule_backup(GNOMECONTACTS_FLATPAK_DATA_ARCHIVE, GNOMECONTACTS_FLATPAK_DATA_FOLDER)
+
+    # Backup Microsoft Edge.
+    EDGE_DATA_FOLDER = f'{HOME}/.config/microsoft-edge'
+    EDGE_DATA_ARCHIVE = f'{BACKUP}/MicrosoftEdge'
+    schedule_backup(EDGE_DATA_ARCHIVE, EDGE_DATA_FOLDER)
+
+    # Backup Evince (Flatpak).
+    EVINCE_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.gnome.Evince'
+    EVINCE_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/EvinceFlatpakBackup'
+    schedule_backup(EVINCE_FLATPAK_DATA_ARCHIVE, EVINCE_FLATPAK_DATA_FOLDER)
+
+    # Backup Evolution (Flatpak).
+    EVOLUTION_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.gnome.Evolution'
+    EVOLUTION_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/EvolutionFlatpakBackup'
+    schedule_backup(EVOLUTION_FLATPAK_DATA_ARCHIVE, EVOLUTION_FLATPAK_DATA_FOLDER)
+
+    # Backup Firefox (Native).
+    FIREFOX_DATA_FOLDER = f'{HOME}/.mozilla'
+    FIREFOX_DATA_ARCHIVE = f'{BACKUP}/Firefox'
+    schedule_backup(FIREFOX_DATA_ARCHIVE, FIREFOX_DATA_FOLDER)
+
+    # Backup Firefox (Flatpak).
+    FIREFOX_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.mozilla.firefox'
+    FIREFOX_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/FirefoxFlatpakBackup'
+    schedule_backup(FIREFOX_FLATPAK_DATA_ARCHIVE, FIREFOX_FLATPAK_DATA_FOLDER)
+
+    # Backup GEdit (Flatpak).
+    GEDIT_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.gnome.gedit'
+    GEDIT_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/GEditFlatpakBackup'
+    schedule_backup(GEDIT_FLATPAK_DATA_ARCHIVE, GEDIT_FLATPAK_DATA_FOLDER)
+
+    # Backup Google Chrome.
+    CHROME_DATA_FOLDER = f'{HOME}/.config/google-chrome'
+    CHROME_DATA_ARCHIVE = f'{BACKUP}/GoogleChrome'
+    schedule_backup(CHROME_DATA_ARCHIVE, CHROME_DATA_FOLDER)
+
+    # Backup Inkscape (Flatpak).
+    INKSCAPE_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.inkscape.Inkscape'
+    INKSCAPE_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/InkscapeFlatpakBackup'
+    schedule_backup(INKSCAPE_FLATPAK_DATA_ARCHIVE, INKSCAPE_FLATPAK_DATA_FOLDER)
+
+    # Backup LibreOffice (Flatpak).
+    LIBREOFFICE_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.libreoffice.LibreOffice'
+    LIBREOFFICE_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/LibreofficeFlatpakBackup'
+    schedule_backup(LIBREOFFICE_FLATPAK_DATA_ARCHIVE, LIBREOFFICE_FLATPAK_DATA_FOLDER)
+
+    # Backup Minecraft.
+    MINECRAFT_DATA_FOLDER = f'{HOME}/.minecraft'
+    MINECRAFT_DATA_ARCHIVE = f'{BACKUP}/Minecraft'
+    schedule_backup(MINECRAFT_DATA_ARCHIVE, MINECRAFT_DATA_FOLDER)
+
+    # Backup Minecraft (Flatpak).
+    MINECRAFT_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/com.mojang.Minecraft'
+    MINECRAFT_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/MinecraftFlatpakBackup'
+    schedule_backup(MINECRAFT_FLATPAK_DATA_ARCHIVE, MINECRAFT_FLATPAK_DATA_FOLDER)
+
+    # Backup MultiMC (DEB Package).
+    MULTIMC_DATA_FOLDER = f'{HOME}/.local/share/multimc'
+    MULTIMC_DATA_ARCHIVE = f'{BACKUP}/MultiMCBackup'
+    schedule_backup(MULTIMC_DATA_ARCHIVE, MULTIMC_DATA_FOLDER)
+
+    # Backup Notes.
+    DOCUMENTS_DATA_FOLDER = f'{HOME}/Documents/Notes'
+    DOCUMENTS_DATA_ARCHIVE = f'{BACKUP}/NotesBackup'
+    schedule_backup(DOCUMENTS_DATA_ARCHIVE, DOCUMENTS_DATA_FOLDER)
+
+    # Backup NotesUp.
+    NOTESUP_DATA_FOLDER = f'{HOME}/.local/share/notes-up'
+    NOTESUP_DATA_ARCHIVE = f'{BACKUP}/NotesUpData'
+    schedule_backup(NOTESUP_DATA_ARCHIVE, NOTESUP_DATA_FOLDER)
+
+    # Backup Pictures.
+    PICTURES_DATA_FOLDER = f'{HOME}/Pictures'
+    PICTURES_DATA_ARCHIVE = f'{BACKUP}/Pictures'
+    schedule_backup(PICTURES_DATA_ARCHIVE, PICTURES_DATA_FOLDER)
+
+    # Backup R Libraries.
+    R_DATA_FOLDER = f'{HOME}/R'
+    R_DATA_ARCHIVE = f'{BACKUP}/RLibraries'
+    schedule_backup(R_DATA_ARCHIVE, R_DATA_FOLDER)
+
+    # Backup Ren'Py.
+    RENPY_SAVE_DATA_FOLDER = f'{HOME}/.renpy'
+    RENPY_SAVE_DATA_ARCHIVE = f'{BACKUP}/RenPySaveData'
+    schedule_backup(RENPY_SAVE_DATA_ARCHIVE, RENPY_SAVE_DATA_FOLDER)
+
+    # Backup RetroArch (Flatpak).
+    RETROARCH_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.libretro.RetroArch'
+    RETROARCH_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/RetroArchFlatpakBackup'
+    schedule_backup(RETROARCH_FLATPAK_DATA_ARCHIVE, RETROARCH_FLATPAK_DATA_FOLDER)
+
+    # Backup RetroArch (Snap).
+    RETROARCH_DATA_FOLDER = f'{HOME}/snap/retroarch'
+    RETROARCH_DATA_ARCHIVE = f'{BACKUP}/RetroArchSnap'
+    schedule_backup(RETROARCH_DATA_ARCHIVE, RETROARCH_DATA_FOLDER)
+
+    # Backup ScummVM.
+    SCUMMVM_DATA_FOLDER = f'{HOME}/.local/share/scummvm'
+    SCUMMVM_DATA_ARCHIVE = f'{BACKUP}/ScummVMBackup'
+    schedule_backup(SCUMMVM_DATA_ARCHIVE, SCUMMVM_DATA_FOLDER)
+
+    # Backup ScummVM (Flatpak).
+    SCUMMVM_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.scummvm.ScummVM'
+    SCUMMVM_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/ScummVMFlatpakBackup'
+    schedule_backup(SCUMMVM_FLATPAK_DATA_ARCHIVE, SCUMMVM_FLATPAK_DATA_FOLDER)
+
+    # Backup SSH Keys.
+    SSHKEYS_DATA_FOLDER = f'{HOME}/.ssh'
+    SSHKEYS_DATA_ARCHIVE = f'{BACKUP}/SSHKeys'
+    schedule_backup(SSHKEYS_DATA_ARCHIVE, SSHKEYS_DATA_FOLDER)
+
+    # Backup Templates.
+    TEMPLATES_DATA_FOLDER = f'{HOME}/Templates'
+    TEMPLATES_DATA_ARCHIVE = f'{BACKUP}/Templates'
+    schedule_backup(TEMPLATES_DATA_ARCHIVE, TEMPLATES_DATA_FOLDER)
+
+    # Backup Mozilla Thunderbird.
+    THUNDERBIRD_DATA_FOLDER = f'{HOME}/.thunderbird'
+    THUNDERBIRD_DATA_ARCHIVE = f'{BACKUP}/Thunderbird'
+    schedule_backup(THUNDERBIRD_DATA_ARCHIVE, THUNDERBIRD_DATA_FOLDER)
+
+    # Backup VLC (Flatpak).
+    VLC_FLATPAK_DATA_FOLDER = f'{HOME}/.var/app/org.videolan.VLC'
+    VLC_FLATPAK_DATA_ARCHIVE = f'{BACKUP}/VLCFlatpakBackup'
+    schedule_backup(VLC_FLATPAK_DATA_ARCHIVE, VLC_FLATPAK_DATA_FOLDER)
+
+    # Backup Workspace.
+    DOCUMENTS_DATA_FOLDER = f'{HOME}/Documents/Workspace'
+    DOCUMENTS_DATA_ARCHIVE = f'{BACKUP}/WorkspaceBackup'
+    schedule_backup(DOCUMENTS_DATA_ARCHIVE, DOCUMENTS_DATA_FOLDER)
+
+    load_tree_index(BACKUP)
+    load_digest_cache(BACKUP)
+    FAILURES = run_backup_jobs(BACKUP_JOBS, ARGS.jobs, ARGS.device_jobs,
+                               ARGS.store, ARGS.full)
+    save_tree_index(BACKUP)
+
+    create_checksum(BACKUP)
+
+    # Report any folders which could not be backed up.
+    if FAILURES:
+        print()
+        for FAILED_FOLDER, ERROR in FAILURES:
+            print(f'{LIGHT_RED}ERROR: Could not back up {FAILED_FOLDER}: {ERROR}{COLOUR_RESET}')
+        sys.exit(f"\n{LIGHT_RED}{len(FAILURES)} folder(s) could not be backed up to {BACKUP}.{COLOUR_RESET}\n")
+
+    # Final newline.
+    print(f"\n{LIGHT_GREEN}Files have been backed up to {BACKUP}.{COLOUR_RESET}\n")
 
 # End of File.
@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Measure the throughput of the archive and checksum scripts against a
+reproducible synthetic home folder and record the results as JSON.
+"""
+
+###########
+# License #
+###########
+
+# Shell Scripts: A collection of shell scripts in various languages.
+# Copyright (C) 2021 William Willis Whinn
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+###########
+# Imports #
+###########
+
+import argparse
+import datetime
+import glob
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+import pyscripts
+from pycommon import COLOUR_RESET, LIGHT_GREEN, LIGHT_RED, LIGHT_YELLOW
+
+#############
+# Variables #
+#############
+
+# Script Metadata
+SCRIPT_VERSION = '0.0.1'
+
+# Paths
+SCRIPT_FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+# Command-line arguments.
+PARSER = argparse.ArgumentParser(prog='pybench')
+PARSER.add_argument('-s', '--scale', type=int, default=256,
+                    help="Size of the synthetic home folder in MB (default: 256).")
+PARSER.add_argument('--seed', type=int, default=1,
+                    help="Seed for the synthetic home folder (default: 1).")
+PARSER.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                    help="Jobs passed to scripts which support them (default: all CPUs).")
+PARSER.add_argument('-r', '--repeat', type=int, default=1,
+                    help="Run each case N times and keep the fastest (default: 1).")
+PARSER.add_argument('-c', '--case', action='append', metavar='NAME',
+                    help="Run only the named case (repeatable).")
+PARSER.add_argument('-o', '--output', help="Write the results to this JSON file.")
+PARSER.add_argument('--compare', metavar='RESULTS',
+                    help="Compare the results with an earlier JSON file.")
+PARSER.add_argument('--workdir', help="Generate the synthetic home folder here.")
+PARSER.add_argument('--startup', action='store_true',
+                    help="Measure start-up time instead, failing if 'pyscripts.py --help' "
+                         "is over budget or any script cannot be imported cleanly.")
+PARSER.add_argument('--budget', type=float, default=None, metavar='SECONDS',
+                    help="Start-up budget for 'pyscripts.py --help' (default: 0.25).")
+
+# Synthetic Home Folder Mix (fractions of the total size)
+TINY_FRACTION = 0.05
+MEDIA_FRACTION = 0.45
+TEXT_FRACTION = 0.40
+MINECRAFT_FRACTION = 0.10
+
+TINY_FOLDERS = ('.mozilla/firefox/profile', '.ssh', '.local/share/scummvm',
+                'Templates', '.thunderbird/profile')
+WORDS = ('backup', 'archive', 'checksum', 'linux', 'python', 'region', 'chunk',
+         'folder', 'stream', 'compress', 'minecraft', 'world', 'the', 'and', 'of')
+
+MEGABYTE = 1024 * 1024
+
+# Start-up Budget. The median time of STARTUP_RUNS runs of the dispatcher's
+# help is compared with the budget, and every script is imported with an
+# empty environment and no terminal to show it does no work until run.
+STARTUP_BUDGET = 0.25
+STARTUP_RUNS = 10
+
+# Resource Measurement. A child keeps the peak resident set size of the
+# process it was forked from, so each script is started from this small
+# launcher rather than from the benchmark itself. The launcher reports the
+# wall time, CPU time and peak RSS of the script on its standard output.
+RSS_METHOD = 'wait4 ru_maxrss of a script forked from a minimal launcher'
+LAUNCHER = """\
+import os, sys, time
+started = time.perf_counter()
+pid = os.fork()
+if pid == 0:
+    null = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(null, 1)
+    os.execv(sys.argv[1], sys.argv[1:])
+_, status, usage = os.wait4(pid, 0)
+print(time.perf_counter() - started, usage.ru_utime + usage.ru_stime, usage.ru_maxrss)
+sys.exit(os.waitstatus_to_exitcode(status) and 1)
+"""
+
+#############
+# Functions #
+#############
+
+def bench_main():
+    """Main function wrapper for 'pybench.py'."""
+
+    args = PARSER.parse_args()
+
+    if args.startup:
+        return bench_startup(args.repeat, args.budget or STARTUP_BUDGET)
+
+    if args.jobs < 1 or args.repeat < 1 or args.scale < 1:
+        sys.exit(f"\n{LIGHT_RED}ERROR: Scale, jobs and repeat must be positive numbers."
+                 f"{COLOUR_RESET}\n")
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='pybench_')
+    home = os.path.join(workdir, 'home')
+
+    print(f"pybench v{SCRIPT_VERSION} generating {LIGHT_YELLOW}{args.scale} MB{COLOUR_RESET} "
+          f"synthetic home folder in {LIGHT_YELLOW}{home}{COLOUR_RESET}. Please wait.")
+    bench_generate_home(home, args.scale * MEGABYTE, args.seed)
+
+    cases = bench_cases(home, args.jobs)
+    selected = args.case or list(cases)
+    results = {}
+
+    # Peak RSS of an interpreter which does nothing, reported alongside each
+    # case so that the growth caused by the script itself can be seen.
+    baseline = bench_execute(['-c', 'pass'], home)['maxrss']
+
+    try:
+        for name in selected:
+            if name not in cases:
+                sys.exit(f"\n{LIGHT_RED}ERROR: Unknown case '{name}'.{COLOUR_RESET}\n")
+
+            results[name] = bench_run_case(home, cases[name], args.repeat)
+            results[name]['script_rss_kb'] = results[name]['peak_rss_kb'] - baseline
+            bench_print_result(name, results[name])
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {'version': SCRIPT_VERSION,
+              'commit': bench_git_commit(),
+              'created': datetime.datetime.now().isoformat(timespec='seconds'),
+              'python': platform.python_version(),
+              'cpu_count': os.cpu_count(),
+              'scale_mb': args.scale,
+              'seed': args.seed,
+              'jobs': args.jobs,
+              'rss_method': RSS_METHOD,
+              'rss_baseline_kb': baseline,
+              'results': results}
+
+    output = args.output or f"pybench_{report['commit'][:12]}.json"
+    with open(output, 'w') as output_file:
+        json.dump(report, output_file, indent=2, sort_keys=True)
+    print(f"\nResults written to {LIGHT_GREEN}{output}{COLOUR_RESET}.")
+
+    if args.compare:
+        bench_compare(args.compare, report)
+
+    return 0
+
+
+def bench_generate_home(home, total_size, seed):
+    """
+    Generate a reproducible home folder containing many tiny files, large
+    incompressible media, large compressible text and Minecraft save data.
+    """
+
+    generator = random.Random(seed)
+
+    # Many tiny configuration files.
+    remaining = int(total_size * TINY_FRACTION)
+    index = 0
+    while remaining > 0:
+        folder = os.path.join(home, TINY_FOLDERS[index % len(TINY_FOLDERS)],
+                              f'group{index // 100:04d}')
+        size = generator.randint(64, 8192)
+        bench_write(os.path.join(folder, f'file{index:06d}.conf'),
+                    bench_text(generator, size))
+        remaining -= size
+        index += 1
+
+    # Large incompressible media.
+    remaining = int(total_size * MEDIA_FRACTION)
+    index = 0
+    while remaining > 0:
+        size = min(remaining, generator.randint(4 * MEGABYTE, 16 * MEGABYTE))
+        bench_write(os.path.join(home, 'Pictures', f'photo{index:04d}.jpg'),
+                    generator.randbytes(size))
+        remaining -= size
+        index += 1
+
+    # Large compressible text.
+    remaining = int(total_size * TEXT_FRACTION)
+    index = 0
+    while remaining > 0:
+        size = min(remaining, generator.randint(MEGABYTE, 8 * MEGABYTE))
+        folder = 'Documents/Notes' if index % 2 else 'R/library'
+        bench_write(os.path.join(home, folder, f'text{index:04d}.txt'),
+                    bench_text(generator, size))
+        remaining -= size
+        index += 1
+
+    # Minecraft region files, world data and screenshots.
+    remaining = int(total_size * MINECRAFT_FRACTION)
+    world = os.path.join(home, '.minecraft', 'saves', 'World')
+    bench_write(os.path.join(world, 'level.dat'), generator.randbytes(4096))
+    bench_write(os.path.join(home, '.minecraft', 'screenshots', 'screenshot.png'),
+                generator.randbytes(512 * 1024))
+    index = 0
+    while remaining > 0:
+        region = bench_region(generator)
+        bench_write(os.path.join(world, 'region', f'r.{index}.0.mca'), region)
+        remaining -= len(region)
+        index += 1
+
+    return 0
+
+
+def bench_write(path, data):
+    """Write a generated file, creating its folder if required."""
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as output:
+        output.write(data)
+
+    # Fixed modification times keep runs comparable.
+    os.utime(path, (1609459200, 1609459200))
+
+
+def bench_text(generator, size):
+    """Return compressible text of a given size."""
+
+    line = ' '.join(generator.choice(WORDS) for _ in range(2048)).encode()
+    return (line * (size // len(line) + 1))[:size]
+
+
+def bench_region(generator):
+    """Return a Minecraft region file of partly compressible chunks."""
+
+    locations = [0] * 1024
+    timestamps = [0] * 1024
+    body = []
+    sector = 2
+
+    for index in range(0, 1024, 4):
+        data = zlib.compress(generator.randbytes(2048) + bytes(14336))
+        payload = struct.pack('>I', len(data) + 1) + b'\x02' + data
+        count = -(-len(payload) // 4096)
+        locations[index] = (sector << 8) | count
+        timestamps[index] = 1609459200
+        body.append(payload.ljust(count * 4096, b'\0'))
+        sector += count
+
+    return struct.pack('>1024I', *locations) + struct.pack('>1024I', *timestamps) + b''.join(body)
+
+
+def bench_tree_size(*folders):
+    """Return the total size and number of files within folders."""
+
+    size = 0
+    files = 0
+
+    for folder in folders:
+        for root, _, names in os.walk(folder):
+            for name in names:
+                size += os.lstat(os.path.join(root, name)).st_size
+                files += 1
+
+    return size, files
+
+
+def bench_cases(home, jobs):
+    """
+    Return the benchmark cases. Each case runs a script against the
+    synthetic home folder, reading the given input folders and leaving
+    the given outputs, which are removed after each run.
+    """
+
+    tarhash = os.path.join(SCRIPT_FOLDER, 'tarhash.py')
+    minebackup = os.path.join(SCRIPT_FOLDER, 'minebackup.py')
+    pybackup = os.path.join(SCRIPT_FOLDER, 'pybackup.py')
+    minecraft = [os.path.join(home, '.minecraft', 'saves'),
+                 os.path.join(home, '.minecraft', 'screenshots')]
+    tarhash_outputs = [f'{home}.tar.gz', f'{home}.sha512sum', f'{home}.manifest']
+    minebackup_outputs = [f'{home}/Minecraft_*', f'{home}/Minecraft_Incremental']
+    pybackup_outputs = [f'{home}/Backup_BENCH']
+
+    return {
+        'tarhash': {'command': [tarhash, '-j', '1', home],
+                    'inputs': [home], 'outputs': tarhash_outputs},
+        'tarhash-parallel': {'command': [tarhash, '-j', str(jobs), home],
+                             'inputs': [home], 'outputs': tarhash_outputs},
+        'tarhash-manifest': {'command': [tarhash, '-j', str(jobs), '-m', home],
+                             'inputs': [home], 'outputs': tarhash_outputs},
+        'tarhash-verify': {'setup': [tarhash, '-j', str(jobs), '-m', home],
+                           'command': [tarhash, '-j', str(jobs), '--verify', f'{home}.tar.gz'],
+                           'inputs': [home], 'outputs': tarhash_outputs},
+        'minebackup': {'command': [minebackup, '-j', str(jobs)],
+                       'inputs': minecraft, 'outputs': minebackup_outputs},
+        'minebackup-incremental': {'setup': [minebackup, '-j', str(jobs), '--base'],
+                                   'command': [minebackup, '-j', str(jobs), '-i'],
+                                   'inputs': minecraft, 'outputs': minebackup_outputs},
+        'pybackup': {'command': [pybackup, '-j', str(jobs), '--full'], 'stdin': b'1\n',
+                     'inputs': [home], 'outputs': pybackup_outputs},
+        'pybackup-unchanged': {'setup': [pybackup, '-j', str(jobs)],
+                               'command': [pybackup, '-j', str(jobs)], 'stdin': b'1\n',
+                               'inputs': [home], 'outputs': pybackup_outputs},
+        'pybackup-chunk': {'command': [pybackup, '-j', str(jobs), '--full', '--store', 'chunk'],
+                           'stdin': b'1\n', 'inputs': [home], 'outputs': pybackup_outputs},
+    }
+
+
+def bench_environment(home):
+    """Return the environment the scripts are run within."""
+
+    environment = dict(os.environ)
+    environment.update({'HOME': home, 'HOSTNAME': 'bench', 'USER': 'bench',
+                        'XDG_CURRENT_DESKTOP': 'KDE', 'TERM': 'dumb'})
+
+    return environment
+
+
+def bench_execute(command, home, stdin=b''):
+    """
+    Run a script through the launcher and return its wall time, CPU time
+    and peak resident set size, including any child processes it waited for.
+    """
+
+    with tempfile.TemporaryFile() as stderr:
+        process = subprocess.run([sys.executable, '-S', '-c', LAUNCHER, sys.executable]
+                                 + command, cwd=home, env=bench_environment(home),
+                                 input=stdin, stdout=subprocess.PIPE, stderr=stderr)
+
+        if process.returncode:
+            stderr.seek(0)
+            sys.exit(f"\n{LIGHT_RED}ERROR: '{os.path.basename(command[0])}' failed:\n"
+                     f"{stderr.read().decode(errors='replace')}{COLOUR_RESET}")
+
+    wall_time, cpu_time, maxrss = process.stdout.split()
+
+    return {'wall': float(wall_time), 'cpu': float(cpu_time), 'maxrss': int(maxrss)}
+
+
+def bench_run_case(home, case, repeat):
+    """Run a benchmark case and return its fastest measurement."""
+
+    size, files = bench_tree_size(*case['inputs'])
+    best = None
+
+    for _ in range(repeat):
+        bench_clean(case['outputs'])
+
+        if 'setup' in case:
+            bench_execute(case['setup'], home, case.get('stdin', b''))
+
+        usage = bench_execute(case['command'], home, case.get('stdin', b''))
+
+        result = {'wall_seconds': round(usage['wall'], 4),
+                  'cpu_seconds': round(usage['cpu'], 4),
+                  'peak_rss_kb': usage['maxrss'],
+                  'input_bytes': size,
+                  'input_files': files,
+                  'mb_per_second': round(size / MEGABYTE / usage['wall'], 2),
+                  'files_per_second': round(files / usage['wall'], 1)}
+
+        if best is None or result['wall_seconds'] < best['wall_seconds']:
+            best = result
+
+    bench_clean(case['outputs'])
+
+    return best
+
+
+def bench_clean(patterns):
+    """Remove the outputs left by a benchmark case."""
+
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            else:
+                os.remove(path)
+
+
+def bench_print_result(name, result):
+    """Print a single benchmark result."""
+
+    print(f"{name:<24} {result['mb_per_second']:>9.2f} MB/s "
+          f"{result['files_per_second']:>10.1f} files/s "
+          f"{result['cpu_seconds']:>8.2f}s CPU "
+          f"{result['peak_rss_kb'] / 1024:>8.1f} MB RSS "
+          f"({result['script_rss_kb'] / 1024:+.1f} MB)")
+
+
+def bench_startup(repeat, budget):
+    """
+    Time 'pyscripts.py --help' and the import of every script, returning 1
+    if the help is over budget or an import fails or writes any output.
+    """
+
+    runs = max(repeat, STARTUP_RUNS)
+    environment = {'PATH': os.environ.get('PATH', os.defpath)}
+    checks = {'pyscripts --help': [sys.executable, os.path.join(SCRIPT_FOLDER, 'pyscripts.py'),
+                                   '--help']}
+    for module, _ in pyscripts.COMMANDS.values():
+        checks[f'import {module}'] = [sys.executable, '-c', f'import {module}']
+
+    print(f"pybench v{SCRIPT_VERSION} measuring start-up time over {runs} runs "
+          f"(budget {LIGHT_YELLOW}{budget * 1000:.0f} ms{COLOUR_RESET}).")
+    failures = 0
+
+    for name, command in checks.items():
+        times = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            process = subprocess.run(command, cwd=SCRIPT_FOLDER, env=environment,
+                                     stdin=subprocess.DEVNULL, capture_output=True)
+            times.append(time.perf_counter() - started)
+            if process.returncode or (name.startswith('import') and process.stdout):
+                break
+
+        median = statistics.median(times)
+        if process.returncode or (name.startswith('import') and process.stdout):
+            failures += 1
+            detail = (process.stderr or process.stdout).decode(errors='replace').split('\n')
+            detail = [line for line in detail if line.strip()] or [f'exit {process.returncode}']
+            print(f"{name:<24} {LIGHT_RED}FAILED{COLOUR_RESET} {detail[-1]}")
+        elif command[-1] == '--help' and median > budget:
+            failures += 1
+            print(f"{name:<24} {median * 1000:>8.1f} ms {LIGHT_RED}OVER BUDGET{COLOUR_RESET}")
+        else:
+            print(f"{name:<24} {median * 1000:>8.1f} ms")
+
+    if failures:
+        print(f"\n{LIGHT_RED}{failures} start-up check(s) failed.{COLOUR_RESET}")
+        return 1
+
+    print(f"\n{LIGHT_GREEN}All start-up checks passed.{COLOUR_RESET}")
+    return 0
+
+
+def bench_compare(previous_file, report):
+    """Compare throughput with an earlier set of results."""
+
+    with open(previous_file) as results_file:
+        previous = json.load(results_file)
+
+    print(f"\nCompared with {LIGHT_YELLOW}{previous['commit'][:12]}{COLOUR_RESET}:")
+
+    for name, result in report['results'].items():
+        if name not in previous['results']:
+            continue
+
+        old_rate = previous['results'][name]['mb_per_second']
+        change = (result['mb_per_second'] - old_rate) / old_rate * 100 if old_rate else 0.0
+        colour = LIGHT_RED if change < -5 else LIGHT_GREEN if change > 5 else COLOUR_RESET
+        print(f"{name:<24} {old_rate:>9.2f} -> {result['mb_per_second']:>9.2f} MB/s "
+              f"{colour}{change:+7.1f}%{COLOUR_RESET}")
+
+    return 0
+
+
+def bench_git_commit():
+    """Return the current Git commit, or 'unknown' outside a repository."""
+
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=SCRIPT_FOLDER, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+#############
+# Kickstart #
+#############
+
+if __name__ == '__main__':
+    sys.exit(bench_main())
+
+# End of File.
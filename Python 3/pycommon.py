@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Constants and helper functions shared by the Python 3 scripts."""
+
+###########
+# License #
+###########
+
+# Shell Scripts: A collection of shell scripts in various languages.
+# Copyright (C) 2020 William Willis Whinn
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+###########
+# Imports #
+###########
+
+import collections
+import concurrent.futures
+import gzip
+import hashlib
+import os
+
+#############
+# Variables #
+#############
+
+# Project Metadata
+SCRIPT_URL = 'https://github.com/ultraviolet-1968/shell_scripts'
+
+# String colours and formatting
+BLUE = '\033[0;34m'
+CYAN = '\033[0;36m'
+GREEN = '\033[0;32m'
+MAGENTA = '\033[0;35m'
+RED = '\033[0;31m'
+YELLOW = '\033[0;33m'
+
+LIGHT_BLUE = '\033[0;94m'
+LIGHT_CYAN = '\033[0;96m'
+LIGHT_GREEN = '\033[0;92m'
+LIGHT_MAGENTA = '\033[0;95m'
+LIGHT_RED = '\033[0;91m'
+LIGHT_YELLOW = '\033[0;93m'
+
+BLACK = '\033[0;30m'
+GREY = '\033[0;90m'
+WHITE = '\033[0;97m'
+
+BOLD = '\033[1m'
+UNDERLINE = '\033[4m'
+
+COLOUR_RESET = '\033[0;m'
+
+# Folders, which fall back to the password database rather than failing
+# when the environment is incomplete.
+HOME = os.path.expanduser('~')
+CACHE_FOLDER = "{0}/shell_scripts".format(
+    os.environ.get('XDG_CACHE_HOME') or "{0}/.cache".format(HOME))
+
+# Compression Settings
+BLOCK_SIZE = 4 * 1024 * 1024
+COMPRESSION_LEVEL = 6
+
+###########
+# Classes #
+###########
+
+class HashingReader:
+    """File-like wrapper which hashes and counts data as it is read."""
+
+    def __init__(self, fileobj, algorithm='sha512'):
+        self.fileobj = fileobj
+        self.digest = hashlib.new(algorithm)
+        self.size = 0
+
+    def read(self, size=-1):
+        """Read data from the wrapped file and update the digest."""
+        data = self.fileobj.read(size)
+        self.digest.update(data)
+        self.size += len(data)
+        return data
+
+    def hexdigest(self):
+        """Return the digest of all data read so far."""
+        return self.digest.hexdigest()
+
+
+class HashingWriter:
+    """File-like wrapper which hashes and counts data as it is written."""
+
+    def __init__(self, fileobj, algorithm='sha512'):
+        self.fileobj = fileobj
+        self.digest = hashlib.new(algorithm)
+        self.size = 0
+
+    def write(self, data):
+        """Update the digest and pass the data to the wrapped file."""
+        self.digest.update(data)
+        self.size += len(data)
+        return self.fileobj.write(data)
+
+    def hexdigest(self):
+        """Return the digest of all data written so far."""
+        return self.digest.hexdigest()
+
+
+class ParallelGzipWriter:
+    """
+    File-like object which splits written data into fixed-size blocks
+    and compresses each block as a separate gzip member on a thread pool.
+    Members are written in submission order, so the output is a standard
+    multi-member gzip file which is identical for any number of jobs.
+    """
+
+    def __init__(self, fileobj, jobs):
+        self.fileobj = fileobj
+        self.buffer = bytearray()
+        self.pending = collections.deque()
+        self.max_pending = jobs * 2
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=jobs)
+
+    def write(self, data):
+        """Buffer data and submit every complete block for compression."""
+        self.buffer += data
+
+        while len(self.buffer) >= BLOCK_SIZE:
+            self.submit(bytes(self.buffer[:BLOCK_SIZE]))
+            del self.buffer[:BLOCK_SIZE]
+
+        return len(data)
+
+    def submit(self, block):
+        """Compress a block, writing out finished blocks in order."""
+        self.pending.append(self.executor.submit(gzip.compress, block,
+                                                 COMPRESSION_LEVEL, mtime=0))
+
+        while len(self.pending) > self.max_pending:
+            self.fileobj.write(self.pending.popleft().result())
+
+    def close(self):
+        """Compress any remaining data and wait for all blocks."""
+        if self.buffer:
+            self.submit(bytes(self.buffer))
+            self.buffer.clear()
+
+        while self.pending:
+            self.fileobj.write(self.pending.popleft().result())
+
+        self.executor.shutdown()
+
+#############
+# Functions #
+#############
+
+def clear():
+    """Clear the current Terminal window."""
+    os.system('clear')
+
+# End of File.
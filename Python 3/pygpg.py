@@ -31,90 +31,610 @@ file using GnuPG from package 'gnupg2'.
 ###########
 
 import argparse
-import errno
+import collections
+import concurrent.futures
+import fcntl
+import getpass
+import glob
+import hashlib
+import io
 import os
+import shutil
+import stat
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+
+from pycommon import COLOUR_RESET, GREEN, RED, YELLOW, HashingWriter
 
 #############
 # Variables #
 #############
 
 # Script Metadata
-SCRIPT_VERSION = '0.0.2'
-SCRIPT_URL = 'https://github.com/ultraviolet-1968/shell_scripts'
+SCRIPT_VERSION = '0.3.0'
 
 # Command-line arguments.
 PARSER = argparse.ArgumentParser()
-PARSER.add_argument('-e', '--encrypt', help="GnuPG encrypt a target file.")
-PARSER.add_argument('-d', '--decrypt', help="GnuPG decrypt a target file.")
+PARSER.add_argument('-e', '--encrypt', nargs='+', metavar='TARGET',
+                    help="GnuPG encrypt target files or globs ('-' for standard input).")
+PARSER.add_argument('-d', '--decrypt', nargs='+', metavar='TARGET',
+                    help="GnuPG decrypt target files or globs ('-' for standard input).")
+PARSER.add_argument('-o', '--output',
+                    help="Write the result of one target to OUTPUT ('-' for standard output).")
+PARSER.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                    help="Number of files or segments to process at once "
+                         "(default: number of CPUs).")
+PARSER.add_argument('-s', '--segment-size', type=int, metavar='MIB',
+                    help="Encrypt into a container of MIB sized segments which are "
+                         "encrypted and decrypted in parallel.")
+PARSER.add_argument('-r', '--range', metavar='START:END',
+                    help="Only decrypt bytes START to END of a segmented container.")
 
 # Executable Paths.
 GPG_PATH = '/usr/bin/gpg'
 
-# Text Formatting.
-GREEN = '\033[0;32m'
-RED = '\033[0;31m'
-YELLOW = '\033[0;33m'
-RESET = '\033[0;m'
+# Data is passed to and from GnuPG in large blocks, and the pipes are
+# enlarged to match where the kernel allows it.
+BUFFER_SIZE = 1024 * 1024
+
+# Segmented containers start with a fixed-width text index giving the
+# offset, length and SHA-256 digests of every segment, followed by the
+# segments. Each segment is a complete OpenPGP message, so it can be cut
+# out with 'dd' and decrypted by stock GnuPG.
+CONTAINER_EXTENSION = '.gpgs'
+CONTAINER_MAGIC = b'PYGPGSEG'
+CONTAINER_VERSION = 1
+CONTAINER_HEADER = "{0} {1} {2:020d} {3:020d} {4:020d}\n"
+CONTAINER_ENTRY = "{0:020d} {1:020d} {2:020d} {3:020d} {4} {5}\n"
+CONTAINER_HEADER_SIZE = len(CONTAINER_HEADER.format('PYGPGSEG', CONTAINER_VERSION, 0, 0, 0))
+CONTAINER_ENTRY_SIZE = len(CONTAINER_ENTRY.format(0, 0, 0, 0, '0' * 64, '0' * 64))
+
+# Segments in flight are limited by their size as well as their number.
+# Encrypted segments wait in temporary files beside the output until they
+# are copied into place, up to SPOOL_LIMIT bytes. Decrypted segments are
+# written straight to their offset in an output file, and only wait in
+# memory, up to MEMORY_LIMIT bytes, when the output is a pipe. At least one
+# segment is always in flight.
+SPOOL_LIMIT = 8 * 1024 ** 3
+MEMORY_LIMIT = 512 * 1024 ** 2
+
+###########
+# Classes #
+###########
+
+class SectionWriter:
+    """
+    File-like object which receives a decrypted segment starting at a
+    given plaintext offset, and writes the part of it which lies within
+    a byte range to the matching position of a file descriptor.
+    """
+
+    def __init__(self, descriptor, position, start, end, base=0):
+        self.descriptor = descriptor
+        self.position = position
+        self.start = start
+        self.end = end
+        self.base = base
+
+    def write(self, data):
+        """Write the part of the data within the range at its offset."""
+        low = max(self.start, self.position)
+        high = min(self.end, self.position + len(data))
+        if low < high:
+            view = memoryview(data)[low - self.position:high - self.position]
+            while view:
+                written = os.pwrite(self.descriptor, view, self.base + low - self.start)
+                view, low = view[written:], low + written
+        self.position += len(data)
+        return len(data)
 
 #############
 # Functions #
 #############
 
-def gpg_encrypt_file(target):
-    """Create a GnuPG encrypted file."""
+def gpg_read_passphrase(confirm=False):
+    """Prompt for a passphrase on the terminal, even when piping data."""
     try:
-        if os.path.exists(target):
-            subprocess.run("gpg --symmetric {0}".format(target), shell=True, check=True)
-            sys.exit("{0}SUCCESS: File '{1}' has been encrypted.{2}".format(GREEN, target, RESET))
-        elif not os.path.exists(target):
-            sys.exit("{0}ERROR: File '{1}' does not exist.{2}".format(RED, target, RESET))
-        else:
-            sys.exit("{0}ERROR: An unknown error occurred.{1}".format(RED, RESET))
-    except OSError as error:
-        if error.errno == errno.ENOENT:
+        passphrase = getpass.getpass("Passphrase: ")
+        if confirm and getpass.getpass("Repeat passphrase: ") != passphrase:
+            raise ValueError("The passphrases do not match.")
+    except EOFError:
+        raise ValueError("No passphrase was entered.") from None
+
+    if not passphrase:
+        raise ValueError("The passphrase is empty.")
+    return passphrase
+
+
+def gpg_enlarge_pipe(pipe):
+    """Enlarge a pipe buffer to BUFFER_SIZE on systems which support it."""
+    try:
+        fcntl.fcntl(pipe.fileno(), fcntl.F_SETPIPE_SZ, BUFFER_SIZE)
+    except (AttributeError, OSError):
+        pass
+
+
+def gpg_feed(source, pipe, result):
+    """Copy a binary file or an iterable of bytes into a pipe."""
+    blocks = iter(lambda: source.read(BUFFER_SIZE), b'') if hasattr(source, 'read') \
+        else source
+
+    try:
+        for block in blocks:
+            pipe.write(block)
+            result['size'] += len(block)
+    except BrokenPipeError:
+        # GnuPG stopped reading, and its exit status explains why.
+        pass
+    except BaseException as error:
+        result['error'] = error
+    finally:
+        try:
+            pipe.close()
+        except BrokenPipeError:
             pass
-        else:
-            raise
 
 
-def gpg_decrypt_file(target):
-    """Decrypt a GnuPG encrypted file."""
+def gpg_stream(mode, source, destination, passphrase):
+    """
+    Encrypt or decrypt a stream with GnuPG, reading a binary file or an
+    iterable of bytes and writing to a binary file. GnuPG is driven
+    through pipes without a shell, so no plaintext is written to disk.
+    Return the number of bytes read from the source.
+    """
+    passphrase_read, passphrase_write = os.pipe()
+    with os.fdopen(passphrase_write, 'w') as pipe:
+        pipe.write(passphrase + '\n')
 
-    decrypted_file_basename = "{0}".format(os.path.splitext(target)[0])
+    command = [GPG_PATH, '--batch', '--quiet', '--yes', '--pinentry-mode', 'loopback',
+               '--passphrase-fd', str(passphrase_read), '--output', '-',
+               '--symmetric' if mode == 'encrypt' else '--decrypt']
+    result = {'size': 0, 'error': None}
 
     try:
-        if os.path.exists(target):
-            subprocess.run('gpg --output "{0}" --decrypt "{1}"'.format(decrypted_file_basename,
-                                                                       target),
-                           shell=True, check=True)
-            sys.exit("{0}SUCCESS: File '{1}' has been decrypted.{2}".format(GREEN, target, RESET))
-        elif not os.path.exists(target):
-            sys.exit("{0}ERROR: File '{1}' does not exist.{2}".format(RED, target, RESET))
-        else:
-            sys.exit("{0}ERROR: An unknown error occurred.{1}".format(RED, RESET))
-    except OSError as error:
-        if error.errno == errno.ENOENT:
+        with subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                              stderr=subprocess.PIPE, bufsize=BUFFER_SIZE,
+                              pass_fds=(passphrase_read,)) as process:
+            os.close(passphrase_read)
+            passphrase_read = None
+            gpg_enlarge_pipe(process.stdin)
+            gpg_enlarge_pipe(process.stdout)
+
+            feeder = threading.Thread(target=gpg_feed, args=(source, process.stdin, result),
+                                      daemon=True)
+            feeder.start()
+            for block in iter(lambda: process.stdout.read1(BUFFER_SIZE), b''):
+                destination.write(block)
+            feeder.join()
+            message = process.stderr.read().decode('utf-8', 'replace').strip()
+    finally:
+        if passphrase_read is not None:
+            os.close(passphrase_read)
+
+    if result['error']:
+        raise result['error']
+    elif process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, command[0], stderr=message)
+
+    return result['size']
+
+
+def gpg_ordered_map(function, arguments, jobs, weight=None, limit=None):
+    """
+    Run a function over argument tuples on a thread pool and yield the
+    results in order. At most 2 * jobs calls are in flight, and with a
+    weight function and limit, at most limit bytes of them (but always
+    at least one call).
+    """
+    with concurrent.futures.ThreadPoolExecutor(jobs) as executor:
+        pending = collections.deque()
+        held = 0
+        for argument in arguments:
+            size = weight(*argument) if weight else 0
+            while pending and (len(pending) >= 2 * jobs or limit and held + size > limit):
+                future, done = pending.popleft()
+                held -= done
+                yield future.result()
+            pending.append((executor.submit(function, *argument), size))
+            held += size
+        while pending:
+            yield pending.popleft()[0].result()
+
+
+def gpg_read_section(target, offset, length, digest=None):
+    """Yield length bytes of a file from offset in blocks, updating a digest."""
+    with open(target, 'rb') as source:
+        source.seek(offset)
+        remaining = length
+        while remaining:
+            block = source.read(min(BUFFER_SIZE, remaining))
+            if not block:
+                raise ValueError("File '{0}' changed while it was read.".format(target))
+            if digest:
+                digest.update(block)
+            remaining -= len(block)
+            yield block
+
+
+def gpg_encrypt_segment(target, offset, length, passphrase, folder=None):
+    """
+    Encrypt one segment of a file into a temporary file in folder,
+    returning the file with the ciphertext length and both digests.
+    """
+    plain_digest = hashlib.sha256()
+    spool = tempfile.TemporaryFile(dir=folder)
+
+    try:
+        ciphertext = HashingWriter(spool, 'sha256')
+        gpg_stream('encrypt', gpg_read_section(target, offset, length, plain_digest),
+                   ciphertext, passphrase)
+    except BaseException:
+        spool.close()
+        raise
+
+    return spool, ciphertext.size, plain_digest.hexdigest(), ciphertext.hexdigest()
+
+
+def gpg_encrypt_container(target, destination, passphrase, segment_size, jobs):
+    """
+    Encrypt a file into a segmented container on a seekable binary file.
+    The segments are encrypted concurrently and written in order after
+    the index, which is filled in last. Return the number of bytes read.
+    """
+    size = os.path.getsize(target)
+    count = max(1, -(-size // segment_size))
+    offset = CONTAINER_HEADER_SIZE + count * CONTAINER_ENTRY_SIZE
+    entries = []
+
+    # Spool the segments beside the output, so they are on the same disk.
+    folder = os.path.dirname(os.path.abspath(destination.name)) \
+        if isinstance(getattr(destination, 'name', None), str) else None
+
+    destination.seek(offset)
+    segments = ((target, index * segment_size, min(segment_size, size - index * segment_size),
+                 passphrase, folder) for index in range(count))
+    for index, (spool, length, plain_digest, cipher_digest) in enumerate(gpg_ordered_map(
+            gpg_encrypt_segment, segments, jobs,
+            weight=lambda target, offset, length, passphrase, folder: length,
+            limit=SPOOL_LIMIT)):
+        with spool:
+            spool.seek(0)
+            shutil.copyfileobj(spool, destination, BUFFER_SIZE)
+        entries.append(CONTAINER_ENTRY.format(
+            index * segment_size, min(segment_size, size - index * segment_size),
+            offset, length, plain_digest, cipher_digest))
+        offset += length
+
+    destination.seek(0)
+    destination.write((CONTAINER_HEADER.format(CONTAINER_MAGIC.decode(), CONTAINER_VERSION,
+                                               segment_size, size, count)
+                       + ''.join(entries)).encode('ascii'))
+    return size
+
+
+def gpg_is_container(target):
+    """Return whether a file is a segmented container."""
+    with open(target, 'rb') as source:
+        return source.read(len(CONTAINER_MAGIC)) == CONTAINER_MAGIC
+
+
+def gpg_read_container(target):
+    """Return the size and segment index of a segmented container."""
+    with open(target, 'rb') as source:
+        try:
+            magic, version, _, size, count = source.readline().split()
+            if magic != CONTAINER_MAGIC or int(version) != CONTAINER_VERSION:
+                raise ValueError
+            entries = []
+            for _ in range(int(count)):
+                plain_offset, plain_length, offset, length, plain_digest, cipher_digest = \
+                    source.readline().split()
+                entries.append((int(plain_offset), int(plain_length), int(offset),
+                                int(length), plain_digest.decode(), cipher_digest.decode()))
+        except ValueError:
+            raise ValueError("File '{0}' is not a valid segmented container."
+                             .format(target)) from None
+
+    return int(size), entries
+
+
+def gpg_decrypt_segment(target, index, entry, passphrase, destination):
+    """
+    Decrypt one segment of a container to a file-like destination, after
+    checking the digest of the ciphertext, then check the plaintext.
+    """
+    _, plain_length, offset, length, plain_digest, cipher_digest = entry
+
+    digest = hashlib.sha256()
+    for _ in gpg_read_section(target, offset, length, digest):
+        pass
+    if digest.hexdigest() != cipher_digest:
+        raise ValueError("Segment {0} of '{1}' is damaged.".format(index, target))
+
+    plaintext = HashingWriter(destination, 'sha256')
+    gpg_stream('decrypt', gpg_read_section(target, offset, length), plaintext, passphrase)
+    if plaintext.size != plain_length or plaintext.hexdigest() != plain_digest:
+        raise ValueError("Segment {0} of '{1}' failed verification.".format(index, target))
+    return destination
+
+
+def gpg_positional_descriptor(destination):
+    """
+    Return the descriptor of a destination which segments can be written
+    to at their offsets, which is a regular file not opened for appending,
+    or None.
+    """
+    try:
+        descriptor = destination.fileno()
+        if not stat.S_ISREG(os.fstat(descriptor).st_mode) \
+                or fcntl.fcntl(descriptor, fcntl.F_GETFL) & os.O_APPEND:
+            return None
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+    return descriptor
+
+
+def gpg_decrypt_container(target, destination, passphrase, jobs, byte_range=None):
+    """
+    Decrypt a segmented container, or only the bytes from start to end of
+    byte_range, to a binary file. Only the segments which overlap the range
+    are read, and they are decrypted concurrently. Return the number of
+    bytes read.
+    """
+    size, entries = gpg_read_container(target)
+    start, end = byte_range or (0, size)
+    end = size if end is None else min(end, size)
+
+    segments = [(target, index, entry, passphrase) for index, entry in enumerate(entries)
+                if entry[0] < end and entry[0] + entry[1] > start or not entry[1]]
+    descriptor = gpg_positional_descriptor(destination)
+
+    if descriptor is not None:
+        # Each segment is written straight to its offset in the output.
+        destination.flush()
+        base = os.lseek(descriptor, 0, os.SEEK_CUR)
+        for _ in gpg_ordered_map(gpg_decrypt_segment, (
+                segment + (SectionWriter(descriptor, segment[2][0], start, end, base),)
+                for segment in segments), jobs):
             pass
-        else:
+        os.lseek(descriptor, base + end - start, os.SEEK_SET)
+    else:
+        # A pipe is written in order, and each segment is held in memory
+        # until it has been verified.
+        plaintexts = gpg_ordered_map(
+            gpg_decrypt_segment, (segment + (io.BytesIO(),) for segment in segments), jobs,
+            weight=lambda target, index, entry, passphrase, _: entry[1], limit=MEMORY_LIMIT)
+        for (_, _, entry, _), plaintext in zip(segments, plaintexts):
+            destination.write(plaintext.getbuffer()[max(start - entry[0], 0):end - entry[0]])
+
+    return sum(entry[3] for _, _, entry, _ in segments)
+
+
+def gpg_parse_range(text):
+    """Parse a 'START:END' byte range, where either side may be left out."""
+    try:
+        start, end = text.split(':')
+        start, end = int(start or 0), int(end) if end else None
+    except ValueError:
+        raise ValueError("The range '{0}' is not of the form START:END.".format(text)) from None
+
+    if start < 0 or end is not None and end < start:
+        raise ValueError("The range '{0}' is empty or negative.".format(text))
+    return start, end
+
+
+def gpg_output_path(mode, target, segmented=False):
+    """Return the default output path of a target."""
+    if target == '-':
+        return '-'
+    elif mode == 'encrypt':
+        return "{0}{1}".format(target, CONTAINER_EXTENSION if segmented else '.gpg')
+    return os.path.splitext(target)[0]
+
+
+def gpg_is_current(target, output):
+    """Return whether an output file is already newer than its target."""
+    try:
+        return os.stat(output).st_mtime_ns >= os.stat(target).st_mtime_ns
+    except OSError:
+        return False
+
+
+def gpg_process_file(mode, target, output=None, passphrase=None, segment_size=None, jobs=1,
+                     byte_range=None):
+    """
+    Encrypt or decrypt a target file, or standard input if it is '-', to an
+    output file or standard output. With a segment size, files are encrypted
+    into a segmented container, and containers are always decrypted in
+    parallel. Output files which are already newer than the target are left
+    alone, and an incomplete output file never replaces an existing one.
+    Return the number of bytes read, or None if the target was skipped.
+    """
+    output = output or gpg_output_path(mode, target, segment_size)
+    container = mode == 'decrypt' and target != '-' and os.path.isfile(target) \
+        and gpg_is_container(target)
+
+    if target != '-' and not os.path.isfile(target):
+        raise FileNotFoundError("File '{0}' does not exist.".format(target))
+    elif mode == 'encrypt' and segment_size and '-' in (target, output):
+        raise ValueError("Segmented containers need a target and output file.")
+    elif byte_range and not container:
+        raise ValueError("File '{0}' is not a segmented container.".format(target))
+    elif target != '-' and output != '-' and gpg_is_current(target, output):
+        return None
+
+    passphrase = passphrase or gpg_read_passphrase(confirm=mode == 'encrypt')
+
+    def process(destination):
+        if container:
+            return gpg_decrypt_container(target, destination, passphrase, jobs, byte_range)
+        elif mode == 'encrypt' and segment_size:
+            return gpg_encrypt_container(target, destination, passphrase, segment_size, jobs)
+        elif target == '-':
+            return gpg_stream(mode, sys.stdin.buffer, destination, passphrase)
+        with open(target, 'rb') as source:
+            return gpg_stream(mode, source, destination, passphrase)
+
+    if output == '-':
+        size = process(sys.stdout.buffer)
+        sys.stdout.buffer.flush()
+        return size
+
+    partial = "{0}.part".format(output)
+    with open(partial, 'wb') as destination:
+        try:
+            size = process(destination)
+        except BaseException:
+            os.remove(partial)
             raise
+    os.replace(partial, output)
+    return size
+
+
+def gpg_encrypt_file(target, output=None, passphrase=None, segment_size=None, jobs=1):
+    """Create a GnuPG encrypted file or segmented container."""
+    return gpg_process_file('encrypt', target, output, passphrase, segment_size, jobs)
+
+
+def gpg_decrypt_file(target, output=None, passphrase=None, jobs=1, byte_range=None):
+    """Decrypt a GnuPG encrypted file or segmented container."""
+    return gpg_process_file('decrypt', target, output, passphrase, jobs=jobs,
+                            byte_range=byte_range)
+
+
+def gpg_error_detail(error):
+    """Return a one line description of a failed operation."""
+    if isinstance(error, subprocess.CalledProcessError):
+        return "GnuPG failed: {0}".format(error.stderr.splitlines()[-1] if error.stderr else
+                                          "exit status {0}".format(error.returncode))
+    return str(error)
+
+
+def gpg_expand_targets(patterns):
+    """Expand globs in the targets, keeping their order without duplicates."""
+    targets = []
+    for pattern in patterns:
+        if any(character in pattern for character in '*?['):
+            matches = sorted(glob.glob(pattern))
+        else:
+            matches = [pattern]
+        targets += [match for match in matches if match not in targets]
+    return targets
+
+
+def gpg_batch_job(mode, target, passphrase, segment_size):
+    """Process one file of a batch, returning its status, size and duration."""
+    started = time.monotonic()
+
+    try:
+        size = gpg_process_file(mode, target, passphrase=passphrase, segment_size=segment_size)
+    except (OSError, ValueError, subprocess.CalledProcessError) as error:
+        return 'failed', 0, time.monotonic() - started, gpg_error_detail(error)
+
+    if size is None:
+        return 'skipped', 0, 0, "output is newer"
+    return "{0}ed".format(mode), size, time.monotonic() - started, ''
+
+
+def gpg_process_batch(mode, targets, passphrase, jobs, segment_size=None):
+    """
+    Encrypt or decrypt many files on a bounded pool with one passphrase,
+    reporting each file as it completes and a summary at the end. Return
+    the number of files which failed.
+    """
+    started = time.monotonic()
+    counts = {}
+    total_size = 0
+
+    with concurrent.futures.ThreadPoolExecutor(jobs) as executor:
+        futures = {executor.submit(gpg_batch_job, mode, target, passphrase,
+                                   segment_size): target
+                   for target in targets}
+        for number, future in enumerate(concurrent.futures.as_completed(futures), start=1):
+            status, size, seconds, detail = future.result()
+            counts[status] = counts.get(status, 0) + 1
+            total_size += size
+
+            colour = {'failed': RED, 'skipped': YELLOW}.get(status, GREEN)
+            if status in ('encrypted', 'decrypted'):
+                detail = "{0:.1f} MiB in {1:.1f}s".format(size / 1024 ** 2, seconds)
+            print("[{0}/{1}] {2}{3}{4} {5} ({6})".format(
+                number, len(targets), colour, status, COLOUR_RESET, futures[future], detail))
+
+    elapsed = time.monotonic() - started
+    print("\n{0} {1}ed, {2} skipped, {3} failed: {4:.1f} MiB in {5:.1f}s ({6:.1f} MiB/s)."
+          .format(counts.get("{0}ed".format(mode), 0), mode, counts.get('skipped', 0),
+                  counts.get('failed', 0), total_size / 1024 ** 2, elapsed,
+                  total_size / 1024 ** 2 / max(elapsed, 0.001)))
+
+    return counts.get('failed', 0)
+
+
+def gpg_main(arguments):
+    """Run the requested operation and report the result."""
+    mode, patterns = ('encrypt', arguments.encrypt) if arguments.encrypt \
+        else ('decrypt', arguments.decrypt)
+    targets = gpg_expand_targets(patterns)
+
+    if not targets:
+        sys.exit("{0}ERROR: No files match the targets.{1}".format(RED, COLOUR_RESET))
+    elif len(targets) > 1 and ('-' in targets or arguments.output):
+        sys.exit("{0}ERROR: Standard input and --output need a single target.{1}"
+                 .format(RED, COLOUR_RESET))
+    elif arguments.jobs < 1:
+        sys.exit("{0}ERROR: --jobs must be at least 1.{1}".format(RED, COLOUR_RESET))
+    elif arguments.segment_size is not None and arguments.segment_size < 1:
+        sys.exit("{0}ERROR: --segment-size must be at least 1.{1}".format(RED, COLOUR_RESET))
+    elif arguments.range and (mode != 'decrypt' or len(targets) > 1 or not arguments.output):
+        sys.exit("{0}ERROR: --range needs a single target to decrypt and --output.{1}"
+                 .format(RED, COLOUR_RESET))
+
+    segment_size = arguments.segment_size and arguments.segment_size * 1024 * 1024
+
+    if len(targets) > 1:
+        try:
+            passphrase = gpg_read_passphrase(confirm=mode == 'encrypt')
+        except ValueError as error:
+            sys.exit("{0}ERROR: {1}{2}".format(RED, error, COLOUR_RESET))
+        if gpg_process_batch(mode, targets, passphrase, arguments.jobs, segment_size):
+            sys.exit(1)
+        return
+
+    target = targets[0]
+    try:
+        size = gpg_process_file(mode, target, arguments.output, segment_size=segment_size,
+                                jobs=arguments.jobs,
+                                byte_range=arguments.range and gpg_parse_range(arguments.range))
+    except (OSError, ValueError, subprocess.CalledProcessError) as error:
+        sys.exit("{0}ERROR: {1}{2}".format(RED, gpg_error_detail(error), COLOUR_RESET))
+
+    name = 'Standard input' if target == '-' else "File '{0}'".format(target)
+    if size is None:
+        print("{0}SKIPPED: {1} is older than its output.{2}".format(YELLOW, name, COLOUR_RESET),
+              file=sys.stderr)
+    else:
+        print("{0}SUCCESS: {1} has been {2}ed.{3}".format(GREEN, name, mode, COLOUR_RESET),
+              file=sys.stderr)
 
 #############
 # Kickstart #
 #############
 
-# Parse command-line arguments.
-ARGS = PARSER.parse_args()
-
-# Pass command-line argument.
-if not os.path.exists(GPG_PATH):
-    sys.exit("{0}ERROR: Package 'gnupg2' is not installed.{1}".format(RED, RESET))
-elif ARGS.encrypt:
-    gpg_encrypt_file(ARGS.encrypt)
-elif ARGS.decrypt:
-    gpg_decrypt_file(ARGS.decrypt)
-else:
-    sys.exit("{0}ERROR: An argument was not provided.{1}".format(RED, RESET))
+if __name__ == '__main__':
+    # Parse command-line arguments.
+    ARGS = PARSER.parse_args()
+
+    # Pass command-line argument.
+    if not os.path.exists(GPG_PATH):
+        sys.exit("{0}ERROR: Package 'gnupg2' is not installed.{1}".format(RED, COLOUR_RESET))
+    elif ARGS.encrypt and ARGS.decrypt:
+        sys.exit("{0}ERROR: Choose either encryption or decryption.{1}".format(RED, COLOUR_RESET))
+    elif ARGS.encrypt or ARGS.decrypt:
+        gpg_main(ARGS)
+    else:
+        sys.exit("{0}ERROR: An argument was not provided.{1}".format(RED, COLOUR_RESET))
 
 # End of File.
@@ -27,46 +27,660 @@
 # Imports #
 ###########
 
-import errno
+import argparse
+import binascii
+import collections
+import concurrent.futures
+import datetime
+import functools
 import os
 import random
+import shutil
+import stat
 import string
-import subprocess
+import struct
 import sys
+import time
+
+from pycommon import COLOUR_RESET, LIGHT_CYAN, LIGHT_GREEN, LIGHT_RED, YELLOW
 
 #############
 # Variables #
 #############
 
 # Script Metadata
-SCRIPT_VERSION = '0.1.2'
-SCRIPT_URL = 'https://github.com/ultraviolet-1968/shell_scripts'
+SCRIPT_VERSION = '0.2.0'
+
+# Command-line arguments.
+PARSER = argparse.ArgumentParser(prog='pyiso')
+PARSER.add_argument('targets', nargs='*', metavar='target',
+                    help="folders to store in disk images")
+PARSER.add_argument('-m', '--manifest', help="file listing one folder per line")
+PARSER.add_argument('-d', '--destination', default='.',
+                    help="folder to create the disk images in (default: current folder)")
+PARSER.add_argument('-j', '--jobs', type=int,
+                    help="images to build at once (default: based on CPUs and disks)")
+PARSER.add_argument('-o', '--output',
+                    help="write a single image to OUTPUT ('-' for standard output)")
+PARSER.add_argument('-V', '--volid', help="volume label (default: random)")
+PARSER.add_argument('-J', '--joliet', action='store_true',
+                    help="add a Joliet directory tree")
+PARSER.add_argument('-R', '--rock', action='store_true', default=None,
+                    help="add Rock Ridge (POSIX) metadata (default: without UDF or with links)")
+PARSER.add_argument('--no-rock', dest='rock', action='store_false',
+                    help="do not add Rock Ridge metadata")
+PARSER.add_argument('--udf', action='store_true', default=None,
+                    help="add a UDF file system (default)")
+PARSER.add_argument('--no-udf', dest='udf', action='store_false',
+                    help="do not add a UDF file system")
+PARSER.add_argument('-n', '--preflight', action='store_true',
+                    help="check the folders and report the images without writing them")
+
+# Image Layout
+SECTOR_SIZE = 2048
+BUFFER_SIZE = 4 * 1024 * 1024
+SCAN_JOBS = 8
+
+# ISO 9660 stores sizes in 32 bits and years as an offset from 1900 in a
+# single byte. Larger files are recorded with a limited size, the same as
+# 'mkisofs -allow-limited-size', and their full size is only visible to UDF.
+ISO_SIZE_LIMIT = 0xFFFFFFFF
+ISO_TIME_LIMIT = 5869583999
+ISO_CHARACTERS = frozenset(string.ascii_uppercase + string.digits + '_')
+
+# Joliet names may hold up to 103 characters, as with 'mkisofs -joliet-long'.
+JOLIET_NAME_LENGTH = 103
+JOLIET_FORBIDDEN = frozenset('*/:;?\\')
+
+ROCK_RIDGE_ID = b'RRIP_1991A'
+ROCK_RIDGE_DESCRIPTOR = (b'THE ROCK RIDGE INTERCHANGE PROTOCOL PROVIDES SUPPORT '
+                         b'FOR POSIX FILE SYSTEM SEMANTICS')
+ROCK_RIDGE_SOURCE = (b'PLEASE CONTACT DISC PUBLISHER FOR SPECIFICATION SOURCE.  '
+                     b'SEE PUBLISHER IDENTIFIER IN PRIMARY VOLUME DESCRIPTOR '
+                     b'FOR CONTACT INFORMATION.')
+
+# UDF 1.02 structures. The volume descriptor sequences, the integrity
+# sequence and the anchor sit at the sectors conventionally used by
+# mkisofs. The partition starts immediately after the first anchor and
+# begins with the file set descriptor, which is where most readers expect it.
+UDF_MAIN_SEQUENCE = 32
+UDF_RESERVE_SEQUENCE = 48
+UDF_INTEGRITY_SEQUENCE = 64
+UDF_ANCHOR = 256
+UDF_PARTITION = UDF_ANCHOR + 1
+UDF_EXTENT_LIMIT = 0x3FFFF800
+UDF_FILE_LIMIT = (SECTOR_SIZE - 176) // 8 * UDF_EXTENT_LIMIT
+UDF_REVISION = 0x0102
+UDF_DOMAIN_SUFFIX = struct.pack('<HB', UDF_REVISION, 0)
+UDF_INFO_SUFFIX = struct.pack('<HBB', UDF_REVISION, 4, 5)
+UDF_IMPLEMENTATION = b'*pyiso'
+UDF_IMPLEMENTATION_SUFFIX = struct.pack('<BB', 4, 5)
+
+###########
+# Classes #
+###########
+
+class IsoNode:
+    """A file, folder or symbolic link stored in a disk image."""
+
+    FILE_TYPES = {'dir': stat.S_IFDIR, 'file': stat.S_IFREG, 'link': stat.S_IFLNK}
+
+    def __init__(self, name, kind, mode=0o755, size=0, mtime=0, uid=0, gid=0,
+                 source=None, target=None):
+        self.name = name
+        self.kind = kind
+        self.mode = stat.S_IMODE(mode) | self.FILE_TYPES[kind]
+        self.size = size
+        self.mtime = mtime
+        self.uid = uid
+        self.gid = gid
+        self.source = source
+        self.target = target
+        self.primary = None
+        self.children = []
+        self.parent = self
+
+        # Filled in when the image is laid out.
+        self.extent = 0
+        self.serial = 0
+        self.unique_id = 0
+        self.iso_name = b''
+        self.joliet_name = b''
+        self.udf_entry = 0
+        self.udf_data = 0
+        self.udf_size = 0
+
+    def append(self, node):
+        """Add a child node to this folder."""
+        node.parent = self
+        self.children.append(node)
+        return node
+
+    def folders(self):
+        """Return the child folders of this folder."""
+        return [child for child in self.children if child.kind == 'dir']
+
+    def path(self):
+        """Return the path of this node within the image."""
+        parts = []
+        node = self
+        while node.parent is not node:
+            parts.append(node.name)
+            node = node.parent
+        return '/'.join(reversed(parts))
+
+
+class IsoHierarchy:
+    """Locations of the directories and path tables of one directory tree."""
+
+    def __init__(self, joliet):
+        self.joliet = joliet
+        self.directories = []
+        self.number = {}
+        self.location = {}
+        self.size = {}
+        self.table_size = 0
+        self.table_l = 0
+        self.table_m = 0
+
+
+class IsoWriter:
+    """
+    Lay out an ISO 9660 image with optional Joliet, Rock Ridge and UDF
+    file systems, and stream it to any writable binary file. All metadata
+    is placed after the file data, so the layout is complete before the
+    first byte is written and the output never needs to be seekable.
+    """
+
+    def __init__(self, volume_id, udf=True, joliet=False, rock_ridge=False):
+        self.volume_id = volume_id
+        self.udf = udf
+        self.joliet = joliet
+        self.rock_ridge = rock_ridge
+        self.root = IsoNode('', 'dir', mtime=time.time())
+        self.created = time.time()
+        self.volume_set = ''
+        self.inodes = {}
+        self.unreadable = []
+
+        self.files = []
+        self.nodes = []
+        self.hierarchies = []
+        self.continuations = {}
+        self.continuation_cursor = (0, 0)
+        self.continuation_location = 0
+        self.continuation_sectors = 0
+        self.data_start = 0
+        self.total_sectors = 0
+        self.output = None
+        self.position = 0
+
+    def add_tree(self, directory, jobs=1):
+        """
+        Add the contents of a folder in a single scandir pass. Folders are
+        scanned concurrently by a number of threads.
+        """
+        status = os.stat(directory)
+        self.root.mode = stat.S_IMODE(status.st_mode) | stat.S_IFDIR
+        self.root.mtime = status.st_mtime
+        self.root.uid = status.st_uid
+        self.root.gid = status.st_gid
+
+        with concurrent.futures.ThreadPoolExecutor(jobs) as executor:
+            pending = {executor.submit(self.scan_folder, self.root, directory)}
+            while pending:
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    pending.update(executor.submit(self.scan_folder, folder, path)
+                                   for folder, path in future.result())
+
+    def scan_folder(self, folder, path):
+        """Record the entries of one folder and return its subfolders."""
+        folders = []
+
+        with os.scandir(path) as entries:
+            for entry in entries:
+                status = entry.stat(follow_symlinks=False)
+                name = entry.name.encode('utf-8', 'surrogateescape').decode('utf-8', 'replace')
+                details = dict(mode=status.st_mode, mtime=status.st_mtime,
+                               uid=status.st_uid, gid=status.st_gid)
+
+                if stat.S_ISDIR(status.st_mode):
+                    node = folder.append(IsoNode(name, 'dir', **details))
+                    folders.append((node, entry.path))
+                elif stat.S_ISREG(status.st_mode):
+                    node = folder.append(IsoNode(name, 'file', size=status.st_size,
+                                                 source=functools.partial(open, entry.path, 'rb'),
+                                                 **details))
+                    if not os.access(entry.path, os.R_OK):
+                        self.unreadable.append(node)
+
+                    # Store the data of hard-linked files only once.
+                    inode = (status.st_dev, status.st_ino)
+                    if status.st_nlink > 1:
+                        node.primary = self.inodes.setdefault(inode, node)
+                        if node.primary is node:
+                            node.primary = None
+                elif stat.S_ISLNK(status.st_mode):
+                    folder.append(IsoNode(name, 'link', target=os.readlink(entry.path),
+                                          **details))
+
+        return folders
+
+    def add(self, path, kind, **details):
+        """Add a node at a '/' separated path, creating parent folders."""
+        folder = self.root
+        *parents, name = [part for part in path.split('/') if part not in ('', '.')]
+
+        for part in parents:
+            match = [child for child in folder.folders() if child.name == part]
+            folder = match[0] if match else folder.append(
+                IsoNode(part, 'dir', mtime=details.get('mtime', self.created)))
+
+        existing = [child for child in folder.children if child.name == name]
+        if existing and existing[0].kind == 'dir' and kind == 'dir':
+            node = existing[0]
+            node.mode = stat.S_IMODE(details.get('mode', node.mode)) | stat.S_IFDIR
+            node.mtime = details.get('mtime', node.mtime)
+            return node
+        for node in existing:
+            folder.children.remove(node)
+
+        return folder.append(IsoNode(name, kind, **details))
+
+    def walk(self, folder=None):
+        """Yield every node below a folder in a stable, sorted order."""
+        folder = folder or self.root
+        folder.children.sort(key=lambda child: child.name)
+        for child in folder.children:
+            yield child
+            if child.kind == 'dir':
+                yield from self.walk(child)
+
+    def layout(self, data_end=None):
+        """
+        Assign a location to every structure in the image. If the file
+        data has already been streamed, data_end is the sector after it.
+        """
+        self.nodes = [self.root] + list(self.walk())
+        self.files = [node for node in self.nodes
+                      if node.kind == 'file' and node.size and node.primary is None]
+
+        for serial, node in enumerate(self.nodes, start=1):
+            node.serial = serial
+        for node in self.nodes:
+            if node.primary is not None:
+                node.serial = node.primary.serial
+            if node.kind == 'dir':
+                iso_assign_names(node, self.joliet)
+            elif not self.udf and node.size > ISO_SIZE_LIMIT:
+                raise ValueError("'{0}' is larger than 4 GiB and needs UDF."
+                                 .format(node.path()))
+            elif node.size > UDF_FILE_LIMIT:
+                raise ValueError("'{0}' is too large for a UDF file entry."
+                                 .format(node.path()))
+
+        # File data follows the volume descriptors and the UDF volume
+        # recognition sequence, anchor and file set.
+        self.data_start = self.header_sectors()
+        sector = data_end
+        if data_end is None:
+            sector = self.data_start
+            for node in self.files:
+                node.extent = sector
+                sector += iso_sectors(node.size)
+        for node in self.nodes:
+            if node.primary is not None:
+                node.extent = node.primary.extent
+
+        # Directory trees.
+        self.hierarchies = [IsoHierarchy(False)]
+        if self.joliet:
+            self.hierarchies.append(IsoHierarchy(True))
+        for hierarchy in self.hierarchies:
+            sector = self.layout_hierarchy(hierarchy, sector)
+
+        # UDF file system followed by the closing anchor.
+        if self.udf:
+            sector = self.layout_udf(sector) + 1
+
+        self.total_sectors = sector
+
+    def layout_hierarchy(self, hierarchy, sector):
+        """Place the path tables and directories of one directory tree."""
+        queue = collections.deque([self.root])
+        while queue:
+            folder = queue.popleft()
+            hierarchy.number[folder] = len(hierarchy.directories) + 1
+            hierarchy.directories.append(folder)
+            queue.extend(sorted(folder.folders(), key=lambda child: self.identifier(
+                child, hierarchy)))
+
+        hierarchy.table_size = len(self.path_table(hierarchy, '<'))
+        hierarchy.table_l = sector
+        sector += iso_sectors(hierarchy.table_size)
+        hierarchy.table_m = sector
+        sector += iso_sectors(hierarchy.table_size)
+
+        for folder in hierarchy.directories:
+            hierarchy.location[folder] = sector
+            hierarchy.size[folder] = len(iso_pack_records(self.records(folder, hierarchy)))
+            sector += iso_sectors(hierarchy.size[folder])
+
+        if self.rock_ridge and not hierarchy.joliet:
+            self.continuation_location = sector
+            sector += self.continuation_sectors
+
+        return sector
+
+    def layout_udf(self, sector):
+        """Place the UDF file entries and directory contents."""
+        for unique_id, node in enumerate(self.nodes, start=15):
+            node.unique_id = 0 if node is self.root else unique_id
+            if node.kind != 'link':
+                node.udf_entry = sector
+                sector += 1
 
-MKISOFS = '/usr/bin/mkisofs'
+        for node in self.nodes:
+            if node.kind == 'dir':
+                node.udf_data = sector
+                node.udf_size = len(self.udf_directory(node))
+                sector += iso_sectors(node.udf_size)
 
-# String colours and formatting
-BLUE = '\033[0;34m'
-CYAN = '\033[0;36m'
-GREEN = '\033[0;32m'
-MAGENTA = '\033[0;35m'
-RED = '\033[0;31m'
-YELLOW = '\033[0;33m'
+        return sector
 
-LIGHT_BLUE = '\033[0;94m'
-LIGHT_CYAN = '\033[0;96m'
-LIGHT_GREEN = '\033[0;92m'
-LIGHT_MAGENTA = '\033[0;95m'
-LIGHT_RED = '\033[0;91m'
-LIGHT_YELLOW = '\033[0;93m'
+    def identifier(self, node, hierarchy):
+        """Return the directory record identifier of a node."""
+        return node.joliet_name if hierarchy.joliet else node.iso_name
 
-BLACK = '\033[0;30m'
-GREY = '\033[0;90m'
-WHITE = '\033[0;97m'
+    def path_table(self, hierarchy, byte_order):
+        """Return a little ('<') or big ('>') endian path table."""
+        table = bytearray()
+        for folder in hierarchy.directories:
+            name = b'\x00' if folder is self.root else self.identifier(folder, hierarchy)
+            table += struct.pack(byte_order + 'BBIH', len(name), 0,
+                                 hierarchy.location.get(folder, 0),
+                                 hierarchy.number[folder.parent])
+            table += name + b'\x00' * (len(name) % 2)
+        return bytes(table)
 
-BOLD = '\033[1m'
-UNDERLINE = '\033[4m'
+    def records(self, folder, hierarchy):
+        """Return the directory records of a folder."""
+        location, size = hierarchy.location, hierarchy.size
+        rock_ridge = self.rock_ridge and not hierarchy.joliet
 
-COLOUR_RESET = '\033[0;m'
+        entries = [(folder, b'\x00'), (folder.parent, b'\x01')]
+        children = [child for child in folder.children
+                    if child.kind != 'link' or rock_ridge]
+        entries += sorted(((child, self.identifier(child, hierarchy)) for child in children),
+                          key=lambda entry: entry[1])
+
+        records = []
+        for index, (node, name) in enumerate(entries):
+            if node.kind == 'dir':
+                extent, length, flags = location.get(node, 0), size.get(node, 0), 2
+            else:
+                extent, length, flags = node.extent, min(node.size, ISO_SIZE_LIMIT), 0
+
+            system_use = b''
+            if rock_ridge:
+                susp = rr_entries(node, index, folder is self.root)
+                system_use = self.rr_fit(33 + len(name) + 1 - len(name) % 2, susp,
+                                         (folder.serial, index))
+
+            records.append(iso_directory_record(extent, length, node.mtime, flags,
+                                                name, system_use))
+        return records
+
+    def rr_fit(self, record_length, entries, key):
+        """Place Rock Ridge entries in a record, moving any overflow to a continuation area."""
+        available = 254 - record_length
+        if sum(map(len, entries)) <= available:
+            return iso_even(b''.join(entries))
+
+        inline = b''
+        while entries and len(inline) + len(entries[0]) <= available - 28:
+            inline += entries.pop(0)
+        overflow = b''.join(entries)
+        if len(overflow) > SECTOR_SIZE:
+            raise ValueError("Rock Ridge metadata is too large for a continuation area.")
+
+        if key not in self.continuations:
+            sector, offset = self.continuation_cursor
+            if offset + len(overflow) > SECTOR_SIZE:
+                sector, offset = sector + 1, 0
+            self.continuations[key] = (sector, offset, overflow)
+            self.continuation_cursor = (sector, offset + len(overflow))
+            self.continuation_sectors = sector + 1
+
+        sector, offset, _ = self.continuations[key]
+        continuation = (b'CE\x1c\x01' + iso_both32(self.continuation_location + sector)
+                        + iso_both32(offset) + iso_both32(len(overflow)))
+        return iso_even(inline + continuation)
+
+    def udf_directory(self, folder):
+        """Return the file identifier descriptors of a folder."""
+        base = folder.udf_data - UDF_PARTITION
+        data = bytearray(udf_file_identifier(0x0A, folder.parent.udf_entry - UDF_PARTITION,
+                                             b'', base))
+        for child in folder.children:
+            if child.kind == 'link':
+                continue
+            data += udf_file_identifier(0x02 if child.kind == 'dir' else 0x00,
+                                        child.udf_entry - UDF_PARTITION,
+                                        udf_dchars(child.name),
+                                        base + len(data) // SECTOR_SIZE)
+        return bytes(data)
+
+    def write(self, output):
+        """Lay out the image if needed and write it sequentially to a binary file."""
+        if not self.total_sectors:
+            self.layout()
+        output.write(self.header())
+
+        for node in self.files:
+            with node.source() as source:
+                iso_copy(source, output, node.size)
+
+        for data in self.metadata():
+            output.write(data)
+        output.flush()
+
+    def begin(self, output):
+        """
+        Start an image on a seekable binary file. Files added with
+        add_data() are written as soon as they are added, and the volume
+        descriptors are filled in by finish().
+        """
+        self.output = output
+        self.position = self.header_sectors()
+        output.write(bytes(self.position * SECTOR_SIZE))
+
+    def add_data(self, path, source, size, **details):
+        """Add a file to a started image, copying its data from a readable file."""
+        node = self.add(path, 'file', size=size, **details)
+        node.extent = self.position if size else 0
+        iso_copy(source, self.output, size)
+        self.position += iso_sectors(size)
+        return node
+
+    def finish(self):
+        """Write the metadata of a started image, then its volume descriptors."""
+        self.layout(self.position)
+        for data in self.metadata():
+            self.output.write(data)
+        self.output.seek(0)
+        self.output.write(self.header())
+        self.output.flush()
+
+    def header_sectors(self):
+        """Return the number of sectors which precede the file data."""
+        return UDF_PARTITION + 2 if self.udf else 18 + self.joliet
+
+    def header(self):
+        """Return the system area and volume descriptors."""
+        header = bytearray(self.data_start * SECTOR_SIZE)
+
+        def place(sector, data):
+            header[sector * SECTOR_SIZE:sector * SECTOR_SIZE + len(data)] = data
+
+        sector = 16
+        for hierarchy in self.hierarchies:
+            place(sector, self.volume_descriptor(hierarchy))
+            sector += 1
+        place(sector, iso_pad(b'\xffCD001\x01'))
+
+        if self.udf:
+            for identifier in (b'BEA01', b'NSR02', b'TEA01'):
+                sector += 1
+                place(sector, iso_pad(b'\x00' + identifier + b'\x01'))
+            for start in (UDF_MAIN_SEQUENCE, UDF_RESERVE_SEQUENCE):
+                for offset, descriptor in enumerate(self.udf_volume_descriptors(start)):
+                    place(start + offset, descriptor)
+            place(UDF_INTEGRITY_SEQUENCE, self.udf_integrity_descriptor())
+            place(UDF_INTEGRITY_SEQUENCE + 1,
+                  udf_descriptor(8, UDF_INTEGRITY_SEQUENCE + 1, bytes(496)))
+            place(UDF_ANCHOR, self.udf_anchor(UDF_ANCHOR))
+            place(UDF_PARTITION, self.udf_file_set_descriptor())
+            place(UDF_PARTITION + 1, udf_descriptor(8, 1, bytes(496)))
+
+        return bytes(header)
+
+    def metadata(self):
+        """Yield the sectors which follow the file data, in order."""
+        for hierarchy in self.hierarchies:
+            for byte_order in '<>':
+                yield iso_pad(self.path_table(hierarchy, byte_order))
+            for folder in hierarchy.directories:
+                yield iso_pad(iso_pack_records(self.records(folder, hierarchy)))
+
+            if self.rock_ridge and not hierarchy.joliet:
+                area = bytearray(self.continuation_sectors * SECTOR_SIZE)
+                for sector, offset, overflow in self.continuations.values():
+                    start = sector * SECTOR_SIZE + offset
+                    area[start:start + len(overflow)] = overflow
+                yield bytes(area)
+
+        if self.udf:
+            for node in self.nodes:
+                if node.kind != 'link':
+                    yield iso_pad(self.udf_file_entry(node))
+            for node in self.nodes:
+                if node.kind == 'dir':
+                    yield iso_pad(self.udf_directory(node))
+            yield self.udf_anchor(self.total_sectors - 1)
+
+    def volume_descriptor(self, hierarchy):
+        """Return the primary or Joliet supplementary volume descriptor."""
+        joliet = hierarchy.joliet
+
+        def text(value, length):
+            if joliet:
+                data = value[:length // 2].encode('utf-16-be')
+                return (data + b'\x00 ' * ((length - len(data)) // 2)).ljust(length, b'\x00')
+            return value.encode('ascii', 'replace')[:length].ljust(length, b' ')
+
+        root = iso_directory_record(hierarchy.location[self.root],
+                                    hierarchy.size[self.root],
+                                    self.root.mtime, 2, b'\x00')
+        descriptor = (bytes([2 if joliet else 1]) + b'CD001\x01\x00'
+                      + text('LINUX', 32) + text(self.volume_id, 32) + bytes(8)
+                      + iso_both32(self.total_sectors)
+                      + (b'%/E'.ljust(32, b'\x00') if joliet else bytes(32))
+                      + iso_both16(1) + iso_both16(1) + iso_both16(SECTOR_SIZE)
+                      + iso_both32(hierarchy.table_size)
+                      + struct.pack('<I4x', hierarchy.table_l)
+                      + struct.pack('>I4x', hierarchy.table_m)
+                      + root + text(self.volume_set, 128) + text('', 128) + text('', 128)
+                      + text('PYISO', 128) + text('', 37) + text('', 37) + text('', 37)
+                      + iso_date_long(self.created) + iso_date_long(self.created)
+                      + b'0' * 16 + b'\x00' + b'0' * 16 + b'\x00' + b'\x01\x00')
+        return iso_pad(descriptor)
+
+    def udf_volume_descriptors(self, start):
+        """Return the UDF volume descriptor sequence recorded at a sector."""
+        partition_length = self.total_sectors - 1 - UDF_PARTITION
+        implementation = udf_regid(UDF_IMPLEMENTATION, UDF_IMPLEMENTATION_SUFFIX)
+        domain = udf_regid(b'*OSTA UDF Compliant', UDF_DOMAIN_SUFFIX)
+        volume_set = '{0:08X}{1}'.format(int(self.created), self.volume_id)
+
+        primary = (struct.pack('<II', 1, 0) + udf_dstring(self.volume_id, 32)
+                   + struct.pack('<HHHHII', 1, 1, 2, 2, 1, 1)
+                   + udf_dstring(volume_set, 128) + udf_charspec() + udf_charspec()
+                   + bytes(16) + udf_regid(b'') + udf_timestamp(self.created)
+                   + implementation + bytes(64) + bytes(28))
+        information = (struct.pack('<I', 2) + udf_regid(b'*UDF LV Info', UDF_INFO_SUFFIX)
+                       + udf_charspec() + udf_dstring(self.volume_id, 128) + bytes(108)
+                       + implementation + bytes(128))
+        partition = (struct.pack('<IHH', 3, 1, 0) + udf_regid(b'+NSR02') + bytes(128)
+                     + struct.pack('<III', 1, UDF_PARTITION, partition_length)
+                     + implementation + bytes(128) + bytes(156))
+        logical = (struct.pack('<I', 4) + udf_charspec() + udf_dstring(self.volume_id, 128)
+                   + struct.pack('<I', SECTOR_SIZE) + domain
+                   + udf_long_ad(SECTOR_SIZE, 0)
+                   + struct.pack('<II', 6, 1) + implementation + bytes(128)
+                   + struct.pack('<II', 2 * SECTOR_SIZE, UDF_INTEGRITY_SEQUENCE)
+                   + struct.pack('<BBHH', 1, 6, 1, 0))
+        unallocated = struct.pack('<II', 5, 0)
+
+        descriptors = [(1, primary), (4, information), (5, partition), (6, logical),
+                       (7, unallocated), (8, bytes(496))]
+        return [iso_pad(udf_descriptor(tag, start + offset, body))
+                for offset, (tag, body) in enumerate(descriptors)]
+
+    def udf_integrity_descriptor(self):
+        """Return a closed logical volume integrity descriptor."""
+        folders = sum(1 for node in self.nodes if node.kind == 'dir')
+        files = sum(1 for node in self.nodes if node.kind == 'file')
+        body = (udf_timestamp(self.created) + struct.pack('<I', 1) + bytes(8)
+                + struct.pack('<Q', len(self.nodes) + 15) + bytes(24)
+                + struct.pack('<IIII', 1, 46, 0, self.total_sectors - 1 - UDF_PARTITION)
+                + udf_regid(UDF_IMPLEMENTATION, UDF_IMPLEMENTATION_SUFFIX)
+                + struct.pack('<IIHHH', files, folders, UDF_REVISION, UDF_REVISION,
+                              UDF_REVISION))
+        return udf_descriptor(9, UDF_INTEGRITY_SEQUENCE, body)
+
+    def udf_anchor(self, sector):
+        """Return an anchor volume descriptor pointer."""
+        length = 6 * SECTOR_SIZE
+        body = struct.pack('<IIII', length, UDF_MAIN_SEQUENCE, length, UDF_RESERVE_SEQUENCE)
+        return iso_pad(udf_descriptor(2, sector, body + bytes(480)))
+
+    def udf_file_set_descriptor(self):
+        """Return the UDF file set descriptor."""
+        body = (udf_timestamp(self.created) + struct.pack('<HHIIII', 3, 3, 1, 1, 0, 0)
+                + udf_charspec() + udf_dstring(self.volume_id, 128)
+                + udf_charspec() + udf_dstring(self.volume_id, 32)
+                + bytes(64) + udf_long_ad(SECTOR_SIZE, self.root.udf_entry - UDF_PARTITION)
+                + udf_regid(b'*OSTA UDF Compliant', UDF_DOMAIN_SUFFIX) + bytes(64))
+        return udf_descriptor(256, 0, body)
+
+    def udf_file_entry(self, node):
+        """Return the UDF file entry of a file or folder."""
+        if node.kind == 'dir':
+            file_type, links, length = 4, len(node.folders()) + 1, node.udf_size
+            allocation = udf_short_ad(length, node.udf_data - UDF_PARTITION)
+        else:
+            file_type, links, length = 5, 1, node.size
+            allocation = b''
+            position, remaining = node.extent - UDF_PARTITION, length
+            while remaining:
+                extent = min(remaining, UDF_EXTENT_LIMIT)
+                allocation += udf_short_ad(extent, position)
+                position += extent // SECTOR_SIZE
+                remaining -= extent
+
+        permissions = ((node.mode & 0o7) | (node.mode >> 3 & 0o7) << 5
+                       | (node.mode >> 6 & 0o7) << 10)
+        timestamp = udf_timestamp(node.mtime)
+        body = (udf_icbtag(file_type)
+                + struct.pack('<IIIHBBIQQ', node.uid & 0xFFFFFFFF, node.gid & 0xFFFFFFFF,
+                              permissions, links, 0, 0, 0, length, iso_sectors(length))
+                + timestamp * 3 + struct.pack('<I', 1) + bytes(16)
+                + udf_regid(UDF_IMPLEMENTATION, UDF_IMPLEMENTATION_SUFFIX)
+                + struct.pack('<QII', node.unique_id, 0, len(allocation)) + allocation)
+        return udf_descriptor(261, node.udf_entry - UDF_PARTITION, body)
 
 #############
 # Functions #
@@ -82,50 +696,486 @@ def generate_disk_label():
     return label
 
 
-def create_disk_image(target):
+def iso_sectors(size):
+    """Return the number of sectors needed to hold a number of bytes."""
+    return -(-size // SECTOR_SIZE)
+
+
+def iso_pad(data):
+    """Pad data with zeros to a whole number of sectors."""
+    return data + bytes(-len(data) % SECTOR_SIZE)
+
+
+def iso_copy(source, output, size):
+    """Copy a number of bytes into an image and pad them to a whole sector."""
+    buffer = bytearray(min(size, BUFFER_SIZE))
+    view = memoryview(buffer)
+    remaining = size
+    while remaining:
+        count = source.readinto(view[:min(remaining, BUFFER_SIZE)])
+        if not count:
+            break
+        output.write(view[:count])
+        remaining -= count
+
+    # Pad files which shrank while the image was being written.
+    output.write(bytes(remaining + (-size % SECTOR_SIZE)))
+
+
+def iso_even(data):
+    """Pad data with a zero to an even length."""
+    return data + bytes(len(data) % 2)
+
+
+def iso_both16(value):
+    """Return a 16-bit number in both byte orders."""
+    return struct.pack('<H', value) + struct.pack('>H', value)
+
+
+def iso_both32(value):
+    """Return a 32-bit number in both byte orders."""
+    return struct.pack('<I', value) + struct.pack('>I', value)
+
+
+def iso_datetime(timestamp):
+    """Return a UTC date for a timestamp within the range ISO 9660 supports."""
+    timestamp = min(max(int(timestamp), 0), ISO_TIME_LIMIT)
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc)
+
+
+def iso_date_short(timestamp):
+    """Return a seven byte directory record date."""
+    date = iso_datetime(timestamp)
+    return struct.pack('7B', date.year - 1900, date.month, date.day,
+                       date.hour, date.minute, date.second, 0)
+
+
+def iso_date_long(timestamp):
+    """Return a seventeen byte volume descriptor date."""
+    return '{0:%Y%m%d%H%M%S}00'.format(iso_datetime(timestamp)).encode() + b'\x00'
+
+
+def iso_directory_record(extent, size, mtime, flags, identifier, system_use=b''):
+    """Return an ISO 9660 directory record."""
+    record = (b'\x00\x00' + iso_both32(extent) + iso_both32(size)
+              + iso_date_short(mtime) + bytes([flags, 0, 0]) + iso_both16(1)
+              + bytes([len(identifier)]) + identifier
+              + b'\x00' * (1 - len(identifier) % 2) + system_use)
+    return bytes([len(record)]) + record[1:]
+
+
+def iso_pack_records(records):
+    """Join directory records so that none crosses a sector boundary."""
+    data = bytearray()
+    for record in records:
+        if len(data) % SECTOR_SIZE + len(record) > SECTOR_SIZE:
+            data += bytes(-len(data) % SECTOR_SIZE)
+        data += record
+    return iso_pad(bytes(data))
+
+
+def iso_unique(name, limit, used, suffix=''):
+    """Shorten a name to a limit, numbering it until it is not in use."""
+    candidate, number = name[:limit], 0
+    while candidate + suffix in used:
+        number += 1
+        candidate = name[:limit - len(str(number))] + str(number)
+    used.add(candidate + suffix)
+    return candidate + suffix
+
+
+def iso_assign_names(folder, joliet):
+    """Choose unique ISO 9660 and Joliet identifiers for a folder's children."""
+    iso_used, joliet_used = set(), set()
+
+    for child in folder.children:
+        if child.kind == 'dir':
+            name = ''.join(c if c in ISO_CHARACTERS else '_' for c in child.name.upper())
+            child.iso_name = iso_unique(name or '_', 31, iso_used).encode('ascii')
+        else:
+            stem, dot, extension = child.name.rpartition('.')
+            if not dot:
+                stem, extension = extension, ''
+            stem = ''.join(c if c in ISO_CHARACTERS else '_' for c in stem.upper())
+            extension = ''.join(c if c in ISO_CHARACTERS else '_'
+                                for c in extension.upper())[:8]
+            name = iso_unique(stem or '_', 29 - len(extension), iso_used,
+                              '.' + extension + ';1')
+            child.iso_name = name.encode('ascii')
+
+        if joliet:
+            name = ''.join('_' if c in JOLIET_FORBIDDEN or not 31 < ord(c) < 0x10000 else c
+                           for c in child.name)
+            name = iso_unique(name, JOLIET_NAME_LENGTH, joliet_used)
+            child.joliet_name = (name + ('' if child.kind == 'dir' else ';1')).encode('utf-16-be')
+
+
+def rr_entries(node, index, root):
+    """Return the Rock Ridge entries for a directory record."""
+    links = len(node.folders()) + 2 if node.kind == 'dir' else 1
+    entries = [b'PX\x2c\x01' + iso_both32(node.mode) + iso_both32(links)
+               + iso_both32(node.uid & 0xFFFFFFFF) + iso_both32(node.gid & 0xFFFFFFFF)
+               + iso_both32(node.serial),
+               b'TF\x0c\x01\x02' + iso_date_short(node.mtime)]
+
+    if index == 0 and root:
+        entries.insert(0, b'SP\x07\x01\xbe\xef\x00')
+        entries.append(b'ER' + bytes([8 + len(ROCK_RIDGE_ID) + len(ROCK_RIDGE_DESCRIPTOR)
+                                      + len(ROCK_RIDGE_SOURCE), 1, len(ROCK_RIDGE_ID),
+                                      len(ROCK_RIDGE_DESCRIPTOR), len(ROCK_RIDGE_SOURCE), 1])
+                       + ROCK_RIDGE_ID + ROCK_RIDGE_DESCRIPTOR + ROCK_RIDGE_SOURCE)
+    elif index > 1:
+        name = node.name.encode('utf-8', 'surrogateescape')
+        while True:
+            chunk, name = name[:250], name[250:]
+            entries.append(b'NM' + bytes([5 + len(chunk), 1, 1 if name else 0]) + chunk)
+            if not name:
+                break
+        if node.kind == 'link':
+            entries += rr_symbolic_link(node.target)
+
+    return entries
+
+
+def rr_symbolic_link(target):
+    """Return the SL entries which record a symbolic link target."""
+    components = [b'\x08\x00'] if target.startswith('/') else []
+    for part in target.split('/'):
+        if part == '.':
+            components.append(b'\x02\x00')
+        elif part == '..':
+            components.append(b'\x04\x00')
+        elif part:
+            data = part.encode('utf-8', 'surrogateescape')
+            while data:
+                chunk, data = data[:248], data[248:]
+                components.append(bytes([1 if data else 0, len(chunk)]) + chunk)
+
+    bodies = [b'']
+    for component in components:
+        if 5 + len(bodies[-1]) + len(component) > 255:
+            bodies.append(b'')
+        bodies[-1] += component
+
+    return [b'SL' + bytes([5 + len(body), 1, 1 if number < len(bodies) - 1 else 0]) + body
+            for number, body in enumerate(bodies)]
+
+
+def udf_descriptor(identifier, location, body):
+    """Return a UDF descriptor with its tag, checksum and CRC."""
+    tag = bytearray(struct.pack('<HHBBHHHI', identifier, 2, 0, 0, 1,
+                                binascii.crc_hqx(body, 0), len(body), location))
+    tag[4] = sum(tag) & 0xFF
+    return bytes(tag) + body
+
+
+def udf_dchars(text):
+    """Return text as OSTA compressed Unicode."""
+    try:
+        return b'\x08' + text.encode('latin-1')
+    except UnicodeEncodeError:
+        return b'\x10' + text.encode('utf-16-be', 'surrogatepass')
+
+
+def udf_dstring(text, length):
+    """Return text as a fixed length OSTA compressed Unicode field."""
+    if not text:
+        return bytes(length)
+    data = udf_dchars(text)[:length - 1]
+    if data[0] == 0x10 and len(data) % 2 == 0:
+        data = data[:-1]
+    return data.ljust(length - 1, b'\x00') + bytes([len(data)])
+
+
+def udf_charspec():
+    """Return the OSTA compressed Unicode character set specification."""
+    return b'\x00' + b'OSTA Compressed Unicode'.ljust(63, b'\x00')
+
+
+def udf_regid(identifier, suffix=b''):
+    """Return a UDF entity identifier."""
+    return b'\x00' + identifier.ljust(23, b'\x00') + suffix.ljust(8, b'\x00')
+
+
+def udf_timestamp(timestamp):
+    """Return a UDF timestamp in UTC."""
+    date = iso_datetime(timestamp)
+    return struct.pack('<Hh8B', 0x1000, date.year, date.month, date.day,
+                       date.hour, date.minute, date.second, 0, 0, 0)
+
+
+def udf_long_ad(length, block):
+    """Return a UDF long allocation descriptor within partition zero."""
+    return struct.pack('<IIH6x', length, block, 0)
+
+
+def udf_short_ad(length, block):
+    """Return a UDF short allocation descriptor."""
+    return struct.pack('<II', length, block)
+
+
+def udf_icbtag(file_type):
+    """Return the ICB tag of a file entry using short allocation descriptors."""
+    return struct.pack('<IHHHBB6xH', 0, 4, 0, 1, 0, file_type, 0)
+
+
+def udf_file_identifier(characteristics, entry, identifier, location):
+    """Return a UDF file identifier descriptor."""
+    body = (struct.pack('<HBB', 1, characteristics, len(identifier))
+            + udf_long_ad(SECTOR_SIZE, entry) + b'\x00\x00' + identifier)
+    body += bytes(-(16 + len(body)) % 4)
+    return udf_descriptor(257, location, body)
+
+
+def preflight_disk_image(target, volume_id=None, udf=None, joliet=False,
+                         rock_ridge=None, destination=None):
+    """
+    Scan a folder and lay out its disk image without writing any data.
+    UDF and Rock Ridge are chosen automatically when left as None: UDF is
+    always added, as with 'mkisofs -udf', so long names and files over
+    4 GiB are readable everywhere, and Rock Ridge is added for images
+    without UDF or with symbolic links. Return the laid out writer
+    and a report, or raise ValueError if the image cannot be written.
+    """
+
+    writer = IsoWriter(volume_id or generate_disk_label())
+    writer.add_tree(target, SCAN_JOBS)
+
+    report = collections.Counter()
+    report['depth'], report['deepest'] = 0, ''
+    oversize = []
+
+    for node in writer.walk():
+        report[node.kind] += 1
+        if node.kind == 'file' and node.primary is None:
+            report['bytes'] += node.size
+            if node.size > ISO_SIZE_LIMIT:
+                oversize.append(node)
+        if len(node.name) > JOLIET_NAME_LENGTH:
+            report['truncated'] += 1
+
+        path = node.path()
+        if path.count('/') + 1 > report['depth']:
+            report['depth'], report['deepest'] = path.count('/') + 1, path
+
+    if writer.unreadable:
+        raise ValueError("'{0}' and {1} other file(s) cannot be read."
+                         .format(writer.unreadable[0].path(), len(writer.unreadable) - 1))
+
+    writer.udf = True if udf is None else udf
+    writer.rock_ridge = (not writer.udf or bool(report['link'])
+                         if rock_ridge is None else rock_ridge)
+    writer.joliet = joliet
+    writer.layout()
+
+    report['size'] = writer.total_sectors * SECTOR_SIZE
+    report['oversize'] = len(oversize)
+    report['format'] = ' + '.join(name for name, used in (
+        ('ISO 9660', True), ('Joliet', writer.joliet),
+        ('Rock Ridge', writer.rock_ridge), ('UDF', writer.udf)) if used)
+
+    if destination is not None:
+        free = shutil.disk_usage(destination).free
+        if report['size'] > free:
+            raise ValueError("The image needs {0:.1f} MiB but only {1:.1f} MiB is free."
+                             .format(report['size'] / 1024 ** 2, free / 1024 ** 2))
+
+    return writer, report
+
+
+def print_preflight(target, report, file=sys.stdout):
+    """Print the preflight report of a disk image."""
+
+    print("{0}{1}{2}: {3} ({4:.1f} MiB)".format(
+        LIGHT_CYAN, target, COLOUR_RESET, report['format'], report['size'] / 1024 ** 2),
+          file=file)
+    print("  {0} files, {1} folders, {2} links, {3:.1f} MiB of data".format(
+        report['file'], report['dir'], report['link'], report['bytes'] / 1024 ** 2),
+          file=file)
+    print("  Deepest path: {0} ({1} levels)".format(report['deepest'] or '/', report['depth']),
+          file=file)
+    if report['oversize']:
+        print("  {0} file(s) over 4 GiB".format(report['oversize']), file=file)
+    if report['truncated'] and 'Joliet' in report['format']:
+        print("  {0}{1} name(s) shortened for Joliet{2}".format(
+            YELLOW, report['truncated'], COLOUR_RESET), file=file)
+
+
+def write_disk_image(writer, output):
     """
-    Create a UDF disk image (non IS0-9660 compliant). Requires
-    'genisoimage' package to be installed.
+    Write a laid out disk image and return its size. A partially written
+    image is removed on failure.
     """
 
-    basename = target.split('/')[-1]
-    current_directory = os.environ['PWD']
+    if output == '-':
+        writer.write(sys.stdout.buffer)
+    else:
+        with open(output, 'xb') as image:
+            try:
+                writer.write(image)
+            except BaseException:
+                os.remove(output)
+                raise
+
+    return writer.total_sectors * SECTOR_SIZE
 
-    genisofs_command = (
-        'mkisofs -volid "{0}" -output "{1}/{2}.iso" -input-charset UTF-8 -udf -allow-limited-size '
-        '-disable-deep-relocation -untranslated-filenames "{3}" '
-        .format(str(generate_disk_label()), current_directory, basename, target))
 
+def create_disk_image(target, output, volume_id=None, udf=None, joliet=False,
+                      rock_ridge=None, preflight=False):
+    """
+    Create a disk image of a folder at a given path or on standard output.
+    The folder is checked before anything is written. The ISO 9660 names
+    are shortened, so use UDF, Joliet or Rock Ridge to keep the original
+    file names.
+    """
+
+    if output != '-' and os.path.exists(output) and not preflight:
+        print("The disk image {0}{1}{2} already exists, skipping."
+              .format(YELLOW, output, COLOUR_RESET))
+        return
+    elif not os.path.isdir(target):
+        sys.exit("\n{0}ERROR: The target does not exist. Exiting.\n{1}"
+                 .format(LIGHT_RED, COLOUR_RESET))
+
+    destination = None if output == '-' else os.path.dirname(os.path.abspath(output))
     try:
-        if os.path.exists("{0}.iso".format(''.join(sys.argv[1:]))):
-            sys.exit("\n{0}ERROR: The disk image already exists. Exiting.\n{1}"
-                     .format(LIGHT_RED, COLOUR_RESET))
-        elif not os.path.isdir(target):
-            sys.exit("\n{0}ERROR: The target does not exist. Exiting.\n{1}"
-                     .format(LIGHT_RED, COLOUR_RESET))
-        elif os.path.isdir(target):
-            subprocess.run(genisofs_command, shell=True, check=True)
-        else:
-            sys.exit("\n{0}ERROR: An unknown error occurred. Exiting.\n{1}"
-                     .format(LIGHT_RED, COLOUR_RESET))
+        writer, report = preflight_disk_image(target, volume_id, udf, joliet, rock_ridge,
+                                              destination)
+        print_preflight(target, report, sys.stderr if output == '-' else sys.stdout)
+        if not preflight:
+            write_disk_image(writer, output)
+    except (OSError, ValueError) as error:
+        sys.exit("\n{0}ERROR: {1} Exiting.\n{2}".format(LIGHT_RED, error, COLOUR_RESET))
+
+    if output != '-' and not preflight:
+        print("Created disk image {0}{1}{2}.".format(LIGHT_GREEN, output, COLOUR_RESET))
+
+
+def build_disk_image(target, output, volume_id, udf, joliet, rock_ridge, preflight):
+    """Build one image of a batch, returning its status and details."""
+
+    started = time.monotonic()
+
+    try:
+        writer, report = preflight_disk_image(target, volume_id, udf, joliet, rock_ridge,
+                                              os.path.dirname(os.path.abspath(output)))
+        if preflight:
+            return 'checked', "{0}, {1:.1f} MiB, {2} files".format(
+                report['format'], report['size'] / 1024 ** 2, report['file'])
+        size = write_disk_image(writer, output)
+    except (OSError, ValueError) as error:
+        return 'failed', str(error)
+
+    return 'built', "{0}, {1:.1f} MiB in {2:.1f}s".format(
+        report['format'], size / 1024 ** 2, time.monotonic() - started)
+
+
+def read_manifest(manifest):
+    """Return the folders listed in a manifest, ignoring blanks and comments."""
+
+    try:
+        with open(manifest) as lines:
+            return [line.strip() for line in lines
+                    if line.strip() and not line.lstrip().startswith('#')]
     except OSError as error:
-        if error.errno == errno.ENOENT:
+        sys.exit("\n{0}ERROR: Unable to read the manifest: {1}. Exiting.\n{2}"
+                 .format(LIGHT_RED, error, COLOUR_RESET))
+
+
+def default_jobs(targets):
+    """
+    Choose how many images to build at once. Writing an image is limited
+    by disk bandwidth rather than the processor, so allow two images per
+    source disk, up to one per CPU.
+    """
+
+    devices = set()
+    for target in targets:
+        try:
+            devices.add(os.stat(target).st_dev)
+        except OSError:
             pass
+
+    return max(1, min(os.cpu_count() or 1, 2 * len(devices)))
+
+
+def create_disk_images(targets, destination='.', jobs=None, volume_id=None, udf=None,
+                       joliet=False, rock_ridge=None, preflight=False):
+    """
+    Create a disk image of every folder on a process pool, reporting each
+    image as it completes. Each folder is checked before its image is
+    written, and images which already exist are skipped without being
+    scanned. Return the number of images which failed.
+    """
+
+    results = collections.Counter()
+    outputs = set()
+    work = []
+    total = len(targets)
+
+    def report(status, output, detail=''):
+        colour = {'built': LIGHT_GREEN, 'checked': LIGHT_GREEN,
+                  'skipped': YELLOW}.get(status, LIGHT_RED)
+        results[status] += 1
+        print("[{0}/{1}] {2}{3}{4} {5}{6}".format(
+            sum(results.values()), total, colour, status, COLOUR_RESET, output,
+            " ({0})".format(detail) if detail else ''))
+
+    for target in targets:
+        basename = os.path.basename(os.path.normpath(target))
+        output = os.path.join(destination, "{0}.iso".format(basename))
+
+        if output in outputs:
+            report('failed', output, "another folder has the same name")
+        elif os.path.exists(output) and not preflight:
+            report('skipped', output, "already exists")
+        elif not os.path.isdir(target):
+            report('failed', output, "{0} is not a folder".format(target))
         else:
-            raise
+            work.append((target, output))
+        outputs.add(output)
+
+    if work:
+        with concurrent.futures.ProcessPoolExecutor(jobs or default_jobs(
+                [target for target, _ in work])) as executor:
+            futures = {executor.submit(build_disk_image, target, output, volume_id, udf,
+                                       joliet, rock_ridge, preflight): output
+                       for target, output in work}
+            for future in concurrent.futures.as_completed(futures):
+                status, detail = future.result()
+                report(status, futures[future], detail)
+
+    if preflight:
+        print("\n{0} checked, {1} failed.".format(results['checked'], results['failed']))
+    else:
+        print("\n{0} built, {1} skipped, {2} failed.".format(
+            results['built'], results['skipped'], results['failed']))
+
+    return results['failed']
 
 #############
 # Kickstart #
 #############
 
-if os.path.exists(MKISOFS):
-    create_disk_image(''.join(sys.argv[1:]))
-    print()
-elif not os.path.exists(MKISOFS):
-    sys.exit("\n{0}ERROR: Package 'genisofs' is not installed. Exiting.\n{1}"
-             .format(LIGHT_RED, COLOUR_RESET))
-else:
-    sys.exit("\n{0}ERROR: An unknown error occurred. Exiting.\n{1}"
-             .format(LIGHT_RED, COLOUR_RESET))
+if __name__ == '__main__':
+    ARGUMENTS = PARSER.parse_args()
+    TARGETS = ARGUMENTS.targets
+    if ARGUMENTS.manifest:
+        TARGETS += read_manifest(ARGUMENTS.manifest)
+
+    if not TARGETS:
+        PARSER.error("no folders were given")
+    elif ARGUMENTS.jobs is not None and ARGUMENTS.jobs < 1:
+        PARSER.error("--jobs must be at least 1")
+    elif ARGUMENTS.output:
+        if len(TARGETS) > 1:
+            PARSER.error("--output needs exactly one folder")
+        create_disk_image(TARGETS[0], ARGUMENTS.output, ARGUMENTS.volid,
+                          ARGUMENTS.udf, ARGUMENTS.joliet, ARGUMENTS.rock,
+                          ARGUMENTS.preflight)
+    elif create_disk_images(TARGETS, ARGUMENTS.destination, ARGUMENTS.jobs,
+                            ARGUMENTS.volid, ARGUMENTS.udf, ARGUMENTS.joliet,
+                            ARGUMENTS.rock, ARGUMENTS.preflight):
+        sys.exit(1)
 
 # End of File.
@@ -31,121 +31,544 @@ folder.
 # Imports #
 ###########
 
+import argparse
+import concurrent.futures
+import contextlib
+import fcntl
+import hashlib
+import http.client
+import io
+import json
 import os
 import shutil
-import socket
-import subprocess
 import sys
 import tarfile
+import threading
+import time
+import urllib.error
+import urllib.parse
 import urllib.request
 
+import pyiso
+import pynetwork
+from pycommon import CACHE_FOLDER, COLOUR_RESET, GREEN, HOME, RED, HashingReader
+
 #############
 # Variables #
 #############
 
-GREEN = '\x1b[0;32m'
-RED = '\x1b[0;31m'
-YELLOW = '\x1b[0;33m'
-RESET = '\033[0;m'
 
 MINECRAFT_URL = 'https://launcher.mojang.com/download/Minecraft.tar.gz'
 
-HOME = os.environ['HOME']
 DOWNLOADS = "{0}/Downloads".format(HOME)
 
-WGET_PATH = '/usr/bin/wget'
-MKISOFS_PATH = '/usr/bin/mkisofs'
+# Download cache shared by scripts which fetch files from the Internet.
+CACHE_DIRECTORY = "{0}/downloads".format(CACHE_FOLDER)
+CACHE_LIMIT = 512 * 1024 * 1024
+
+# Segmented downloads.
+DOWNLOAD_CONNECTIONS = 4
+DOWNLOAD_RETRIES = 3
+DOWNLOAD_TIMEOUT = 30
+SEGMENT_SIZE = 4 * 1024 * 1024
+
+# The SHA256 of the download is recorded in the volume set identifier of
+# the disk image, which lets unchanged images be detected without reading
+# them.
+IMAGE_STAMP = 'SHA256 '
+IMAGE_STAMP_OFFSET = 16 * pyiso.SECTOR_SIZE + 190
+
+AUTORUN = "{0}\n\n{1}\n\n{2}\n".format("#!/usr/bin/env bash",
+                                       "./minecraft-launcher",
+                                       "# End of File.").encode()
+
+# Command-line arguments.
+PARSER = argparse.ArgumentParser(prog='pyminecraft')
+PARSER.add_argument('--url', default=MINECRAFT_URL,
+                    help="launcher archive to download (default: Mojang)")
+PARSER.add_argument('-o', '--output', default="{0}/Minecraft.iso".format(DOWNLOADS),
+                    help="disk image to create (default: ~/Downloads/Minecraft.iso)")
+PARSER.add_argument('-j', '--connections', type=int, default=DOWNLOAD_CONNECTIONS,
+                    help="number of concurrent connections (default: 4)")
+PARSER.add_argument('--sha256', help="expected SHA256 checksum of the archive")
 
-#############
-# Functions #
-#############
+###########
+# Classes #
+###########
+
+class DownloadChanged(Exception):
+    """The file on the server changed while it was being downloaded."""
 
-def check_network_connection():
+
+class RangeDownloader:
     """
-    Detect whether or not an active Internet connection is available.
+    Download a URL into a file using HTTP Range requests, fetching
+    segments concurrently over a small pool of persistent connections.
+    Progress is kept in a sidecar state file, so an interrupted download
+    resumes where it stopped. Servers which do not advertise
+    'Accept-Ranges: bytes' are downloaded as a single stream.
     """
 
-    try:
-        socket.create_connection(('1.1.1.1', 80))
-        return True
-    except OSError:
-        return False
-
+    def __init__(self, url, path, headers=None, connections=DOWNLOAD_CONNECTIONS,
+                 segment_size=SEGMENT_SIZE):
+        self.url = url
+        self.path = path
+        self.state_path = path + '.json'
+        self.headers = headers or {}
+        self.connections = max(connections, 1)
+        self.segment_size = segment_size
+        self.state = None
+        self.validator = None
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.stopped = threading.Event()
+
+    def download(self):
+        """Download the URL, returning its headers or None if it is not modified."""
+        request = urllib.request.Request(self.url, headers=self.headers, method='HEAD')
+
+        try:
+            with urllib.request.urlopen(request, timeout=DOWNLOAD_TIMEOUT) as response:
+                headers = response.headers
+                self.url = response.geturl()
+        except urllib.error.HTTPError as error:
+            if error.code == 304:
+                self.discard()
+                return None
+            if error.code not in (403, 405, 501):
+                raise
+            return self.download_stream()
+
+        size = int(headers.get('Content-Length') or 0)
+        if headers.get('Accept-Ranges', '').lower() != 'bytes' or not size:
+            return self.download_stream()
+
+        self.download_ranges(size, headers)
+        return headers
+
+    def download_stream(self):
+        """Download the whole URL over a single connection."""
+        request = urllib.request.Request(self.url, headers=self.headers)
+
+        try:
+            response = urllib.request.urlopen(request, timeout=DOWNLOAD_TIMEOUT)
+        except urllib.error.HTTPError as error:
+            if error.code == 304:
+                self.discard()
+                return None
+            raise
+
+        with response, open(self.path, 'wb') as file:
+            shutil.copyfileobj(response, file, pyiso.BUFFER_SIZE)
+
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.state_path)
+
+        return response.headers
+
+    def download_ranges(self, size, headers):
+        """Download any missing segments of the URL concurrently."""
+        etag = headers.get('ETag')
+        self.validator = etag if etag and not etag.startswith('W/') else headers.get('Last-Modified')
+
+        # Resume only if the file on the server is the one being downloaded.
+        state = self.load_state()
+        if (state is None or state['size'] != size or state['validator'] != self.validator
+                or not os.path.isfile(self.path)):
+            state = {'url': self.url, 'size': size, 'validator': self.validator,
+                     'segments': [[start, min(start + self.segment_size, size), 0]
+                                  for start in range(0, size, self.segment_size)]}
+            with open(self.path, 'wb') as file:
+                file.truncate(size)
+        self.state = state
+
+        pending = [segment for segment in state['segments']
+                   if segment[0] + segment[2] < segment[1]]
+        descriptor = os.open(self.path, os.O_WRONLY)
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(self.connections) as executor:
+                futures = [executor.submit(self.fetch, descriptor, segment)
+                           for segment in pending]
+                try:
+                    for future in concurrent.futures.as_completed(futures):
+                        future.result()
+                        self.save_state(descriptor)
+                except BaseException:
+                    self.stopped.set()
+                    raise
+        except DownloadChanged:
+            self.discard()
+            raise
+        except BaseException:
+            # Keep the progress so that the next run resumes.
+            self.save_state(descriptor)
+            raise
+        finally:
+            os.close(descriptor)
+
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.state_path)
+
+    def fetch(self, descriptor, segment):
+        """Download one segment, retrying after connection errors."""
+        for attempt in range(DOWNLOAD_RETRIES):
+            if self.stopped.is_set():
+                return
+            try:
+                self.fetch_range(descriptor, segment)
+                return
+            except (OSError, http.client.HTTPException):
+                self.close_connection()
+                if attempt == DOWNLOAD_RETRIES - 1:
+                    raise
+
+    def fetch_range(self, descriptor, segment):
+        """Download the rest of a segment with a Range request."""
+        start, end, done = segment
+        offset = start + done
+        parts = urllib.parse.urlsplit(self.url)
+        target = parts.path + ('?' + parts.query if parts.query else '')
+
+        headers = {'Range': 'bytes={0}-{1}'.format(offset, end - 1)}
+        if self.validator:
+            headers['If-Range'] = self.validator
+
+        connection = self.connection(parts)
+        connection.request('GET', target or '/', headers=headers)
+        response = connection.getresponse()
+
+        if response.status != 206:
+            self.close_connection()
+            raise DownloadChanged("The server ignored a range request for {0}"
+                                  .format(self.url))
+
+        while offset < end and not self.stopped.is_set():
+            data = response.read(min(pyiso.BUFFER_SIZE, end - offset))
+            if not data:
+                raise ConnectionResetError("The connection closed during a download")
+            os.pwrite(descriptor, data, offset)
+            offset += len(data)
+            with self.lock:
+                segment[2] = offset - start
+
+        if offset < end:
+            self.close_connection()
+        else:
+            response.read()
+
+    def connection(self, parts):
+        """Return the persistent connection of the current thread."""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            if parts.scheme == 'https':
+                connection = http.client.HTTPSConnection(parts.netloc, timeout=DOWNLOAD_TIMEOUT)
+            else:
+                connection = http.client.HTTPConnection(parts.netloc, timeout=DOWNLOAD_TIMEOUT)
+            self.local.connection = connection
+        return connection
+
+    def close_connection(self):
+        """Close the connection of the current thread."""
+        connection = getattr(self.local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+    def load_state(self):
+        """Return the saved progress of an interrupted download, if any."""
+        try:
+            with open(self.state_path) as state:
+                state = json.load(state)
+        except (OSError, ValueError):
+            return None
+        return state if state.get('url') == self.url else None
+
+    def save_state(self, descriptor):
+        """Flush the downloaded data and save the progress of each segment."""
+        os.fsync(descriptor)
+        with self.lock:
+            state = json.dumps(self.state)
+        with open(self.state_path + '.tmp', 'w') as file:
+            file.write(state)
+        os.replace(self.state_path + '.tmp', self.state_path)
+
+    def discard(self):
+        """Remove a partial download and its saved progress."""
+        for path in (self.path, self.state_path):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+
+class DownloadCache:
+    """
+    Persistent download cache keyed by URL. Each entry keeps the ETag,
+    Last-Modified header and SHA256 of a download so that later requests
+    can be conditional. The cache is capped in size and evicts the least
+    recently used downloads first. Its index is locked while in use, so
+    several scripts may share it.
+    """
 
-def remove_minecraft_data():
-    """Delete data which are not part of the final .iso image."""
+    def __init__(self, directory=CACHE_DIRECTORY, limit=CACHE_LIMIT):
+        self.directory = directory
+        self.limit = limit
+        self.index = os.path.join(directory, 'index.json')
+
+    @contextlib.contextmanager
+    def locked(self):
+        """Lock the cache and yield its entries, saving any changes."""
+        os.makedirs(self.directory, exist_ok=True)
+
+        with open(os.path.join(self.directory, 'index.lock'), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+
+            try:
+                with open(self.index) as index:
+                    entries = json.load(index)
+            except (OSError, ValueError):
+                entries = {}
+
+            original = json.dumps(entries, sort_keys=True)
+            yield entries
+
+            if json.dumps(entries, sort_keys=True) != original:
+                with open(self.index + '.tmp', 'w') as index:
+                    json.dump(entries, index, indent=2, sort_keys=True)
+                os.replace(self.index + '.tmp', self.index)
+
+    def path(self, entry):
+        """Return the location of a cached download."""
+        return os.path.join(self.directory, entry['sha256'])
+
+    def conditions(self, url):
+        """Return the cached entry of a URL and headers for a conditional request."""
+        headers = {}
+
+        with self.locked() as entries:
+            entry = entries.get(url)
+            if entry is not None and not os.path.isfile(self.path(entry)):
+                del entries[url]
+                entry = None
+
+        if entry is not None:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        return entry, headers
+
+    def touch(self, url):
+        """Mark the cached copy of a URL as recently used."""
+        with self.locked() as entries:
+            if url in entries:
+                entries[url]['accessed'] = time.time()
+
+    def discard(self, url):
+        """Remove the cached copy of a URL."""
+        with self.locked() as entries:
+            entry = entries.pop(url, None)
+            if entry is not None:
+                self.remove(entries, entry)
+
+    def partial(self, url):
+        """Return the location of an unfinished download of a URL."""
+        os.makedirs(self.directory, exist_ok=True)
+        name = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.directory, 'partial-{0}'.format(name))
+
+    def store(self, url, headers, path, sha256, size):
+        """Move a completed download into the cache and evict old entries."""
+        if size > self.limit:
+            os.remove(path)
+            return None
+
+        with self.locked() as entries:
+            os.replace(path, os.path.join(self.directory, sha256))
+            entries[url] = {'sha256': sha256,
+                            'size': size,
+                            'etag': headers.get('ETag'),
+                            'last_modified': headers.get('Last-Modified'),
+                            'accessed': time.time()}
+
+            # Identical downloads from different URLs share one file.
+            sizes = {entry['sha256']: entry['size'] for entry in entries.values()}
+            total = sum(sizes.values())
+
+            for old_url, entry in sorted(entries.items(), key=lambda item: item[1]['accessed']):
+                if total <= self.limit:
+                    break
+                del entries[old_url]
+                if self.remove(entries, entry):
+                    total -= entry['size']
+
+            return entries.get(url)
+
+    def remove(self, entries, entry):
+        """Delete the file of an entry unless another URL still uses it."""
+        if any(other['sha256'] == entry['sha256'] for other in entries.values()):
+            return False
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.path(entry))
+        return True
 
-    print("Removing old Minecraft Launcher data...")
+#############
+# Functions #
+#############
 
-    if os.path.exists("{0}/minecraft.tar.gz".format(DOWNLOADS)):
-        os.remove("{0}/minecraft.tar.gz".format(DOWNLOADS))
-        print("Deleted old 'minecraft.tar.gz' file.")
+def read_image_stamp(output):
+    """Return the SHA256 of the download an existing disk image was built from."""
 
-    if os.path.exists("{0}/Minecraft".format(DOWNLOADS)):
-        shutil.rmtree("{0}/Minecraft".format(DOWNLOADS))
-        print("Deleted old 'Minecraft' directory.")
+    try:
+        with open(output, 'rb') as image:
+            image.seek(IMAGE_STAMP_OFFSET)
+            stamp = image.read(128).decode('ascii', 'replace').strip()
+    except OSError:
+        return None
 
-    if os.path.exists("{0}/minecraft-launcher".format(DOWNLOADS)):
-        shutil.rmtree("{0}/minecraft-launcher".format(DOWNLOADS))
-        print("Deleted old 'minecraft-launcher' directory.")
+    return stamp[len(IMAGE_STAMP):] if stamp.startswith(IMAGE_STAMP) else None
 
 
-def download_minecraft_data():
+def download_minecraft_data(url=MINECRAFT_URL, output="{0}/Minecraft.iso".format(DOWNLOADS),
+                            connections=DOWNLOAD_CONNECTIONS, sha256=None):
     """
-    Download minecraft data and compile a mountable .iso image file.
+    Download minecraft data and compile a mountable .iso image file. The
+    request is conditional on the cached copy of the launcher archive, so
+    nothing is downloaded or rebuilt when the launcher has not changed.
     """
 
-    # Terminate if dependency 'genisoimage' is not installed.
-    if not os.path.exists(MKISOFS_PATH):
-        sys.exit("{0}ERROR: Program dependency 'genisoimage' not installed.{1}".format(RED, RESET))
-
-    remove_minecraft_data()
+    cache = DownloadCache()
+    entry, headers = cache.conditions(url)
+    partial = cache.partial(url)
+    downloader = RangeDownloader(url, partial, headers, connections)
 
-    # Download the 'minecraft.tar.gz' file.
     print("Downloading Minecraft launcher archive...")
-    urllib.request.urlretrieve(MINECRAFT_URL, "{0}/minecraft.tar.gz".format(DOWNLOADS))
-
-    # Extract the contents of 'minecraft.tar.gz'.
-    print("Extracting Minecraft launcher archive...")
-    archive = tarfile.open("{0}/minecraft.tar.gz".format(DOWNLOADS))
-    archive.extractall("{0}".format(DOWNLOADS))
-
-    # Inject 'autorun.sh' file.
-    print("Injecting 'autorun.sh' file...")
-    autorun = open("{0}/minecraft-launcher/autorun.sh".format(DOWNLOADS), "w")
-    autorun.write("{0}\n\n{1}\n\n{2}\n".format("#!/usr/bin/env bash",
-                                               "./minecraft-launcher",
-                                               "# End of File."))
-    autorun.close()
-
-    # Make 'autorun.sh' executable.
-    print("Making 'autorun.sh' file executable...")
-    os.chmod("{0}/minecraft-launcher/autorun.sh".format(DOWNLOADS), 0o755)
+    try:
+        headers = downloader.download()
+    except DownloadChanged:
+        sys.exit("\n{0}ERROR: The launcher archive changed during the download. "
+                 "Run the script again to restart it. Exiting.{1}\n".format(RED, COLOUR_RESET))
+    except (OSError, http.client.HTTPException) as error:
+        sys.exit("\n{0}ERROR: Unable to download the launcher: {1}. Run the script "
+                 "again to resume. Exiting.{2}\n".format(RED, error, COLOUR_RESET))
+
+    # Not modified: reuse the existing image or rebuild it from the cache.
+    if headers is None:
+        cache.touch(url)
+
+        if sha256 and entry['sha256'] != sha256.lower():
+            sys.exit("\n{0}ERROR: The cached download does not match the expected "
+                     "checksum. Exiting.{1}\n".format(RED, COLOUR_RESET))
+
+        if read_image_stamp(output) == entry['sha256']:
+            print("The Minecraft launcher is unchanged and '{0}' is up to date."
+                  .format(output))
+            return
+
+        print("The Minecraft launcher is unchanged, using the cached download...")
+        with open(cache.path(entry), 'rb') as cached:
+            download = build_minecraft_image(cached, output, url)
+
+        if download.hexdigest() != entry['sha256']:
+            os.remove(output)
+            cache.discard(url)
+            sys.exit("\n{0}ERROR: The cached download is corrupt and has been removed. "
+                     "Exiting.{1}\n".format(RED, COLOUR_RESET))
+    else:
+        with open(partial, 'rb') as archive:
+            download = build_minecraft_image(archive, output, url)
+
+        # Verify the assembled download before it is cached.
+        if sha256 and download.hexdigest() != sha256.lower():
+            os.remove(output)
+            downloader.discard()
+            sys.exit("\n{0}ERROR: The download does not match the expected checksum. "
+                     "Exiting.{1}\n".format(RED, COLOUR_RESET))
+
+        cache.store(url, headers, partial, download.hexdigest(), download.size)
+
+    print("{0} archive SHA256: {1}{2}{3}".format("Cached" if headers is None else "Downloaded",
+                                                GREEN, download.hexdigest(), COLOUR_RESET))
+    print("Created disk image {0}{1}{2}.".format(GREEN, output, COLOUR_RESET))
+
+
+def build_minecraft_image(source, output, url):
+    """
+    Build the disk image from a launcher archive. The archive is read as a
+    stream and its members are written into the image as they arrive, so
+    no files are extracted. Return the hashing reader of the archive.
+    """
 
     # Remove previous build of 'Minecraft.iso' file if exists.
-    if os.path.exists("{0}/Minecraft.iso".format(DOWNLOADS)):
-        os.remove("{0}/Minecraft.iso".format(DOWNLOADS))
-        print("Deleted old 'Minecraft.iso' file.")
+    if os.path.exists(output):
+        os.remove(output)
+        print("Deleted old '{0}' file.".format(os.path.basename(output)))
 
-    # Create the .iso Disk Image.
-    mkisofs_command = ("mkisofs -volid 'Minecraft' -o '{0}/Minecraft.iso' -input-charset UTF-8 "
-                       "-joliet -joliet-long -rock '{0}/minecraft-launcher' > /dev/null 2>&1"
-                       .format(DOWNLOADS))
-    print("Building '{0}/Minecraft.iso' disk image...".format(DOWNLOADS))
-    subprocess.run(mkisofs_command, shell=True, check=True)
+    writer = pyiso.IsoWriter('Minecraft', udf=False, joliet=True, rock_ridge=True)
+    download = HashingReader(source, 'sha256')
+    nodes = {}
+    complete = False
 
-    # Cleanup the Download folder.
-    remove_minecraft_data()
+    print("Building '{0}' disk image from {1}...".format(output, url))
+    try:
+        with open(output, 'xb') as image:
+            writer.begin(image)
+
+            with tarfile.open(fileobj=download, mode='r|gz') as archive:
+                for member in archive:
+                    # Store the contents of the 'minecraft-launcher' folder.
+                    path = member.name.partition('/')[2].strip('/')
+                    details = dict(mode=member.mode, mtime=member.mtime,
+                                   uid=member.uid, gid=member.gid)
+
+                    if not path:
+                        continue
+                    elif member.isdir():
+                        writer.add(path, 'dir', **details)
+                    elif member.isfile():
+                        nodes[member.name] = writer.add_data(
+                            path, archive.extractfile(member), member.size, **details)
+                    elif member.issym():
+                        writer.add(path, 'link', target=member.linkname, **details)
+                    elif member.islnk() and member.linkname in nodes:
+                        primary = nodes[member.linkname]
+                        writer.add(path, 'file', size=primary.size, **details).primary = primary
+
+            # Read any trailing data so that the digest covers the download.
+            while download.read(pyiso.BUFFER_SIZE):
+                pass
+
+            # Inject 'autorun.sh' file.
+            print("Injecting 'autorun.sh' file...")
+            writer.add_data('autorun.sh', io.BytesIO(AUTORUN), len(AUTORUN),
+                            mode=0o755, mtime=time.time())
+            writer.volume_set = IMAGE_STAMP + download.hexdigest()
+            writer.finish()
+            complete = True
+    except (OSError, tarfile.TarError) as error:
+        sys.exit("\n{0}ERROR: Unable to build the disk image: {1}. Exiting.{2}\n"
+                 .format(RED, error, COLOUR_RESET))
+    finally:
+        # Never leave a partial disk image behind.
+        if not complete and writer.output is not None:
+            os.remove(output)
+
+    return download
 
 #############
 # Kickstart #
 #############
 
-if check_network_connection():
-    download_minecraft_data()
-elif not check_network_connection():
-    sys.exit("\n{0}ERROR: Network connection not available. Exiting.{1}\n".format(RED, RESET))
-else:
-    sys.exit("\n{0}ERROR: An unknown error occurred. Exiting.{1}\n".format(RED, RESET))
+if __name__ == '__main__':
+    ARGUMENTS = PARSER.parse_args()
+
+    # A custom URL may point at a local mirror, so only the default
+    # download requires an Internet connection.
+    if ARGUMENTS.url != MINECRAFT_URL or pynetwork.check_network_connection():
+        download_minecraft_data(ARGUMENTS.url, ARGUMENTS.output, ARGUMENTS.connections,
+                                ARGUMENTS.sha256)
+    else:
+        sys.exit("\n{0}ERROR: Network connection not available. Exiting.{1}\n"
+                 .format(RED, COLOUR_RESET))
 
 # End of File.
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Detect whether an Internet connection is available without blocking,
+shared by the scripts which need one.
+"""
+
+###########
+# License #
+###########
+
+# Shell Scripts: A collection of shell scripts in various languages.
+# Copyright (C) 2020 William Willis Whinn
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+###########
+# Imports #
+###########
+
+import asyncio
+import concurrent.futures
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+from pycommon import CACHE_FOLDER, COLOUR_RESET, GREEN, RED
+
+#############
+# Variables #
+#############
+
+# Script Metadata
+SCRIPT_VERSION = '0.1.0'
+
+
+# Endpoints which are tried at the same time. The first connection to
+# succeed within the timeout shows that the network is available.
+PROBE_ENDPOINTS = [('1.1.1.1', 80), ('1.0.0.1', 80), ('8.8.8.8', 53), ('9.9.9.9', 53)]
+PROBE_TIMEOUT = 0.5
+
+# A successful probe is remembered by every script for PROBE_TTL seconds.
+PROBE_TTL = 300
+PROBE_CACHE = "{0}/network.json".format(CACHE_FOLDER)
+
+#############
+# Functions #
+#############
+
+async def probe_endpoint(host, port):
+    """Open and close a TCP connection to one endpoint."""
+    _, writer = await asyncio.open_connection(host, port)
+    writer.close()
+    with contextlib.suppress(OSError):
+        await writer.wait_closed()
+    return True
+
+
+async def probe_endpoints(endpoints, timeout):
+    """
+    Connect to every endpoint at once and return True as soon as one
+    succeeds, or False if none succeed before the timeout.
+    """
+    tasks = [asyncio.ensure_future(probe_endpoint(host, port)) for host, port in endpoints]
+
+    try:
+        for task in asyncio.as_completed(tasks, timeout=timeout):
+            with contextlib.suppress(OSError):
+                return await task
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return False
+
+
+def read_probe_cache(ttl, cache=PROBE_CACHE):
+    """Return whether a successful probe was recorded within ttl seconds."""
+    try:
+        with open(cache) as state:
+            return 0 <= time.time() - json.load(state)['online'] < ttl
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+
+
+def write_probe_cache(cache=PROBE_CACHE):
+    """Record a successful probe, ignoring a cache which cannot be written."""
+    try:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        with open("{0}.tmp".format(cache), 'w') as state:
+            json.dump({'online': time.time()}, state)
+        os.replace("{0}.tmp".format(cache), cache)
+    except OSError:
+        pass
+
+
+def check_network_connection(endpoints=None, timeout=PROBE_TIMEOUT, ttl=PROBE_TTL,
+                             cache=PROBE_CACHE):
+    """
+    Detect whether or not an active Internet connection is available,
+    waiting at most timeout seconds. Only successful probes are cached, so
+    a restored connection is noticed straight away.
+    """
+    if ttl and cache and read_probe_cache(ttl, cache):
+        return True
+
+    online = asyncio.run(probe_endpoints(endpoints or PROBE_ENDPOINTS, timeout))
+    if online and cache:
+        write_probe_cache(cache)
+    return online
+
+
+def start_network_probe(endpoints=None, timeout=PROBE_TIMEOUT, ttl=PROBE_TTL,
+                        cache=PROBE_CACHE):
+    """
+    Start checking the network connection in the background and return a
+    future of the result, so that a menu can be shown in the meantime.
+    """
+    future = concurrent.futures.Future()
+
+    def probe():
+        try:
+            future.set_result(check_network_connection(endpoints, timeout, ttl, cache))
+        except BaseException as error:
+            future.set_exception(error)
+
+    threading.Thread(target=probe, daemon=True).start()
+    return future
+
+#############
+# Kickstart #
+#############
+
+if __name__ == '__main__':
+    if check_network_connection():
+        print("{0}Network connection available.{1}".format(GREEN, COLOUR_RESET))
+    else:
+        sys.exit("{0}Network connection not available.{1}".format(RED, COLOUR_RESET))
+
+# End of File.
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Run any of the Python 3 scripts as a subcommand of a single program,
+importing only the script which is asked for.
+"""
+
+###########
+# License #
+###########
+
+# Shell Scripts: A collection of shell scripts in various languages.
+# Copyright (C) 2020 William Willis Whinn
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+###########
+# Imports #
+###########
+
+import argparse
+import runpy
+import sys
+
+#############
+# Variables #
+#############
+
+# Script Metadata
+SCRIPT_VERSION = '0.1.0'
+
+# Subcommands and the scripts which implement them. The descriptions are
+# kept here so that '--help' does not need to import any of the scripts.
+COMMANDS = {
+    'backup': ('pybackup', "back up the home folder to a local or external disk"),
+    'bench': ('pybench', "measure the throughput and start-up time of the scripts"),
+    'gpg': ('pygpg', "encrypt or decrypt files using GnuPG"),
+    'iso': ('pyiso', "create mountable ISO disk images of folders"),
+    'minebackup': ('minebackup', "back up Minecraft: Java Edition save data"),
+    'minecraft': ('pyminecraft', "download the Minecraft launcher to a disk image"),
+    'network': ('pynetwork', "check whether an Internet connection is available"),
+    'setup': ('pysetup', "update and maintain a Linux installation"),
+    'silverblue': ('pysilverblue', "manage Flatpak and RPM software on Fedora Silverblue"),
+    'tarhash': ('tarhash', "create and verify checksummed tarballs"),
+}
+
+# Command-line arguments.
+PARSER = argparse.ArgumentParser(
+    prog='pyscripts', formatter_class=argparse.RawDescriptionHelpFormatter,
+    description="Run one of the Python 3 scripts. Options after the command are\n"
+                "passed to it, so 'pyscripts iso --help' shows its own help.",
+    epilog="commands:\n" + "\n".join("  {0:<12} {1}".format(command, description)
+                                     for command, (_, description) in COMMANDS.items()))
+PARSER.add_argument('command', choices=COMMANDS, metavar='command',
+                    help="the script to run")
+PARSER.add_argument('arguments', nargs=argparse.REMAINDER,
+                    help="options and arguments for the script")
+PARSER.add_argument('-V', '--version', action='version',
+                    version="%(prog)s {0}".format(SCRIPT_VERSION))
+
+#############
+# Functions #
+#############
+
+def pyscripts_main(argv=None):
+    """Run the script for the requested command as if it were started directly."""
+    arguments = PARSER.parse_args(argv)
+    module = COMMANDS[arguments.command][0]
+
+    # The script parses its own arguments from sys.argv, which runpy
+    # completes with the path of the script.
+    sys.argv = [arguments.command] + arguments.arguments
+    runpy.run_module(module, run_name='__main__', alter_sys=True)
+
+#############
+# Kickstart #
+#############
+
+if __name__ == '__main__':
+    pyscripts_main()
+
+# End of File.
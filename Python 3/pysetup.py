@@ -23,65 +23,47 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-##############
-# References #
-##############
-
-# Detect Internet Connection
-# - https://tinyurl.com/yc44q3b4
-
 ###########
 # Imports #
 ###########
 
+import argparse
+import concurrent.futures
+import json
 import os
-import socket
+import shutil
 import subprocess
 import sys
+import threading
+import time
+
+import pynetwork
+from pycommon import (BOLD, CACHE_FOLDER, COLOUR_RESET, CYAN, HOME, LIGHT_BLUE, LIGHT_CYAN,
+                      LIGHT_GREEN, LIGHT_MAGENTA, LIGHT_RED, LIGHT_YELLOW, MAGENTA, SCRIPT_URL,
+                      clear)
 
 #############
 # Variables #
 #############
 
 # Script Metadata
-SCRIPT_VERSION = '0.1.5'
-SCRIPT_URL = 'https://github.com/ultraviolet-1968/shell_scripts'
-
-# String colours and formatting
-BLUE = '\033[0;34m'
-CYAN = '\033[0;36m'
-GREEN = '\033[0;32m'
-MAGENTA = '\033[0;35m'
-RED = '\033[0;31m'
-YELLOW = '\033[0;33m'
-
-LIGHT_BLUE = '\033[0;94m'
-LIGHT_CYAN = '\033[0;96m'
-LIGHT_GREEN = '\033[0;92m'
-LIGHT_MAGENTA = '\033[0;95m'
-LIGHT_RED = '\033[0;91m'
-LIGHT_YELLOW = '\033[0;93m'
-
-BLACK = '\033[0;30m'
-GREY = '\033[0;90m'
-WHITE = '\033[0;97m'
-
-BOLD = '\033[1m'
-UNDERLINE = '\033[4m'
-
-COLOUR_RESET = '\033[0;m'
+SCRIPT_VERSION = '0.3.0'
 
-# Environmental Variables
-HOME = os.environ['HOME']
+# Command-line arguments.
+PARSER = argparse.ArgumentParser(prog='pysetup')
+PARSER.add_argument('--plan', action='store_true',
+                    help="show which package managers would update and the estimated time")
 
-# System Package Manager executables
-APT = '/usr/bin/apt'
-DNF = '/usr/bin/dnf'
-RPM_OSTREE = '/usr/bin/rpm-ostree'
+# System Package Manager executables, found on the PATH first so that
+# they can be replaced by stubs when testing.
+APT = shutil.which('apt') or '/usr/bin/apt'
+DNF = shutil.which('dnf') or '/usr/bin/dnf'
+RPM_OSTREE = shutil.which('rpm-ostree') or '/usr/bin/rpm-ostree'
+SUDO = [] if os.geteuid() == 0 else ['sudo']
 
 # Universal Package Manager executables
-FLATPAK = '/usr/bin/flatpak'
-SNAP = '/usr/bin/snap'
+FLATPAK = shutil.which('flatpak') or '/usr/bin/flatpak'
+SNAP = shutil.which('snap') or '/usr/bin/snap'
 
 # Anaconda (User-Installed) Package Manager executables
 ANACONDA = "{0}/anaconda3/bin/anaconda".format(HOME)
@@ -90,26 +72,26 @@ CONDA = "{0}/anaconda3/bin/conda".format(HOME)
 # ClamAV Executables
 FRESHCLAM = '/usr/bin/freshclam'
 
+# Package managers run concurrently, so they must not ask questions, and
+# their output is prefixed with their name in one of these colours.
+MANAGER_COLOURS = [LIGHT_CYAN, LIGHT_MAGENTA, LIGHT_BLUE, LIGHT_YELLOW, CYAN, MAGENTA]
+OUTPUT_LOCK = threading.Lock()
+
+# Package managers whose metadata was refreshed within UPDATE_FRESHNESS
+# seconds with nothing pending are skipped. The time and result of every
+# check and update is kept in the state file to plan the next run.
+UPDATE_FRESHNESS = 6 * 60 * 60
+UPDATE_STATE = "{0}/pysetup.json".format(CACHE_FOLDER)
+
 #############
 # Functions #
 #############
 
-def clear():
-    """Clear the current Terminal window."""
-    os.system('clear')
-
-
-def check_network_connection():
-    """Detect whether or not an active Internet connection is available."""
-    try:
-        socket.create_connection(('1.1.1.1', 80))
-        return True
-    except OSError:
-        return False
-
-
-def linux_setup_menu():
-    """Clear the screen and display the main menu."""
+def linux_setup_menu(network):
+    """
+    Clear the screen and display the main menu while the network
+    connection is checked in the background.
+    """
 
     clear()
 
@@ -125,7 +107,10 @@ def linux_setup_menu():
 
     answer = input("Please enter your selection: ")
 
-    if answer == '1':
+    if answer in ('1', '2') and not network.result():
+        sys.exit("\n{0}ERROR: Network connection not available. Exiting.{1}\n"
+                 .format(LIGHT_RED, COLOUR_RESET))
+    elif answer == '1':
         clear()
         update_system_software()
     elif answer == '2':
@@ -139,56 +124,298 @@ def linux_setup_menu():
         sys.exit('ERROR: Incorrect response\n')
 
 
-def update_system_software():
-    """Detect various package managers and update system software."""
+def detect_package_managers():
+    """
+    Return the installed package managers as (name, commands, check)
+    tuples. The commands run in order, and every manager runs at once. The
+    check is a list of commands which refresh the metadata, and a function
+    which counts the pending updates from the output of the last command.
+    """
+    managers = []
 
     # Native Package Managers: DNF, APT, etc.
     if os.path.exists(APT):
-        print("{0}APT System Software Section{1}".format(LIGHT_YELLOW, COLOUR_RESET))
-        subprocess.run('sudo {0} update'.format(APT), shell=True, check=True)
-        print()
-        subprocess.run('sudo {0} full-upgrade'.format(APT), shell=True, check=True)
-        print()
-
+        managers.append(('apt', [SUDO + [APT, 'full-upgrade', '--yes']],
+                         ([SUDO + [APT, 'update'], [APT, 'list', '--upgradable']],
+                          count_apt_updates)))
     elif os.path.exists(DNF):
-        print("{0}DNF System Software Section{1}".format(LIGHT_YELLOW, COLOUR_RESET))
-        subprocess.run('sudo {0} update --refresh'.format(DNF), shell=True, check=True)
-        print()
-
+        managers.append(('dnf', [SUDO + [DNF, 'update', '--assumeyes']],
+                         ([[DNF, 'check-update', '--refresh', '--quiet']],
+                          count_dnf_updates)))
     elif os.path.exists(RPM_OSTREE):
-        print("{0}RPM-OSTree System Software Section{1}".format(LIGHT_YELLOW, COLOUR_RESET))
-        subprocess.run('{0} refresh-md'.format(RPM_OSTREE), shell=True, check=True)
-        print()
-        subprocess.run('{0} upgrade'.format(RPM_OSTREE), shell=True, check=True)
-        print()
-
+        managers.append(('rpm-ostree', [[RPM_OSTREE, 'upgrade']],
+                         ([[RPM_OSTREE, 'upgrade', '--check']], count_rpm_ostree_updates)))
     else:
-        sys.exit("{0}Could not detect a native package manager. Exiting.{1}\n"
-                 .format(LIGHT_RED, COLOUR_RESET))
+        return None
 
     # Universal Package Managers: Flatpak, Snap, etc.
     if os.path.exists(FLATPAK):
-        print("{0}Flatpak Universal Software Section{1}".format(LIGHT_YELLOW, COLOUR_RESET))
-        subprocess.run('{0} update'.format(FLATPAK), shell=True, check=True)
-        print()
-    else:
-        pass
-
+        managers.append(('flatpak', [[FLATPAK, 'update', '--noninteractive']],
+                         ([[FLATPAK, 'remote-ls', '--updates', '--columns=application']],
+                          count_flatpak_updates)))
     if os.path.exists(SNAP):
-        print("{0}Snap Universal Software Section{1}".format(LIGHT_YELLOW, COLOUR_RESET))
-        subprocess.run('{0} refresh'.format(SNAP), shell=True, check=True)
-        print()
-    else:
-        pass
+        managers.append(('snap', [[SNAP, 'refresh']],
+                         ([[SNAP, 'refresh', '--list']], count_snap_updates)))
 
+    # Anaconda (User-Installed) Package Manager, which can only find updates
+    # by solving the whole environment, so it is simply updated when stale.
     if os.path.exists(CONDA):
-        print("{0}Anaconda 3 Python Distribution Section{1}"
-              .format(LIGHT_YELLOW, COLOUR_RESET))
-        subprocess.run('{0} update --all'.format(CONDA), shell=True, check=True)
-    else:
+        managers.append(('conda', [[CONDA, 'update', '--all', '--yes']], None))
+
+    return managers
+
+
+def count_apt_updates(returncode, output):
+    """Count the packages listed by 'apt list --upgradable'."""
+    if returncode:
+        return None
+    return sum('/' in line for line in output.splitlines())
+
+
+def count_dnf_updates(returncode, output):
+    """Count the packages listed by 'dnf check-update', which exits with 100."""
+    if returncode not in (0, 100):
+        return None
+    return sum(bool(line.strip()) for line in output.splitlines()) if returncode else 0
+
+
+def count_rpm_ostree_updates(returncode, _):
+    """Return whether 'rpm-ostree upgrade --check' found an update."""
+    return {0: 1, 77: 0}.get(returncode)
+
+
+def count_flatpak_updates(returncode, output):
+    """Count the applications listed by 'flatpak remote-ls --updates'."""
+    if returncode:
+        return None
+    return sum(bool(line.strip()) for line in output.splitlines())
+
+
+def count_snap_updates(returncode, output):
+    """Count the snaps listed by 'snap refresh --list' below its heading."""
+    if returncode:
+        return None
+    lines = [line for line in output.splitlines() if line.strip()]
+    return len(lines) - 1 if lines and lines[0].startswith('Name') else 0
+
+
+def load_update_state(path=UPDATE_STATE):
+    """Return the recorded checks and updates of every package manager."""
+    try:
+        with open(path) as state:
+            return json.load(state)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_update_state(state, path=UPDATE_STATE):
+    """Record the checks and updates of every package manager."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open("{0}.tmp".format(path), 'w') as output:
+            json.dump(state, output, indent=2, sort_keys=True)
+        os.replace("{0}.tmp".format(path), path)
+    except OSError:
         pass
 
-    sys.exit("{0}System software has been updated.{1}\n".format(LIGHT_GREEN, COLOUR_RESET))
+
+def run_update_check(commands, count):
+    """
+    Run the check commands of a package manager quietly, returning the
+    number of pending updates (None when unknown) and the duration. If a
+    command before the last one fails, such as a metadata refresh, the
+    count would be taken from stale metadata, so it is unknown instead.
+    """
+    started = time.monotonic()
+
+    for number, command in enumerate(commands, 1):
+        try:
+            process = subprocess.run(command, stdin=subprocess.DEVNULL, capture_output=True,
+                                     text=True, errors='replace')
+        except OSError:
+            return None, time.monotonic() - started
+        if process.returncode and number < len(commands):
+            return None, time.monotonic() - started
+
+    return count(process.returncode, process.stdout), time.monotonic() - started
+
+
+def plan_package_managers(managers, state, now):
+    """
+    Decide what each package manager needs without running anything.
+    Return (manager, action, reason, estimate) tuples, where the action is
+    'skip', 'check' or 'update', and the estimate is in seconds or None.
+    """
+    plan = []
+
+    for manager in managers:
+        name, _, check = manager
+        record = state.get(name, {})
+        fresh = now - record.get('refreshed', 0) < UPDATE_FRESHNESS
+
+        if fresh and record.get('pending') == 0:
+            plan.append((manager, 'skip', "up to date", 0))
+        elif fresh and record.get('pending'):
+            plan.append((manager, 'update', "{0} pending".format(record['pending']),
+                         record.get('update_duration')))
+        elif check is None:
+            plan.append((manager, 'update', "not updated recently",
+                         record.get('update_duration')))
+        else:
+            estimate = record.get('check_duration')
+            if estimate is not None and record.get('update_duration') is not None:
+                estimate += record['update_duration']
+            plan.append((manager, 'check', "metadata is stale", estimate))
+
+    return plan
+
+
+def print_update_plan(plan):
+    """Print the planned action and estimated duration of each manager."""
+    width = max(len('Manager'), *(len(manager[0]) for manager, _, _, _ in plan))
+
+    print("{0}{1:<{2}}  {3:<6}  {4:>9}  {5}{6}".format(
+        BOLD, 'Manager', width, 'Action', 'Estimate', 'Reason', COLOUR_RESET))
+    for manager, action, reason, estimate in plan:
+        print("{0:<{1}}  {2:<6}  {3:>9}  {4}".format(
+            manager[0], width, action,
+            '?' if estimate is None else "{0:.1f}s".format(estimate), reason))
+
+    estimates = [estimate for _, action, _, estimate in plan if action != 'skip']
+    if None in estimates:
+        print("{0:<{1}}  {2:<6}  {3:>9}".format('Total', width, '', '?'))
+    else:
+        # The managers run concurrently, so the slowest one sets the total.
+        print("{0:<{1}}  {2:<6}  {3:>8.1f}s".format('Total', width, '', max(estimates,
+                                                                             default=0)))
+
+
+def validate_sudo(command_lists):
+    """Ask for the sudo password once if any of the commands need it."""
+    if SUDO and any(command[:len(SUDO)] == SUDO
+                    for commands in command_lists for command in commands):
+        subprocess.run(SUDO + ['--validate'], check=True)
+
+
+def run_package_manager(name, commands, colour, width):
+    """
+    Run the commands of one package manager in order, printing each line
+    of their output prefixed with the manager name. Return the result
+    and duration.
+    """
+    prefix = "{0}{1:<{2}}{3} | ".format(colour, name, width, COLOUR_RESET)
+    started = time.monotonic()
+
+    for command in commands:
+        try:
+            with subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                                  stderr=subprocess.STDOUT, text=True,
+                                  errors='replace') as process:
+                for line in process.stdout:
+                    with OUTPUT_LOCK:
+                        print(prefix + line.rstrip(), flush=True)
+        except OSError as error:
+            return "failed ({0})".format(error.strerror), time.monotonic() - started
+
+        if process.returncode:
+            return ("failed (exit status {0})".format(process.returncode),
+                    time.monotonic() - started)
+
+    return 'updated', time.monotonic() - started
+
+
+def run_package_managers(managers):
+    """
+    Run package managers at the same time on a thread pool. Return a
+    dictionary of each manager's result and duration.
+    """
+    width = max(len(manager[0]) for manager in managers)
+
+    with concurrent.futures.ThreadPoolExecutor(len(managers)) as executor:
+        futures = {executor.submit(run_package_manager, name, commands,
+                                   MANAGER_COLOURS[index % len(MANAGER_COLOURS)], width): name
+                   for index, (name, commands, _) in enumerate(managers)}
+
+        return {futures[future]: future.result()
+                for future in concurrent.futures.as_completed(futures)}
+
+
+def print_update_summary(managers, results, elapsed):
+    """Print the result and duration of every package manager."""
+    width = max(len('Manager'), *(len(manager[0]) for manager in managers))
+
+    print("\n{0}{1:<{2}}  {3:>9}  {4}{5}".format(BOLD, 'Manager', width, 'Duration', 'Result',
+                                                COLOUR_RESET))
+    for manager in managers:
+        result, duration = results[manager[0]]
+        colour = LIGHT_GREEN if result in ('updated', 'up to date') else LIGHT_RED
+        print("{0:<{1}}  {2:>8.1f}s  {3}{4}{5}".format(manager[0], width, duration, colour,
+                                                      result, COLOUR_RESET))
+    print("{0:<{1}}  {2:>8.1f}s".format('Total', width, elapsed))
+
+
+def update_system_software(plan_only=False, state_file=UPDATE_STATE):
+    """
+    Detect various package managers, check which have pending updates and
+    update those at the same time, then summarise the result of each.
+    Managers with fresh metadata and nothing pending, according to the
+    state file, are left alone.
+    """
+
+    managers = detect_package_managers()
+    if managers is None:
+        sys.exit("{0}Could not detect a native package manager. Exiting.{1}\n"
+                 .format(LIGHT_RED, COLOUR_RESET))
+
+    state = load_update_state(state_file)
+    plan = plan_package_managers(managers, state, time.time())
+    if plan_only:
+        print_update_plan(plan)
+        return
+
+    started = time.monotonic()
+    results = {manager[0]: ('up to date', 0) for manager, action, _, _ in plan
+               if action == 'skip'}
+    checks = [manager for manager, action, _, _ in plan if action == 'check']
+    updates = [manager for manager, action, _, _ in plan if action == 'update']
+
+    # Ask for the password once, before the output of the managers is mixed.
+    validate_sudo([manager[2][0] for manager in checks])
+
+    if checks:
+        print("{0}Checking {1}{2}".format(LIGHT_YELLOW,
+                                          ', '.join(manager[0] for manager in checks),
+                                          COLOUR_RESET))
+        with concurrent.futures.ThreadPoolExecutor(len(checks)) as executor:
+            for manager, (pending, duration) in zip(checks, executor.map(
+                    lambda manager: run_update_check(*manager[2]), checks)):
+                state[manager[0]] = dict(state.get(manager[0], {}), check_duration=duration)
+                if pending is not None:
+                    state[manager[0]].update(refreshed=time.time(), pending=pending)
+                if pending == 0:
+                    results[manager[0]] = ('up to date', duration)
+                else:
+                    updates.append(manager)
+
+    if updates:
+        validate_sudo([manager[1] for manager in updates])
+        print("{0}Updating {1}{2}\n".format(LIGHT_YELLOW,
+                                            ', '.join(manager[0] for manager in updates),
+                                            COLOUR_RESET))
+        for name, (result, duration) in run_package_managers(updates).items():
+            results[name] = (result, duration)
+            if result == 'updated':
+                state[name] = dict(state.get(name, {}), update_duration=duration,
+                                   refreshed=time.time(), pending=0)
+
+    save_update_state(state, state_file)
+    print_update_summary(managers, results, time.monotonic() - started)
+
+    if any(result not in ('updated', 'up to date') for result, _ in results.values()):
+        sys.exit("\n{0}Some software could not be updated.{1}\n"
+                 .format(LIGHT_RED, COLOUR_RESET))
+    print("\n{0}System software has been updated.{1}\n".format(LIGHT_GREEN, COLOUR_RESET))
+    sys.exit(0)
 
 
 def update_clamav_definitions():
@@ -212,14 +439,14 @@ def update_clamav_definitions():
 # Kickstart #
 #############
 
-# Load Main Menu only if an active Internet connection is present.
-if check_network_connection():
-    linux_setup_menu()
-elif not check_network_connection():
-    sys.exit("\n{0}ERROR: Network connection not available. Exiting.{1}\n".format(LIGHT_RED,
-                                                                                  COLOUR_RESET))
-else:
-    sys.exit("\n{0}ERROR: An unknown error occurred. Exiting.{1}\n".format(LIGHT_RED,
-                                                                           COLOUR_RESET))
+if __name__ == '__main__':
+    ARGUMENTS = PARSER.parse_args()
+
+    if ARGUMENTS.plan:
+        update_system_software(plan_only=True)
+    else:
+        # Both actions need an Internet connection, which is checked while
+        # the main menu is shown.
+        linux_setup_menu(pynetwork.start_network_probe())
 
 # End of File.
@@ -27,44 +27,35 @@
 # Imports #
 ###########
 
-import errno
+import json
 import os
+import shutil
 import subprocess
 import sys
 
+from pycommon import BOLD, CACHE_FOLDER, COLOUR_RESET, GREEN, LIGHT_GREEN, RED, SCRIPT_URL, clear
+
 #############
 # Variables #
 #############
 
 # Script Metadata
 
-SCRIPT_VERSION = '0.0.1'
-SCRIPT_URL = 'https://github.com/ultraviolet-1968/shell_scripts'
-
-# String colours and formatting
-
-BLUE = '\033[0;34m'
-CYAN = '\033[0;36m'
-GREEN = '\033[0;32m'
-MAGENTA = '\033[0;35m'
-RED = '\033[0;31m'
-YELLOW = '\033[0;33m'
+SCRIPT_VERSION = '0.2.0'
 
-LIGHT_BLUE = '\033[0;94m'
-LIGHT_CYAN = '\033[0;96m'
-LIGHT_GREEN = '\033[0;92m'
-LIGHT_MAGENTA = '\033[0;95m'
-LIGHT_RED = '\033[0;91m'
-LIGHT_YELLOW = '\033[0;93m'
+# Executables, found on the PATH first so that they can be replaced by
+# stubs when testing.
 
-BLACK = '\033[0;30m'
-GREY = '\033[0;90m'
-WHITE = '\033[0;97m'
+FLATPAK = shutil.which('flatpak') or '/usr/bin/flatpak'
+FLATPAK_REMOTE = 'fedora'
+RPM_OSTREE = shutil.which('rpm-ostree') or '/usr/bin/rpm-ostree'
 
-BOLD = '\033[1m'
-UNDERLINE = '\033[4m'
+# The layered packages reported by 'rpm-ostree status' are cached until
+# the booted deployment changes or a new deployment is created or staged.
 
-COLOUR_RESET = '\033[0;m'
+OSTREE_CMDLINE = '/proc/cmdline'
+OSTREE_STAGED = '/run/ostree/staged-deployment'
+RPM_INVENTORY = "{0}/pysilverblue.json".format(CACHE_FOLDER)
 
 # Software Lists
 
@@ -113,17 +104,10 @@ RPM_SOFTWARE = (
     "vim"
 )
 
-RPM_SOFTWARE = ' '.join(RPM_SOFTWARE)
-
 #############
 # Functions #
 #############
 
-def clear():
-    """Clear the current Terminal window."""
-    os.system('clear')
-
-
 def silverblue_setup_menu():
     """Display the program's main menu."""
     clear()
@@ -163,43 +147,149 @@ def silverblue_setup_menu():
         sys.exit("{0}ERROR: Incorrect Response.{1}\n".format(RED, COLOUR_RESET))
 
 
+def installed_flatpak_software():
+    """Return the set of installed Flatpak application IDs."""
+    process = subprocess.run([FLATPAK, 'list', '--app', '--columns=application'],
+                             stdout=subprocess.PIPE, text=True, check=True)
+    return {line.strip() for line in process.stdout.splitlines() if line.strip()}
+
+
+def reconcile_flatpak_software(installed=True):
+    """
+    Make the software in 'FLATPAK_SOFTWARE' installed or removed. The
+    installed applications are read once, and any that differ are changed
+    in a single Flatpak transaction. Return the applications changed.
+    """
+    current = installed_flatpak_software()
+
+    if installed:
+        changes = [app for app in FLATPAK_SOFTWARE if app not in current]
+        command = [FLATPAK, 'install', '--noninteractive', '-y', FLATPAK_REMOTE]
+    else:
+        changes = [app for app in FLATPAK_SOFTWARE if app in current]
+        command = [FLATPAK, 'uninstall', '--noninteractive', '-y']
+
+    if changes:
+        subprocess.run(command + changes, check=True)
+    else:
+        print("{0}Flatpak software is already {1}.{2}".format(
+            LIGHT_GREEN, 'installed' if installed else 'removed', COLOUR_RESET))
+
+    return changes
+
+
 def install_flatpak_software():
     """Install software defined within the 'FLATPAK_SOFTWARE' variable."""
-    for i in FLATPAK_SOFTWARE:
-        subprocess.run("flatpak install fedora -y {0}".format(i), shell=True, check=True)
+    reconcile_flatpak_software(installed=True)
 
 
 def remove_flatpak_software():
     """Remove software defined within the 'FLATPAK_SOFTWARE' variable."""
-    for i in FLATPAK_SOFTWARE:
-        subprocess.run("flatpak uninstall -y {0}".format(i), shell=True, check=True)
+    reconcile_flatpak_software(installed=False)
+
+
+def booted_deployment_key():
+    """
+    Return the checksum of the booted deployment along with the times its
+    deployment folder and any staged deployment last changed, without
+    asking rpm-ostree. Return None when not booted from OSTree.
+    """
+    try:
+        with open(OSTREE_CMDLINE) as cmdline:
+            boot = next(argument.split('=', 1)[1] for argument in cmdline.read().split()
+                        if argument.startswith('ostree='))
+        deployment = os.path.realpath(boot)
+        staged = os.stat(OSTREE_STAGED).st_mtime_ns if os.path.exists(OSTREE_STAGED) else 0
+        return [os.path.basename(deployment).split('.')[0],
+                os.stat(os.path.dirname(deployment)).st_mtime_ns, staged]
+    except (OSError, StopIteration):
+        return None
+
+
+def layered_rpm_software(key):
+    """
+    Return the set of packages requested for the next deployment, reading
+    'rpm-ostree status --json' only when the cached inventory does not
+    match the deployment key.
+    """
+    try:
+        with open(RPM_INVENTORY) as inventory:
+            cache = json.load(inventory)
+        if key and cache['key'] == key:
+            return set(cache['requested'])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    process = subprocess.run([RPM_OSTREE, 'status', '--json'], stdout=subprocess.PIPE,
+                             check=True)
+    deployments = json.loads(process.stdout)['deployments']
+    requested = set(deployments[0].get('requested-packages', [])) if deployments else set()
+    save_rpm_inventory(key, requested)
+    return requested
+
+
+def save_rpm_inventory(key, requested):
+    """Cache the requested packages of a deployment key."""
+    if not key:
+        return
+
+    try:
+        os.makedirs(os.path.dirname(RPM_INVENTORY), exist_ok=True)
+        with open("{0}.tmp".format(RPM_INVENTORY), 'w') as inventory:
+            json.dump({'key': key, 'requested': sorted(requested)}, inventory)
+        os.replace("{0}.tmp".format(RPM_INVENTORY), RPM_INVENTORY)
+    except OSError:
+        pass
+
+
+def reconcile_rpm_software(installed=True):
+    """
+    Make the software in 'RPM_SOFTWARE' layered or removed. Only packages
+    which differ from the cached inventory are passed to one rpm-ostree
+    transaction, so no deployment is created when nothing needs to change.
+    Return the packages changed.
+    """
+    key = booted_deployment_key()
+    requested = layered_rpm_software(key)
+
+    if installed:
+        changes = [package for package in RPM_SOFTWARE if package not in requested]
+        command = [RPM_OSTREE, 'install', '--idempotent']
+    else:
+        changes = [package for package in RPM_SOFTWARE if package in requested]
+        command = [RPM_OSTREE, 'uninstall']
+
+    if not changes:
+        print("{0}RPM software is already {1}.{2}".format(
+            LIGHT_GREEN, 'installed' if installed else 'removed', COLOUR_RESET))
+        return changes
+
+    subprocess.run(command + changes, check=True)
+    requested = requested | set(changes) if installed else requested - set(changes)
+    save_rpm_inventory(booted_deployment_key(), requested)
+    return changes
 
 
 def install_rpm_software():
     """Install software defined within the 'RPM_SOFTWARE' variable."""
     try:
-        subprocess.run("rpm-ostree install {0}".format(RPM_SOFTWARE), shell=True, check=True)
-    except OSError as error:
-        if error.errno == errno.ENOENT:
-            pass
-        else:
-            raise
+        reconcile_rpm_software(installed=True)
+    except FileNotFoundError:
+        sys.exit("{0}ERROR: 'rpm-ostree' is not installed.{1}\n".format(RED, COLOUR_RESET))
 
 
 def remove_rpm_software():
     """Remove software defined within the 'RPM_SOFTWARE' variable."""
     try:
-        subprocess.run("rpm-ostree remove {0}".format(RPM_SOFTWARE), shell=True, check=True)
-    except OSError as error:
-        if error.errno == errno.ENOENT:
-            pass
-        else:
-            raise
+        reconcile_rpm_software(installed=False)
+    except FileNotFoundError:
+        sys.exit("{0}ERROR: 'rpm-ostree' is not installed.{1}\n".format(RED, COLOUR_RESET))
 
 #############
 # Kickstart #
 #############
 
-silverblue_setup_menu()
+if __name__ == '__main__':
+    silverblue_setup_menu()
 
 # End of File.
@@ -36,9 +36,18 @@ checksum file.
 # Imports #
 ###########
 
+import argparse
+import collections
+import concurrent.futures
+import hashlib
+import io
+import json
 import os
-import subprocess
 import sys
+import tarfile
+
+from pycommon import (COLOUR_RESET, LIGHT_GREEN, LIGHT_RED, LIGHT_YELLOW, SCRIPT_URL,
+                      HashingReader, HashingWriter, ParallelGzipWriter)
 
 #############
 # Variables #
@@ -46,14 +55,23 @@ import sys
 
 # Script Metadata
 SCRIPT_VERSION = '0.0.1'
-SCRIPT_URL = 'https://github.com/ultraviolet-1968/shell_scripts'
 
-# String Colours
-GREEN = '\033[0;92m'
-RED = '\033[0;91m'
-YELLOW = '\033[0;93m'
+# Command-line arguments.
+PARSER = argparse.ArgumentParser(prog='tarhash', add_help=False)
+PARSER.add_argument('-h', '--help', action='store_true')
+PARSER.add_argument('-v', '--version', action='store_true')
+PARSER.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1)
+PARSER.add_argument('-m', '--manifest', action='store_true')
+PARSER.add_argument('--verify', metavar='TARGET')
+PARSER.add_argument('directory', nargs='?')
+
+# Buffer Sizes
+BUFFER_SIZE = 1024 * 1024
 
-RESET = '\033[0;m'
+# - Members of a tarball up to this size are read into memory and hashed on
+#   the worker pool while decompression continues. Larger members are hashed
+#   as they are read.
+MEMBER_BUFFER_SIZE = 8 * BUFFER_SIZE
 
 #############
 # Functions #
@@ -62,59 +80,66 @@ RESET = '\033[0;m'
 def tarhash_main():
     """Main function wrapper for 'tarhash.py'."""
 
-    # Success: Correct number of arguments.
-    if len(sys.argv) == 2:
+    # Parse command-line arguments.
+    args = PARSER.parse_args()
+
+    # Display help and exit.
+    if args.help:
+        tarhash_help()
 
-        # Display help and exit.
-        if sys.argv[1] == "--help" or sys.argv[1] == "-h":
-            tarhash_help()
+    # Show version information and exit.
+    elif args.version:
+        tarhash_version()
 
-        # Show version information and exit.
-        elif sys.argv[1] == "--version" or sys.argv[1] == "-v":
-            tarhash_version()
+    # Error: Invalid number of compression jobs.
+    elif args.jobs < 1:
+        sys.exit("\n{0}ERROR: Jobs must be a positive number.{1}\n"
+                 .format(LIGHT_RED, COLOUR_RESET))
 
-        # - Create tarball of directory and sha512sum file of the
-        #   tarball.
-        else:
-            archive = tarhash_create_archive("".join(sys.argv[1]))
-            tarhash_create_sha512sum(archive)
+    # Verify an archive or directory against its manifest.
+    elif args.verify:
+        tarhash_verify(args.verify, args.jobs)
 
-    # Failure: Too many arguments.
-    elif len(sys.argv) > 2:
-        sys.exit("\n{0}ERROR: Too many arguments provided.{1}\n"
-                 .format(RED, RESET))
+    # - Create tarball of directory and sha512sum file of the
+    #   tarball in a single pass.
+    elif args.directory:
+        archive, digest = tarhash_create_archive(args.directory, args.jobs,
+                                                 args.manifest)
+        tarhash_create_sha512sum(archive, digest)
 
     return 0
 
 
-def tarhash_create_archive(directory):
-    """Create a tarball of a given directory."""
+def tarhash_create_archive(directory, jobs=1, manifest=False):
+    """
+    Create a tarball of a given directory and return its filename along
+    with the SHA512 digest computed while it was written. Optionally
+    write a manifest of every file within the tarball.
+    """
 
-    # Construct archive filename.
+    # - Construct archive filename from the normalised directory, so that
+    #   a trailing slash does not place the output inside the directory.
+    directory = os.path.normpath(directory)
     archive = "{0}.tar.gz".format(directory)
 
-    # Construct tar command.
-    tar_command = ("tar -czf '{0}' '{1}' --absolute-names; sync"
-                   .format(archive, directory))
-
     # Error: Target does not exist.
     if not os.path.exists(directory):
         sys.exit("\n{0}ERROR: Target does not exist.{1}\n"
-                 .format(RED, RESET))
+                 .format(LIGHT_RED, COLOUR_RESET))
 
     # Error: Cannot create archive from current working directory.
     elif directory == ".":
         sys.exit("\n{0}ERROR: Current directory is invalid.{1}\n"
-                 .format(RED, RESET))
+                 .format(LIGHT_RED, COLOUR_RESET))
 
     # Error: Target is a file.
     elif os.path.isfile(directory):
         sys.exit("\n{0}ERROR: Target must be a directory.{1}\n"
-                 .format(RED, RESET))
+                 .format(LIGHT_RED, COLOUR_RESET))
 
     elif not os.listdir(directory):
         sys.exit("\n{0}ERROR: Target must not be empty.{1}\n"
-                 .format(RED, RESET))
+                 .format(LIGHT_RED, COLOUR_RESET))
 
     # Success: Target is a directory.
     elif os.path.isdir(directory):
@@ -122,51 +147,341 @@ def tarhash_create_archive(directory):
         # Inform the user.
         print("tarhash v{0} compressing {1}{2}{3}. Please wait."
               .format(SCRIPT_VERSION,
-                      YELLOW,
+                      LIGHT_YELLOW,
                       directory,
-                      RESET))
+                      COLOUR_RESET))
+
+        # - Stream the tarball to disk, compressing blocks in parallel
+        #   and hashing the compressed data as it is written so that it
+        #   never has to be read back.
+        with open(archive, "wb", buffering=BUFFER_SIZE) as output:
+            writer = HashingWriter(output)
+            compressor = ParallelGzipWriter(writer, jobs)
+
+            # - Naming the archive lets tarfile skip it if it is found
+            #   within the directory, as GNU tar does.
+            with tarfile.open(archive, fileobj=compressor, mode="w|",
+                              bufsize=BUFFER_SIZE) as tarball:
+                tarball.copybufsize = BUFFER_SIZE
 
-        # Execute compiled command.
-        subprocess.run(tar_command, shell=True, check=True)
+                # - Hash each file as tarfile reads it if a manifest was
+                #   requested, so that files are only read once.
+                if manifest:
+                    records = []
+                    tarhash_add_tree(tarball, directory, records)
+                    tarhash_create_manifest(directory, records)
+                else:
+                    tarball.add(directory)
+
+            compressor.close()
+
+            output.flush()
+            os.fsync(output.fileno())
+
+        digest = writer.hexdigest()
 
         # Inform the user.
-        print("Created tarball file {0}{1}{2}.".format(GREEN,
+        print("Created tarball file {0}{1}{2}.".format(LIGHT_GREEN,
                                                        archive,
-                                                       RESET))
+                                                       COLOUR_RESET))
 
     # Error: Catch all.
     else:
         sys.exit("\n{0}ERROR: An unknown error occurred.{1}\n"
-                 .format(RED, RESET))
+                 .format(LIGHT_RED, COLOUR_RESET))
+
+    return archive, digest
+
+
+def tarhash_add_tree(tarball, path, records):
+    """
+    Recursively add a path to a tarball, hashing each regular file as it
+    is copied into the tarball. The tarball itself is skipped.
+    """
+
+    if os.path.abspath(path) == tarball.name:
+        return 0
+
+    tarinfo = tarball.gettarinfo(path)
+
+    # Skip sockets and other types which tarfile cannot store.
+    if tarinfo is None:
+        return 0
+
+    if tarinfo.isreg():
+        with open(path, "rb") as source:
+            reader = HashingReader(source)
+            tarball.addfile(tarinfo, reader)
+        records.append((tarinfo, reader.hexdigest()))
+    else:
+        tarball.addfile(tarinfo)
+
+    if tarinfo.isdir():
+        for name in sorted(os.listdir(path)):
+            tarhash_add_tree(tarball, os.path.join(path, name), records)
+
+    return 0
+
+
+def tarhash_hash_file(path):
+    """Return the SHA512 digest of a file."""
+
+    with open(path, "rb") as source:
+        return tarhash_hash_stream(source)
+
+
+def tarhash_hash_stream(source):
+    """Return the SHA512 digest of the remaining data in a file object."""
+
+    digest = hashlib.sha512()
+
+    for block in iter(lambda: source.read(BUFFER_SIZE), b""):
+        digest.update(block)
+
+    return digest.hexdigest()
+
+
+def tarhash_manifest_name(target):
+    """Return the manifest filename for a given tarball or directory."""
+
+    if target.endswith(".tar.gz"):
+        target = target[:-len(".tar.gz")]
+
+    return "{0}.manifest".format(target.rstrip("/"))
+
+
+def tarhash_create_manifest(directory, records):
+    """
+    Write a manifest recording the path, size, mode, modification time
+    and SHA512 digest of every file within the tarball.
+    """
+
+    # - Record the root as tarfile writes member names, with forward
+    #   slashes and no leading slash.
+    manifest_file = tarhash_manifest_name(directory)
+    root = tarhash_manifest_root(directory)
+
+    with open(manifest_file, "w") as manifest:
+        manifest.write("{0}\n".format(json.dumps({"root": root})))
+
+        for tarinfo, digest in records:
+            manifest.write("{0}\n".format(json.dumps({
+                "path": tarinfo.name,
+                "size": tarinfo.size,
+                "mode": tarinfo.mode & 0o7777,
+                "mtime": int(tarinfo.mtime),
+                "sha512": digest})))
+
+        manifest.flush()
+        os.fsync(manifest.fileno())
+
+    # Inform the user.
+    print("Created manifest file {0}{1}{2}.".format(LIGHT_GREEN,
+                                                    manifest_file,
+                                                    COLOUR_RESET))
+
+    return 0
+
+
+def tarhash_manifest_root(directory):
+    """Return a directory as the prefix of its member names in a tarball."""
+
+    return os.path.normpath(directory).replace(os.sep, "/").lstrip("/")
+
+
+def tarhash_read_manifest(manifest_file):
+    """Read a manifest and return its root and records by path."""
 
-    return archive
+    with open(manifest_file) as manifest:
+        root = tarhash_manifest_root(json.loads(manifest.readline())["root"])
+        records = {}
 
+        for line in manifest:
+            record = json.loads(line)
+            records[record["path"]] = record
 
-def tarhash_create_sha512sum(archive):
-    """Create a SHA512SUM file of a given tarball."""
+    return root, records
+
+
+def tarhash_compare_record(record, size, mode, mtime, digest):
+    """Return a description of how a file differs from its record."""
+
+    if digest != record["sha512"]:
+        return "content differs"
+    elif size != record["size"]:
+        return "size differs"
+    elif mode != record["mode"]:
+        return "mode differs"
+    elif mtime != record["mtime"]:
+        return "modification time differs"
+
+    return None
+
+
+def tarhash_verify(target, jobs=1):
+    """Verify a tarball or directory against its manifest."""
+
+    manifest_file = tarhash_manifest_name(target)
+
+    # Error: Manifest does not exist.
+    if not os.path.isfile(manifest_file):
+        sys.exit("\n{0}ERROR: Manifest '{1}' does not exist.{2}\n"
+                 .format(LIGHT_RED, manifest_file, COLOUR_RESET))
+
+    root, records = tarhash_read_manifest(manifest_file)
+
+    # Inform the user.
+    print("tarhash v{0} verifying {1}{2}{3}. Please wait."
+          .format(SCRIPT_VERSION, LIGHT_YELLOW, target, COLOUR_RESET))
+
+    if os.path.isfile(target):
+        failures = tarhash_verify_archive(target, records, jobs)
+    elif os.path.isdir(target):
+        failures = tarhash_verify_tree(target, root, records, jobs)
+    else:
+        sys.exit("\n{0}ERROR: Target does not exist.{1}\n"
+                 .format(LIGHT_RED, COLOUR_RESET))
+
+    for path, reason in sorted(failures):
+        print("{0}FAILED{1} {2}: {3}".format(LIGHT_RED, COLOUR_RESET, path, reason))
+
+    # Error: One or more files did not match the manifest.
+    if failures:
+        sys.exit("\n{0}ERROR: {1} of {2} files failed verification.{3}\n"
+                 .format(LIGHT_RED, len(failures), len(records), COLOUR_RESET))
+
+    print("Verified {0}{1}{2} files against {3}.".format(LIGHT_GREEN,
+                                                         len(records),
+                                                         COLOUR_RESET,
+                                                         manifest_file))
+
+    return 0
+
+
+def tarhash_verify_archive(archive, records, jobs=1):
+    """
+    Verify the files within a tarball against their manifest records.
+    The tarball is decompressed in order while its members are hashed in
+    parallel on a worker pool.
+    """
+
+    failures = []
+    results = []
+    pending = collections.deque()
+    seen = set()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor, \
+            tarfile.open(archive, mode="r:gz") as tarball:
+        for tarinfo in tarball:
+            if not tarinfo.isreg():
+                continue
+
+            seen.add(tarinfo.name)
+            record = records.get(tarinfo.name)
+
+            if record is None:
+                failures.append((tarinfo.name, "not in manifest"))
+                continue
+
+            member = tarball.extractfile(tarinfo)
+
+            # - Small members are buffered and hashed in the background,
+            #   while large members must be hashed before the tarball can
+            #   be read any further.
+            if tarinfo.size <= MEMBER_BUFFER_SIZE:
+                future = executor.submit(tarhash_hash_stream, io.BytesIO(member.read()))
+                pending.append(future)
+
+                while len(pending) > jobs * 2:
+                    pending.popleft().result()
+            else:
+                future = executor.submit(tarhash_hash_stream, member)
+                future.result()
+
+            results.append((tarinfo, record, future))
+
+        for tarinfo, record, future in results:
+            reason = tarhash_compare_record(record, tarinfo.size,
+                                            tarinfo.mode, int(tarinfo.mtime),
+                                            future.result())
+            if reason:
+                failures.append((tarinfo.name, reason))
+
+    for path in records.keys() - seen:
+        failures.append((path, "missing"))
+
+    return failures
+
+
+def tarhash_verify_tree(directory, root, records, jobs=1):
+    """
+    Verify the files within a directory against their manifest records,
+    hashing files in parallel on a worker pool.
+    """
+
+    failures = []
+    results = []
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        for path, record in records.items():
+            source = os.path.join(directory, os.path.relpath(path, root))
+
+            try:
+                status = os.lstat(source)
+            except FileNotFoundError:
+                failures.append((path, "missing"))
+                continue
+
+            results.append((path, record, status,
+                            executor.submit(tarhash_hash_file, source)))
+
+        for path, record, status, future in results:
+            reason = tarhash_compare_record(record, status.st_size,
+                                            status.st_mode & 0o7777,
+                                            int(status.st_mtime),
+                                            future.result())
+            if reason:
+                failures.append((path, reason))
+
+    return failures
+
+
+def tarhash_format_sha512sum(archive, digest):
+    """Format a checksum line in the same way as 'sha512sum'."""
+
+    # - Filenames containing a backslash or newline are escaped and the
+    #   line is prefixed with a backslash, as 'sha512sum' does.
+    if "\\" in archive or "\n" in archive:
+        archive = archive.replace("\\", "\\\\").replace("\n", "\\n")
+        return "\\{0}  {1}\n".format(digest, archive)
+
+    return "{0}  {1}\n".format(digest, archive)
+
+
+def tarhash_create_sha512sum(archive, digest):
+    """Create a SHA512SUM file of a given tarball from its digest."""
 
     # Define filename for SHA512SUM checksum file.
     sha512sum_file = archive.replace(".tar.gz", ".sha512sum")
 
-    # Compile SHA512SUM command.
-    sha512sum_command = "sha512sum {0} > {1}; sync".format(archive,
-                                                           sha512sum_file)
-
     # Success: File exists and is a file.
     if os.path.isfile(archive):
 
-        # Execute compiled command.
-        subprocess.run(sha512sum_command, shell=True, check=True)
+        # Write the checksum file.
+        with open(sha512sum_file, "w") as checksum:
+            checksum.write(tarhash_format_sha512sum(archive, digest))
+            checksum.flush()
+            os.fsync(checksum.fileno())
 
         # Inform the user.
-        print("Created checksum file {0}{1}{2}.".format(GREEN,
+        print("Created checksum file {0}{1}{2}.".format(LIGHT_GREEN,
                                                         sha512sum_file,
-                                                        RESET))
+                                                        COLOUR_RESET))
 
     # Error: Catch all.
     else:
         sys.exit("\n{0}ERROR: An unknown error occurred.{1}\n"
-                 .format(RED, RESET))
+                 .format(LIGHT_RED, COLOUR_RESET))
 
     return 0
 
@@ -176,6 +491,9 @@ def tarhash_help():
 
     print("Usage: tarhash [OPTION/DIRECTORY]\n",
           "-h, --help\t\tDisplay this help and exit.",
+          "-j, --jobs N\t\tCompress using N threads (default: all CPUs).",
+          "-m, --manifest\t\tWrite a manifest of every file in the tarball.",
+          "--verify TARGET\t\tVerify a tarball or directory against its manifest.",
           "-v, --version\t\tDisplay version information.\n", sep="\n")
 
     return 0
@@ -195,6 +513,7 @@ def tarhash_version():
 # Kickstart #
 #############
 
-tarhash_main()
+if __name__ == '__main__':
+    tarhash_main()
 
 # End of File.
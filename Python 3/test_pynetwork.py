@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests for 'pynetwork.py' using local listener sockets."""
+
+###########
+# License #
+###########
+
+# Shell Scripts: A collection of shell scripts in various languages.
+# Copyright (C) 2020 William Willis Whinn
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+###########
+# Imports #
+###########
+
+import json
+import socket
+import time
+
+import pytest
+
+import pynetwork
+
+#############
+# Variables #
+#############
+
+# Allowance for scheduling on top of the probe deadline.
+DEADLINE_MARGIN = 0.3
+
+#############
+# Functions #
+#############
+
+@pytest.fixture
+def listener():
+    """Return the address of a local socket which accepts connections."""
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen()
+    yield server.getsockname()
+    server.close()
+
+
+@pytest.fixture
+def closed_port():
+    """Return the address of a local port which refuses connections."""
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    address = server.getsockname()
+    server.close()
+    return address
+
+
+@pytest.fixture
+def hanging():
+    """
+    Return the address of a local socket whose accept queue is full, so
+    that further connections are never answered.
+    """
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(0)
+    clients = []
+
+    for _ in range(4):
+        client = socket.socket()
+        client.setblocking(False)
+        client.connect_ex(server.getsockname())
+        clients.append(client)
+
+    yield server.getsockname()
+
+    for client in clients:
+        client.close()
+    server.close()
+
+
+def test_probe_succeeds_against_listener(listener):
+    """A reachable endpoint shows that the network is available."""
+    assert pynetwork.check_network_connection([listener], cache=None)
+
+
+def test_probe_fails_when_refused(closed_port):
+    """A refused connection fails straight away, without waiting for the deadline."""
+    started = time.monotonic()
+
+    assert not pynetwork.check_network_connection([closed_port], cache=None)
+    assert time.monotonic() - started < pynetwork.PROBE_TIMEOUT
+
+
+def test_hanging_endpoint_is_bounded_by_deadline(hanging):
+    """An endpoint which never answers fails once the deadline has passed."""
+    started = time.monotonic()
+
+    assert not pynetwork.check_network_connection([hanging], cache=None)
+    assert time.monotonic() - started < pynetwork.PROBE_TIMEOUT + DEADLINE_MARGIN
+
+
+def test_first_success_wins_over_hanging_endpoint(hanging, closed_port, listener):
+    """Endpoints are raced, so hanging and refused ones do not delay the result."""
+    started = time.monotonic()
+
+    assert pynetwork.check_network_connection([hanging, closed_port, listener], cache=None)
+    assert time.monotonic() - started < pynetwork.PROBE_TIMEOUT
+
+
+def test_success_is_cached(listener, closed_port, tmp_path):
+    """A successful probe is reused within the TTL, without connecting."""
+    cache = str(tmp_path / 'network.json')
+
+    assert pynetwork.check_network_connection([listener], cache=cache)
+    assert pynetwork.check_network_connection([closed_port], ttl=60, cache=cache)
+
+    # A TTL of zero always probes.
+    assert not pynetwork.check_network_connection([closed_port], ttl=0, cache=cache)
+
+
+def test_expired_cache_is_ignored(closed_port, tmp_path):
+    """A successful probe older than the TTL is not trusted."""
+    cache = tmp_path / 'network.json'
+    cache.write_text(json.dumps({'online': time.time() - 120}))
+
+    assert not pynetwork.check_network_connection([closed_port], ttl=60, cache=str(cache))
+
+
+def test_failure_is_not_cached(closed_port, tmp_path):
+    """A failed probe is not recorded, so a restored connection is noticed."""
+    cache = tmp_path / 'network.json'
+
+    assert not pynetwork.check_network_connection([closed_port], cache=str(cache))
+    assert not cache.exists()
+
+
+def test_background_probe_does_not_block(hanging):
+    """The background probe returns at once and finishes within the deadline."""
+    started = time.monotonic()
+    future = pynetwork.start_network_probe([hanging], cache=None)
+
+    assert time.monotonic() - started < 0.1
+    assert not future.done()
+    assert future.result(timeout=pynetwork.PROBE_TIMEOUT + DEADLINE_MARGIN) is False
+
+# End of File.
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests for 'pysetup.py' using stub package manager executables."""
+
+###########
+# License #
+###########
+
+# Shell Scripts: A collection of shell scripts in various languages.
+# Copyright (C) 2020 William Willis Whinn
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+###########
+# Imports #
+###########
+
+import json
+import time
+
+import pytest
+
+import pysetup
+
+#############
+# Variables #
+#############
+
+# Each stub sleeps for this long when updating, so that running them one
+# after another would take at least STUB_DELAY times the number of stubs.
+STUB_DELAY = 1
+
+#############
+# Functions #
+#############
+
+def make_stub(folder, name, responses=None, status=0):
+    """
+    Write a stub executable which records its arguments in 'calls.log'.
+    Arguments found in responses print the given output and exit with its
+    status, and anything else is treated as an update which takes
+    STUB_DELAY seconds and exits with status.
+    """
+    lines = ['#!/bin/sh',
+             'echo "{0} $*" >> "{1}/calls.log"'.format(name, folder),
+             'case "$*" in']
+    for arguments, (output, code) in (responses or {}).items():
+        lines.append("  '{0}') printf '%s' '{1}'; exit {2};;".format(arguments, output, code))
+    lines += ['esac',
+              'sleep {0}'.format(STUB_DELAY),
+              'echo "{0} done"'.format(name),
+              'exit {0}'.format(status)]
+
+    path = folder / name
+    path.write_text("\n".join(lines) + "\n")
+    path.chmod(0o755)
+    return str(path)
+
+
+def read_calls(folder):
+    """Return the recorded stub invocations."""
+    log = folder / 'calls.log'
+    return log.read_text().splitlines() if log.exists() else []
+
+
+@pytest.fixture
+def stubs(tmp_path, monkeypatch):
+    """Replace every package manager with a stub which has nothing pending."""
+    missing = str(tmp_path / 'missing')
+
+    monkeypatch.setattr(pysetup, 'SUDO', [])
+    monkeypatch.setattr(pysetup, 'DNF', missing)
+    monkeypatch.setattr(pysetup, 'RPM_OSTREE', missing)
+    monkeypatch.setattr(pysetup, 'APT', make_stub(tmp_path, 'apt', {
+        'update': ('', 0), 'list --upgradable': ('Listing...\n', 0)}))
+    monkeypatch.setattr(pysetup, 'FLATPAK', make_stub(tmp_path, 'flatpak', {
+        'remote-ls --updates --columns=application': ('', 0)}))
+    monkeypatch.setattr(pysetup, 'SNAP', make_stub(tmp_path, 'snap', {
+        'refresh --list': ('All snaps up to date.\n', 0)}))
+    monkeypatch.setattr(pysetup, 'CONDA', make_stub(tmp_path, 'conda'))
+
+    return tmp_path
+
+
+def test_detect_package_managers(stubs):
+    """The native manager and every user-level manager are found."""
+    managers = pysetup.detect_package_managers()
+
+    assert [manager[0] for manager in managers] == ['apt', 'flatpak', 'snap', 'conda']
+    assert managers[0][1] == [[pysetup.APT, 'full-upgrade', '--yes']]
+    assert managers[3][2] is None
+
+
+def test_detect_without_native_manager(stubs, monkeypatch):
+    """Nothing is updated when no native package manager is installed."""
+    monkeypatch.setattr(pysetup, 'APT', str(stubs / 'missing'))
+
+    assert pysetup.detect_package_managers() is None
+
+
+def test_package_managers_run_concurrently(stubs):
+    """Updates run at the same time, so they take as long as the slowest."""
+    managers = pysetup.detect_package_managers()
+
+    started = time.monotonic()
+    results = pysetup.run_package_managers(managers)
+    elapsed = time.monotonic() - started
+
+    assert {name: result for name, (result, _) in results.items()} == {
+        'apt': 'updated', 'flatpak': 'updated', 'snap': 'updated', 'conda': 'updated'}
+    assert elapsed < STUB_DELAY * 2
+    assert sorted(read_calls(stubs)) == ['apt full-upgrade --yes', 'conda update --all --yes',
+                                         'flatpak update --noninteractive', 'snap refresh']
+
+
+def test_failed_package_manager_is_reported(stubs, monkeypatch):
+    """A failing manager is reported without stopping the others."""
+    monkeypatch.setattr(pysetup, 'SNAP', make_stub(stubs, 'snap', status=3))
+
+    results = pysetup.run_package_managers(pysetup.detect_package_managers())
+
+    assert results['snap'][0] == 'failed (exit status 3)'
+    assert results['apt'][0] == 'updated'
+
+
+def test_plan_skips_fresh_managers(stubs):
+    """Fresh metadata decides whether a manager is skipped, checked or updated."""
+    now = time.time()
+    state = {'apt': {'refreshed': now, 'pending': 0},
+             'flatpak': {'refreshed': now, 'pending': 2, 'update_duration': 4.0},
+             'snap': {'refreshed': now - pysetup.UPDATE_FRESHNESS, 'pending': 0}}
+
+    plan = pysetup.plan_package_managers(pysetup.detect_package_managers(), state, now)
+
+    assert [(manager[0], action) for manager, action, _, _ in plan] == [
+        ('apt', 'skip'), ('flatpak', 'update'), ('snap', 'check'), ('conda', 'update')]
+    assert plan[1][3] == 4.0
+
+
+def test_update_only_managers_with_pending_updates(stubs, monkeypatch):
+    """Only managers whose check finds updates are updated, then all are skipped."""
+    monkeypatch.setattr(pysetup, 'APT', make_stub(stubs, 'apt', {
+        'update': ('', 0), 'list --upgradable': ('Listing...\nvim/stable 9.0 amd64\n', 0)}))
+    state_file = stubs / 'pysetup.json'
+
+    with pytest.raises(SystemExit) as status:
+        pysetup.update_system_software(state_file=str(state_file))
+
+    assert status.value.code == 0
+    calls = read_calls(stubs)
+    assert 'apt full-upgrade --yes' in calls
+    assert 'conda update --all --yes' in calls
+    assert 'flatpak update --noninteractive' not in calls
+    assert 'snap refresh' not in calls
+
+    state = json.loads(state_file.read_text())
+    assert all(state[name]['pending'] == 0 for name in ('apt', 'flatpak', 'snap', 'conda'))
+
+    # Every manager is now known to be up to date, so nothing is run.
+    (stubs / 'calls.log').unlink()
+    with pytest.raises(SystemExit) as status:
+        pysetup.update_system_software(state_file=str(state_file))
+
+    assert status.value.code == 0
+    assert read_calls(stubs) == []
+
+
+def test_failed_refresh_does_not_record_pending(stubs, monkeypatch):
+    """A failed metadata refresh leaves the manager to be checked next time."""
+    monkeypatch.setattr(pysetup, 'APT', make_stub(stubs, 'apt', {
+        'update': ('', 100), 'list --upgradable': ('Listing...\n', 0)}, status=100))
+    state_file = stubs / 'pysetup.json'
+
+    with pytest.raises(SystemExit) as status:
+        pysetup.update_system_software(state_file=str(state_file))
+
+    assert status.value.code != 0
+    assert 'pending' not in json.loads(state_file.read_text())['apt']
+
+# End of File.
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""Tests for 'pysilverblue.py' using a stub 'flatpak' executable."""
+
+###########
+# License #
+###########
+
+# Shell Scripts: A collection of shell scripts in various languages.
+# Copyright (C) 2020 William Willis Whinn
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+###########
+# Imports #
+###########
+
+import pytest
+
+import pysilverblue
+
+#############
+# Variables #
+#############
+
+LIST_COMMAND = "list --app --columns=application"
+
+#############
+# Functions #
+#############
+
+@pytest.fixture
+def flatpak(tmp_path, monkeypatch):
+    """
+    Replace 'flatpak' with a stub which records each invocation on its own
+    line of 'calls.log' and lists the applications in 'installed.txt'.
+    """
+    stub = tmp_path / 'flatpak'
+    stub.write_text("#!/bin/sh\n"
+                    "echo \"$*\" >> \"{0}/calls.log\"\n"
+                    "if [ \"$*\" = '{1}' ]; then cat \"{0}/installed.txt\"; fi\n"
+                    .format(tmp_path, LIST_COMMAND))
+    stub.chmod(0o755)
+    monkeypatch.setattr(pysilverblue, 'FLATPAK', str(stub))
+
+    def install(*applications):
+        (tmp_path / 'installed.txt').write_text("".join(
+            "{0}\n".format(application) for application in applications))
+
+    def calls():
+        return (tmp_path / 'calls.log').read_text().splitlines()
+
+    install()
+    return install, calls
+
+
+def test_install_missing_in_one_transaction(flatpak):
+    """Every missing application is installed by a single command."""
+    install, calls = flatpak
+    install('org.gnome.Calculator', 'org.example.Other')
+
+    changes = pysilverblue.reconcile_flatpak_software(installed=True)
+    missing = [app for app in pysilverblue.FLATPAK_SOFTWARE if app != 'org.gnome.Calculator']
+
+    assert changes == missing
+    assert calls() == [LIST_COMMAND, "install --noninteractive -y {0} {1}".format(
+        pysilverblue.FLATPAK_REMOTE, " ".join(missing))]
+
+
+def test_install_does_nothing_when_installed(flatpak):
+    """Nothing but the listing is run when every application is installed."""
+    install, calls = flatpak
+    install(*pysilverblue.FLATPAK_SOFTWARE)
+
+    assert pysilverblue.reconcile_flatpak_software(installed=True) == []
+    assert calls() == [LIST_COMMAND]
+
+
+def test_remove_installed_in_one_transaction(flatpak):
+    """Only installed applications are removed, by a single command."""
+    install, calls = flatpak
+    install('org.gnome.Logs', 'org.gnome.eog', 'org.example.Other')
+
+    changes = pysilverblue.reconcile_flatpak_software(installed=False)
+
+    assert changes == ['org.gnome.Logs', 'org.gnome.eog']
+    assert calls() == [LIST_COMMAND, "uninstall --noninteractive -y org.gnome.Logs org.gnome.eog"]
+
+
+def test_remove_does_nothing_when_removed(flatpak):
+    """Nothing but the listing is run when no application is installed."""
+    _, calls = flatpak
+
+    assert pysilverblue.reconcile_flatpak_software(installed=False) == []
+    assert calls() == [LIST_COMMAND]
+
+# End of File.